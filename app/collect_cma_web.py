@@ -1,305 +1,367 @@
+import argparse
 import asyncio
-import json
 import os
-import sys
+import re
 import sqlite3
-from asyncio import Semaphore
-
-import pandas as pd
-
-from app.getters.gateway import (
-    fetch_all_gateways,
-    fetch_gateway_by_id,
-    parse_gateway_data,
-)
-from app.getters.hardware import (
-    fetch_hardware_by_id,
-    fetch_hardwares_by_gateway,
-    parse_hardware_data,
-)
-from app.getters.register import (
-    fetch_register_dnp_by_id,
-    fetch_register_modbus_by_id,
-    fetch_registers_dnp,
-    fetch_registers_modbus,
-    parse_register_dnp_data,
-    parse_register_modbus_data,
-)
-from app.getters.sensors import (
-    fetch_sensor_dnp_by_id,
-    fetch_sensor_modbus_by_id,
-    fetch_sensors_dnp,
-    fetch_sensors_modbus,
-    parse_sensor_dnp_data,
-    parse_sensor_modbus_data,
-)
+from fnmatch import fnmatchcase
+from typing import List, Optional
+
+from app.collector.checkpoint import CheckpointJournal
+from app.collector.crawler import CmaWebCrawler, CollectionResult
+from app.collector.sinks import JsonArrayWriter, PartitionedSink, RecordSink, create_sink
+from app.collector.watermarks import WatermarkStore
+from app.getters.gateway import fetch_all_gateways
 from app.logger import logger
-from app.utils.data import combine_primary_with_secondary
+from app.utils.circuit_breaker import all_breakers
+from app.utils.columnar import write_parquet
+from app.utils.http_cache import HttpCache, set_http_cache
+from app.utils.http_client import http_client
 
 from .settings import configs
 
-semaphore = Semaphore(configs.MAX_PARALLEL_REQUESTS)
-
 
-async def fetch_and_parse_register_modbus(register_data):
-    async with semaphore:
-        register_data = await fetch_register_modbus_by_id(
-            host=configs.host,
-            auth_token=await configs.auth_token,
-            register_modbus_id=register_data["id"],
-        )
-        return parse_register_modbus_data(register_data)
+def select_gateways(gateways: List[dict], patterns: Optional[List[str]]) -> List[dict]:
+    """
+    Seleciona os gateways cujo nome casa com algum dos padrões informados.
 
+    Args:
+        gateways (list): Lista de gateways retornada por `fetch_all_gateways`.
+        patterns (list): Nomes ou padrões com curingas (ex.: "Gateway*"). `None`
+            seleciona todos os gateways.
 
-async def collect_registers_modbus(sensor_modbus_id):
-    registers = []
-    registers_data = await fetch_registers_modbus(
-        host=configs.host,
-        auth_token=await configs.auth_token,
-        sensor_modbus_id=sensor_modbus_id,
-        size=configs.MAX_PAGE_SIZE,
-    )
-    print(
-        f"   - Coletando {len(registers_data["content"])} registros modbus sensor id: {sensor_modbus_id}..."
-    )
-    # processar os registros em paralelo
-    tasks = [
-        fetch_and_parse_register_modbus(register_data)
-        for register_data in registers_data["content"]
+    Returns:
+        list: Gateways selecionados, na ordem da API.
+    """
+    if patterns is None:
+        return list(gateways)
+    return [
+        gateway
+        for gateway in gateways
+        if any(fnmatchcase(gateway["name"], pattern) for pattern in patterns)
     ]
-    logger.info(f"   - Coletando {len(tasks)} registros")
-    registers = await asyncio.gather(*tasks)
-    return registers
 
 
-async def fetch_and_parse_register_dnp(register_data):
-    async with semaphore:
-        register_data = await fetch_register_dnp_by_id(
-            host=configs.host,
-            auth_token=await configs.auth_token,
-            register_dnp_id=register_data["id"],
-        )
-    return parse_register_dnp_data(register_data)
+def gateway_partition_dir(output_dir: str, gateway: dict) -> str:
+    """Diretório de saída de um gateway na coleta múltipla (ex.: output/Gateway_01)."""
+    slug = re.sub(r"[^\w.-]+", "_", gateway["name"]).strip("_") or gateway["id"]
+    return os.path.join(output_dir, slug)
 
 
-async def collect_registers_dnp(sensor_dnp_id):
-    registers = []
-    registers_data = await fetch_registers_dnp(
-        host=configs.host,
-        auth_token=await configs.auth_token,
-        sensor_dnp_id=sensor_dnp_id,
-        size=configs.MAX_PAGE_SIZE,
-    )
-    print(
-        f"   - Coletando {len(registers_data["content"])} registros dnp3 sensor id: {sensor_dnp_id}..."
+def write_json_array(path: str, items):
+    """Grava `items` como um array JSON, um item por vez."""
+    writer = JsonArrayWriter(path)
+    try:
+        writer.write_many(items)
+    finally:
+        writer.close()
+
+
+def write_outputs(result: CollectionResult, output_dir: str = ".", parquet: bool = False):
+    """
+    Salva os dados coletados (data.json, dados.db e acumuladores) em `output_dir`.
+    Com `parquet`, grava também o snapshot colunar `data.parquet`.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    all_flat_data = result.flat_data
+    logger.info(f"total de registros: {len(all_flat_data)}")
+    # Salvar os dados em um arquivo JSON (registro a registro, sem montar a lista)
+    write_json_array(os.path.join(output_dir, "data.json"), all_flat_data)
+    if parquet:
+        write_parquet(all_flat_data, os.path.join(output_dir, "data.parquet"))
+
+    # verificar se o all_flat_data está vazio
+    if not all_flat_data:
+        logger.warning("Nenhum dado coletado")
+        return
+
+    # Criar um DataFrame (direto das colunas da representação compacta)
+    df = all_flat_data.to_frame()
+
+    # Conectar ao banco SQLite (ou criar um novo se não existir)
+    conn = sqlite3.connect(os.path.join(output_dir, "dados.db"))
+
+    # Salvar o DataFrame no banco, criando a tabela "dados" (ou sobrescrevendo se já existir)
+    df.to_sql("dados", conn, if_exists="replace", index=False)
+    conn.close()
+
+    # Salvar os acumuladores em arquivos JSON
+    accumulators = {
+        "cma_gateways.json": result.gateways,
+        "cma_hardwares.json": result.hardwares,
+        # MODBUS
+        "cma_sensors_modbus.json": result.sensors_modbus,
+        "registers_modbus.json": result.registers_modbus,
+        # DNP3
+        "cma_sensors_dnp3.json": result.sensors_dnp3,
+        "cma_registers_dnp3.json": result.registers_dnp3,
+    }
+    for file_name, data in accumulators.items():
+        write_json_array(os.path.join(output_dir, file_name), data)
+
+
+def create_output_sink(
+    formats: List[str], gateways: List[dict], output_dir: Optional[str] = None
+) -> RecordSink:
+    """
+    Cria o destino da gravação incremental: o diretório atual na coleta de um
+    gateway ou uma partição por gateway em `output_dir` na coleta múltipla.
+    """
+    if output_dir is None:
+        return create_sink(".", formats)
+    by_id = {gateway["id"]: gateway for gateway in gateways}
+    return PartitionedSink(
+        lambda gateway_id: create_sink(
+            gateway_partition_dir(output_dir, by_id[gateway_id]), formats
+        )
     )
-    # processar os registros em paralelo
-    tasks = [
-        fetch_and_parse_register_dnp(register_data)
-        for register_data in registers_data["content"]
-    ]
-    logger.info("    - Coletando ", len(tasks), " registros")
-    registers = await asyncio.gather(*tasks)
-    return registers
-
-
-async def main():
-    # Acumuladores
-    list_gateways = []
-    list_hardwares = []
-    list_sensors_modbus = []
-    list_registers_modbus = []
-    list_sensors_dnp3 = []
-    list_registers_dnp3 = []
-
-    all_flat_data = []
-    hardwares_parsed = []
-    hardwares_combined = []
-    sensors_parsed = []
+
+
+async def collect(
+    patterns: Optional[List[str]] = None,
+    output_dir: str = None,
+    list_only: bool = None,
+    incremental: bool = None,
+    resume: bool = False,
+    stream_formats: Optional[List[str]] = None,
+    parquet: bool = None,
+    http_cache: bool = None,
+    checkpoint: bool = None,
+):
+    """
+    Coleta os dados da API CMA Web.
+
+    Sem `patterns`, coleta apenas o gateway `GATEWAY_NAME` e grava os arquivos no
+    diretório atual (entrada do `app.reconcile2.main`). Com `patterns`, coleta
+    todos os gateways selecionados no mesmo processo, compartilhando token e pool
+    HTTP, e grava cada gateway em `output_dir/<nome do gateway>/` assim que sua
+    coleta termina.
+
+    Com `list_only`, os detalhes só são buscados para itens cuja listagem não traz
+    os campos usados pelos parsers.
+
+    Com `incremental`, o detalhe de cada entidade só é buscado quando seu
+    `updatedAt` mudou desde a execução anterior (`WATERMARK_DB_PATH`); as demais
+    entidades vêm do detalhe salvo, e a saída continua sendo o snapshot completo.
+
+    Com `checkpoint` ou `resume`, cada subárvore concluída é gravada no diário
+    de checkpoint (`CHECKPOINT_DB_PATH`). Com `resume`, as subárvores do diário
+    de uma execução interrompida são reaproveitadas; com apenas `checkpoint`, o
+    diário é descartado no início. Ao final de uma coleta completa o diário é
+    limpo. Sem nenhum dos dois, o diário não é gravado.
+
+    Com `stream_formats` (ex.: ["json", "sqlite"]), os registros de cada sensor
+    são gravados assim que sua subárvore termina, sem acumular toda a coleta em
+    memória.
+
+    Com `parquet`, também é gravado o snapshot colunar `data.parquet`, lido pelo
+    `app.reconcile2.main` apenas nas colunas de cada sincronização.
+
+    Com `http_cache`, os detalhes de gateways, hardwares e sensores vêm do cache
+    em disco (`HTTP_CACHE_PATH`) enquanto válidos (`HTTP_CACHE_TTL`) e são
+    revalidados com requisições condicionais depois disso.
+    """
     gateways = await fetch_all_gateways(
         host=configs.host, auth_token=await configs.auth_token
     )
     logger.info(f"gateway disponíveis: {", ".join([gw["name"] for gw in gateways])}")
     if not gateways:
         print(f"\033[91m >>> Nenhum gateway disponível <<< \x1b[0m")
-    # get gateway by name
-    gateways_founds = [
-        gateway for gateway in gateways if gateway["name"] == configs.gateway_name
-    ]
+    multi_gateway = patterns is not None
+    gateways_founds = select_gateways(
+        gateways, patterns if multi_gateway else [configs.gateway_name]
+    )
     if not gateways_founds:
-        logger.error(f"Gateway {configs.gateway_name} não encontrado")
-        print(f"\033[91m >>> Gateway {configs.gateway_name} não encontrado <<< \x1b[0m")
+        wanted = ", ".join(patterns) if multi_gateway else configs.gateway_name
+        logger.error(f"Gateway {wanted} não encontrado")
+        print(f"\033[91m >>> Gateway {wanted} não encontrado <<< \x1b[0m")
         print(f"\033[93m >>> Gateways disponíveis: {', '.join([gw['name'] for gw in gateways])} <<< \x1b[0m")
-        raise ValueError(f"Gateway {configs.gateway_name} não encontrado")
+        raise ValueError(f"Gateway {wanted} não encontrado")
     for gateway in gateways_founds:
-        gateway_id = gateway["id"]
         print(f"gateway name: {gateway["name"]}")
-        logger.info(f"gateway name: {gateway["name"]}")
-        gateway_data = await fetch_gateway_by_id(
-            host=configs.host,
-            auth_token=await configs.auth_token,
-            gateway_id=gateway_id,
-        )
-        list_gateways.append(gateway_data)
-        gateway_parsed = parse_gateway_data(gateway_data)
-        hardware_combine_sensors_modbus = []
-        hardware_combine_sensors_dnp = []
-        hardwares = await fetch_hardwares_by_gateway(
-            host=configs.host,
-            auth_token=await configs.auth_token,
-            cma_gateway_id=gateway_id,
-        )
-        for hardware in hardwares:
-            hardware_id = hardware["id"]
-            logger.info(f"  nome hardware {hardware["name"]}")
-            hardware_data = await fetch_hardware_by_id(
-                host=configs.host,
-                auth_token=await configs.auth_token,
-                hardware_id=hardware_id,
-            )
-            list_hardwares.append(hardware_data)
-            hardware_parsed = parse_hardware_data(hardware_data)
-            # hardwares_parsed.append(hardware_parsed)
-
-            # consultar todos os sensor MODBUS associado a cada hardware
-            sensors_parsed = []
-            sensors = await fetch_sensors_modbus(
-                host=configs.host,
-                auth_token=await configs.auth_token,
-                hardware_id=hardware_id,
-            )
-            sensor_combine_registers_modbus = []
-            if not sensors["content"]:
-                logger.warning(f"O hardware id: {hardware_id} não tem modbus dnp3")
-            else:
-                print(f"Coleando sensores {len(sensors)} modbus...")
-                for sensor in sensors[
-                    "content"
-                ]:  # informação de sensores modbus paginada
-                    sensor_id = sensor["id"]
-                    logger.info(f"   Nome sensor modbus: {sensor["name"]}")
-                    sensor_data = await fetch_sensor_modbus_by_id(
-                        host=configs.host,
-                        auth_token=await configs.auth_token,
-                        sensor_modbus_id=sensor_id,
-                    )
-                    list_sensors_modbus.append(sensor_data)
-                    sensor_parsed = parse_sensor_modbus_data(sensor_data)
-                    sensors_parsed.append(sensor_parsed)
-                    # coletar os registros de cada sensor
-                    registers_modbus = await collect_registers_modbus(sensor_id)
-                    list_registers_modbus += registers_modbus
-                    sensor_combine_registers_modbus += combine_primary_with_secondary(
-                        sensor_parsed, registers_modbus
-                    )
-                    logger.info(
-                        f"   +sub total resistros por sensor: {len(sensor_combine_registers_modbus)}",
-                    )
-                    if configs.DEBUG:
-                        break
-            # combinar o resultado de hardware com o resultado de sensores
-            hardware_combine_sensors_modbus += combine_primary_with_secondary(
-                hardware_parsed, sensor_combine_registers_modbus
-            )
-            logger.info(
-                f"  +subtotal de restristros por hardware: {len(hardware_combine_sensors_modbus)}"
-            )
-            # hardwares_combined += hardware_combine_sensors_modbus
-
-            # consultar todos os sensor DNP associado a cada hardware
-            sensors_dnp_parsed = []
-            sensors_dnp = await fetch_sensors_dnp(
-                host=configs.host,
-                auth_token=await configs.auth_token,
-                active=True,
-                hardware_id=hardware_id,
-            )
-            sensor_combine_registers_dnp = []
-            if not sensors_dnp["content"]:
-                logger.warning(f"O hardware id: {hardware_id} não tem sensores dnp3")
-            else:
-                print(f"Coleando sensores {len(sensors_dnp)} dnp3...")
-                for sensor_dnp in sensors_dnp[
-                    "content"
-                ]:  # informação de sensores modbus paginada
-                    sensor_dnp_id = sensor_dnp["id"]
-                    logger.info("  sensor_dnp_id", sensor_dnp_id)
-                    sensor_dnp_data = await fetch_sensor_dnp_by_id(
-                        host=configs.host,
-                        auth_token=await configs.auth_token,
-                        sensor_dnp_id=sensor_dnp_id,
-                    )
-                    list_sensors_dnp3.append(sensor_dnp_data)
-                    sensor_dnp_parsed = parse_sensor_dnp_data(sensor_dnp_data)
-                    sensors_dnp_parsed.append(sensor_dnp_parsed)
-                    sensors_parsed.append(sensor_parsed)
-                    # coletar os registros de cada sensor
-                    registers_dnp3 = await collect_registers_dnp(sensor_id)
-                    list_registers_dnp3 += registers_dnp3
-                    sensor_combine_registers_dnp += combine_primary_with_secondary(
-                        sensor_parsed, registers_dnp3
-                    )
-                    logger.info(
-                        "  +sub total resistros por sensor:",
-                        len(sensor_combine_registers_dnp),
-                    )
-                    if configs.DEBUG:
-                        break
-                    logger.info(
-                        "total de resgistro por sensor:", len(sensors_dnp_parsed)
-                    )
-            # combinar o resultado de hardware com o resultado de sensores
-            hardware_combine_sensors_dnp += combine_primary_with_secondary(
-                hardware_parsed, sensor_combine_registers_dnp
-            )
-            logger.info(
-                f"  +subtotal de restristros dnp por hardware: {len(hardware_combine_sensors_dnp)}"
-            )
-            if configs.DEBUG:
-                break
-        logger.info(f"total de sensores modbus: {len(hardware_combine_sensors_modbus)}")
-        logger.info(f"total de sensores dnp3: {len(hardware_combine_sensors_dnp)}")
-        all_flat_data += combine_primary_with_secondary(
-            gateway_parsed, hardware_combine_sensors_modbus
+
+    # coleta concorrente de toda a árvore, limitada por MAX_PARALLEL_REQUESTS
+    incremental = configs.INCREMENTAL if incremental is None else incremental
+    watermarks = WatermarkStore(configs.WATERMARK_DB_PATH) if incremental else None
+    checkpoint = configs.CHECKPOINT if checkpoint is None else checkpoint
+    journal = None
+    if checkpoint or resume:
+        journal = CheckpointJournal(configs.CHECKPOINT_DB_PATH)
+    http_cache = configs.HTTP_CACHE if http_cache is None else http_cache
+    cache = None
+    if http_cache:
+        cache = HttpCache(
+            configs.HTTP_CACHE_PATH,
+            ttl=configs.HTTP_CACHE_TTL,
+            max_entries=configs.HTTP_CACHE_MAX_ENTRIES,
         )
-        all_flat_data += combine_primary_with_secondary(
-            gateway_parsed, hardware_combine_sensors_dnp
+        set_http_cache(cache)
+    if resume:
+        logger.info(f"Retomando coleta: {len(journal)} subárvores no checkpoint")
+    elif journal is not None:
+        journal.clear()
+    output_dir = output_dir or configs.COLLECT_OUTPUT_DIR
+    parquet = configs.SNAPSHOT_PARQUET if parquet is None else parquet
+    if parquet and stream_formats and "parquet" not in stream_formats:
+        stream_formats = [*stream_formats, "parquet"]
+    sink = None
+    if stream_formats:
+        sink = create_output_sink(
+            stream_formats, gateways_founds, output_dir if multi_gateway else None
         )
-        logger.info(f"total acumulado por hardware: {len(all_flat_data)}")
-    logger.info(f"total de registros: {len(all_flat_data)}")
-    # Salvar os dados em um arquivo JSON
-    with open("data.json", "w") as f:
-        json.dump(all_flat_data, f)
+    crawler = CmaWebCrawler(
+        configs,
+        list_only=list_only,
+        watermarks=watermarks,
+        journal=journal,
+        sink=sink,
+    )
+    try:
+        if sink is not None:
+            await crawler.crawl(gateways_founds)
+            logger.info(f"total de registros: {sink.total_records}")
+        elif not multi_gateway:
+            result = await crawler.crawl(gateways_founds)
+            write_outputs(result, parquet=parquet)
+        else:
+            async for result in crawler.crawl_each(gateways_founds):
+                gateway = result.gateways[0]
+                partition = gateway_partition_dir(output_dir, gateway)
+                write_outputs(result, partition, parquet=parquet)
+                logger.info(f"Gateway {gateway['name']} salvo em {partition}")
+                print(f"Gateway {gateway['name']} salvo em {partition}")
+        # coleta completa: a próxima execução começa do zero
+        if journal is not None:
+            journal.clear()
+    finally:
+        if sink is not None:
+            sink.close()
+        if journal is not None:
+            if resume:
+                logger.info(
+                    f"Subárvores reaproveitadas do checkpoint: {journal.resumed}"
+                )
+            journal.close()
+        if watermarks is not None:
+            watermarks.close()
+        if cache is not None:
+            set_http_cache(None)
+            cache.close()
+            logger.info(f"Cache HTTP: {cache.stats.summary()}")
+            print(f"Cache HTTP: {cache.stats.summary()}")
+        logger.info(f"Concorrência adaptativa: {crawler.limiter.summary()}")
+        logger.info(f"Requisições deduplicadas: {crawler.coalescer.stats.summary()}")
+        print(f"Concorrência: {crawler.limiter.summary()}")
+        if crawler.list_only or incremental:
+            logger.info(crawler.detail_stats.summary())
+            print(crawler.detail_stats.summary())
+        for name, breaker in all_breakers().items():
+            if breaker.rejected:
+                logger.warning(
+                    f"Circuito '{name}' ({breaker.state}): "
+                    f"{breaker.rejected} chamadas recusadas sem acessar o serviço"
+                )
 
-    # verificar se o all_flat_data está vazio
-    if not all_flat_data:
-        logger.warning("Nenhum dado coletado")
-        return
 
-    # Criar um DataFrame
-    df = pd.DataFrame(all_flat_data)
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Coleta os dados da API CMA Web.")
+    parser.add_argument(
+        "--gateways",
+        default=configs.gateway_names,
+        help="Gateways a coletar, separados por vírgula; aceita curingas "
+        "(ex.: 'Gateway 01,Gateway 1*'). Padrão: GATEWAY_NAMES ou GATEWAY_NAME.",
+    )
+    parser.add_argument(
+        "--all-gateways",
+        action="store_true",
+        help="Coleta todos os gateways disponíveis na API.",
+    )
+    parser.add_argument(
+        "--list-only",
+        action="store_true",
+        default=None,
+        help="Usa os itens das listagens e só busca o detalhe quando faltam campos.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=None,
+        help="Só busca o detalhe das entidades cujo updatedAt mudou desde a última coleta.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Retoma uma coleta interrompida, reaproveitando as subárvores do checkpoint.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        default=None,
+        help="Grava o checkpoint das subárvores concluídas para um --resume posterior.",
+    )
+    parser.add_argument(
+        "--stream",
+        nargs="?",
+        const="json,sqlite",
+        default=configs.STREAM_FORMATS,
+        help="Grava os registros de cada sensor assim que coletados. Formatos "
+        "separados por vírgula entre json, jsonl, parquet (requer pyarrow) e "
+        "sqlite (padrão: json,sqlite).",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        default=None,
+        help="Grava também o snapshot colunar data.parquet (requer pyarrow).",
+    )
+    parser.add_argument(
+        "--http-cache",
+        action="store_true",
+        default=None,
+        help="Serve os detalhes de gateways, hardwares e sensores do cache em disco.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=configs.COLLECT_OUTPUT_DIR,
+        help="Diretório das partições por gateway na coleta múltipla.",
+    )
+    return parser.parse_args(argv)
+
 
-    # Conectar ao banco SQLite (ou criar um novo se não existir)
-    conn = sqlite3.connect("dados.db")
+def gateway_patterns(args: argparse.Namespace) -> Optional[List[str]]:
+    """Padrões de gateways da linha de comando (None = modo de gateway único)."""
+    if args.all_gateways:
+        return ["*"]
+    if args.gateways:
+        return [name.strip() for name in args.gateways.split(",") if name.strip()]
+    return None
 
-    # Salvar o DataFrame no banco, criando a tabela "dados" (ou sobrescrevendo se já existir)
-    df.to_sql("dados", conn, if_exists="replace", index=False)
 
-    # Salvar os acumuladores em arquivos JSON
-    with open("cma_gateways.json", "w") as f:
-        json.dump(list_gateways, f)
-    with open("cma_hardwares.json", "w") as f:
-        json.dump(list_hardwares, f)
-    # MODBUS
-    with open("cma_sensors_modbus.json", "w") as f:
-        json.dump(list_sensors_modbus, f)
-    with open("registers_modbus.json", "w") as f:
-        json.dump(list_registers_modbus, f)
-    # DNP3
-    with open("cma_sensors_dnp3.json", "w") as f:
-        json.dump(list_sensors_dnp3, f)
-    with open("cma_registers_dnp3.json", "w") as f:  # noqa
-        json.dump(list_registers_dnp3, f)
+def stream_formats(args: argparse.Namespace) -> Optional[List[str]]:
+    """Formatos da gravação incremental (None = gravação ao final da coleta)."""
+    if not args.stream:
+        return None
+    return [fmt.strip() for fmt in args.stream.split(",") if fmt.strip()]
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    try:
+        await collect(
+            gateway_patterns(args),
+            args.output_dir,
+            args.list_only,
+            args.incremental,
+            args.resume,
+            stream_formats(args),
+            args.parquet,
+            args.http_cache,
+            args.checkpoint,
+        )
+    finally:
+        logger.info(f"Pool HTTP: {http_client.stats.summary()}")
+        print(f"Pool HTTP: {http_client.stats.summary()}")
+        await configs.token_manager.close()
+        await http_client.close()
 
 
 if __name__ == "__main__":
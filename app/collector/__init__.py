@@ -0,0 +1 @@
+from .crawler import CmaWebCrawler, CollectionResult
@@ -0,0 +1,120 @@
+import json
+import sqlite3
+from typing import Any, Dict, Optional
+
+from .crawler import CollectionResult
+
+
+class CheckpointJournal:
+    """
+    Diário das subárvores (hardware e sensores) já coletadas em uma execução.
+
+    Cada sensor concluído é gravado com o seu `CollectionResult`; um hardware
+    concluído grava apenas um marcador com o seu detalhe e a lista dos seus
+    sensores, sem repetir os registros. Se a coleta for interrompida (timeout,
+    token expirado), uma nova execução com `--resume` reaproveita as subárvores
+    do diário e só busca na API o que ficou faltando.
+
+    O banco usa WAL com `synchronous=NORMAL` e as gravações são confirmadas em
+    lotes de `commit_every`; uma interrupção perde no máximo o último lote, que é
+    coletado de novo na retomada.
+
+    Args:
+        db_path (str): Caminho do banco SQLite (criado se não existir).
+        commit_every (int): Gravações por transação. Padrão: 100.
+    """
+
+    def __init__(self, db_path: str, commit_every: int = 100):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                kind TEXT NOT NULL,
+                id TEXT NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (kind, id)
+            )
+            """
+        )
+        self.conn.commit()
+        self.resumed = 0
+        self._pending = 0
+
+    def _get(self, kind: str, entity_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT result FROM checkpoints WHERE kind = ? AND id = ?",
+            (kind, str(entity_id)),
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _put(self, kind: str, entity_id: str, data: Dict[str, Any]):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO checkpoints (kind, id, result) VALUES (?, ?, ?)",
+            (kind, str(entity_id), json.dumps(data)),
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def load(self, kind: str, entity_id: str) -> Optional[CollectionResult]:
+        """Retorna o resultado salvo da subárvore ou None se ela não foi concluída."""
+        data = self._get(kind, entity_id)
+        if data is None:
+            return None
+        self.resumed += 1
+        return CollectionResult(**data)
+
+    def save(self, kind: str, entity_id: str, result: CollectionResult):
+        """Grava a subárvore concluída (confirmada no próximo lote)."""
+        self._put(kind, entity_id, result.to_dict())
+
+    def load_marker(self, kind: str, entity_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o marcador de conclusão salvo por `save_marker` ou None se a
+        subárvore não foi concluída.
+        """
+        data = self._get(kind, entity_id)
+        if data is None or "sensors" not in data:
+            return None
+        self.resumed += 1
+        return data
+
+    def save_marker(self, kind: str, entity_id: str, marker: Dict[str, Any]):
+        """
+        Grava o marcador de conclusão de uma subárvore cujos resultados estão nos
+        sensores do diário.
+
+        Args:
+            kind (str): Tipo da subárvore (ex.: "hardware").
+            entity_id (str): Id da entidade.
+            marker (dict): Detalhe da entidade e lista `sensors` de pares
+                [tipo, id] dos sensores, na ordem da listagem.
+        """
+        self._put(kind, entity_id, marker)
+
+    def commit(self):
+        """Confirma as gravações pendentes."""
+        self.conn.commit()
+        self._pending = 0
+
+    def clear(self):
+        """Descarta o diário (início de uma coleta nova ou coleta concluída)."""
+        self.conn.execute("DELETE FROM checkpoints")
+        self.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,547 @@
+import asyncio
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+
+from app.getters.gateway import fetch_gateway_by_id, parse_gateway_data
+from app.getters.hardware import (
+    fetch_hardware_by_id,
+    fetch_hardwares_by_gateway,
+    parse_hardware_data,
+)
+from app.getters.pagination import iter_items
+from app.getters.register import (
+    fetch_register_dnp_by_id,
+    fetch_register_modbus_by_id,
+    fetch_registers_dnp,
+    fetch_registers_modbus,
+    parse_register_dnp_data,
+    parse_register_modbus_data,
+)
+from app.getters.sensors import (
+    fetch_sensor_dnp_by_id,
+    fetch_sensor_modbus_by_id,
+    fetch_sensors_dnp,
+    fetch_sensors_modbus,
+    parse_sensor_dnp_data,
+    parse_sensor_modbus_data,
+)
+from app.logger import logger
+from app.utils.coalescing import RequestCoalescer
+from app.utils.limiter import AdaptiveLimiter, create_limiter
+
+from .field_requirements import DetailFetchStats, has_paths, required_paths
+from .records import RecordBatch, RecordList
+from .watermarks import WatermarkStore
+
+if TYPE_CHECKING:
+    from .checkpoint import CheckpointJournal
+    from .sinks import RecordSink
+
+# gateway da subárvore em coleta; herdado pelas tarefas filhas do asyncio.gather
+current_gateway: ContextVar[str] = ContextVar("current_gateway", default=None)
+# tarefas de detalhe (gateway, hardware) dos ancestrais da subárvore em coleta,
+# cada uma retornando (detalhe, detalhe parseado); usadas para achatar os
+# registros de cada sensor em uma única passada
+parent_details: ContextVar[tuple] = ContextVar("parent_details", default=())
+
+
+# campos de CollectionResult com um item por registro, guardados em RecordList
+RECORD_FIELDS = ("registers_modbus", "registers_dnp3", "flat_modbus", "flat_dnp3")
+
+
+@dataclass
+class CollectionResult:
+    """
+    Resultado da coleta de uma subárvore (gateway, hardware ou sensor).
+
+    Os registros (parseados e achatados) ficam em `RecordList`, na representação
+    compacta de `RecordBatch`; listas de dicionários passadas ao construtor são
+    convertidas.
+    """
+
+    gateways: List[dict] = field(default_factory=list)
+    hardwares: List[dict] = field(default_factory=list)
+    sensors_modbus: List[dict] = field(default_factory=list)
+    registers_modbus: RecordList = field(default_factory=RecordList)
+    sensors_dnp3: List[dict] = field(default_factory=list)
+    registers_dnp3: RecordList = field(default_factory=RecordList)
+    flat_modbus: RecordList = field(default_factory=RecordList)
+    flat_dnp3: RecordList = field(default_factory=RecordList)
+
+    def __post_init__(self):
+        for name in RECORD_FIELDS:
+            setattr(self, name, RecordList.of(getattr(self, name)))
+
+    def to_dict(self) -> Dict[str, List[dict]]:
+        """Resultado com os registros como listas de dicionários (ex.: JSON)."""
+        return {
+            name: list(getattr(self, name)) for name in self.__dataclass_fields__
+        }
+
+    @property
+    def flat_data(self) -> RecordList:
+        """Registros achatados (gateway + hardware + sensor + registro)."""
+        return self.flat_modbus + self.flat_dnp3
+
+    def extend(self, other: "CollectionResult"):
+        self.gateways += other.gateways
+        self.hardwares += other.hardwares
+        self.sensors_modbus += other.sensors_modbus
+        self.registers_modbus += other.registers_modbus
+        self.sensors_dnp3 += other.sensors_dnp3
+        self.registers_dnp3 += other.registers_dnp3
+        self.flat_modbus += other.flat_modbus
+        self.flat_dnp3 += other.flat_dnp3
+
+    @classmethod
+    def merge(cls, results: List["CollectionResult"]) -> "CollectionResult":
+        merged = cls()
+        for result in results:
+            merged.extend(result)
+        return merged
+
+
+class CmaWebCrawler:
+    """
+    Percorre a árvore gateway → hardware → sensor → registro da API CMA Web.
+
+    Cada nível é expandido em paralelo (hardwares de um gateway, sensores de um
+    hardware e os ramos Modbus e DNP3 de cada hardware), enquanto o número de
+    requisições simultâneas fica limitado por um único orçamento global
+    (`AdaptiveLimiter`, que parte de `MAX_PARALLEL_REQUESTS` e se ajusta à latência
+    e aos erros da API). O orçamento é aplicado apenas às requisições HTTP, nunca
+    às subárvores, de modo que um nível aguardando seus filhos não ocupa vagas do
+    orçamento.
+
+    Quando vários gateways são coletados juntos, as vagas do orçamento são
+    repartidas em rodízio entre eles (`FairBudget`), evitando que um gateway muito
+    grande monopolize as requisições.
+
+    No modo `list_only` a requisição de detalhe (`/<entidade>/{id}`) só é feita
+    quando o item da listagem não traz todos os campos lidos pelo `parse_*`
+    correspondente; `detail_stats` registra quantas requisições foram evitadas.
+
+    Com um `WatermarkStore` (coleta incremental), o detalhe também não é buscado
+    quando o `updatedAt` do item da listagem é o mesmo da execução anterior: o
+    detalhe salvo é reaproveitado e só as entidades alteradas vão à API.
+
+    Com um `CheckpointJournal`, cada subárvore de hardware e de sensor concluída é
+    gravada no diário; subárvores já presentes no diário (execução retomada) são
+    devolvidas sem nenhuma requisição.
+
+    Com um `RecordSink`, os registros de cada sensor são combinados com o hardware
+    e o gateway e gravados assim que a subárvore do sensor termina; os níveis
+    superiores não acumulam os resultados (a coleta retorna um resultado vazio) e
+    o pico de memória passa a depender da concorrência, não do tamanho da frota.
+    Nesse modo o checkpoint é feito apenas por sensor.
+
+    Durante `crawl`/`crawl_each`, GETs idênticos compartilham uma única requisição
+    e os detalhes de gateways, hardwares e sensores são memorizados até o fim da
+    coleta (`RequestCoalescer`); `coalescer.stats` conta as requisições evitadas.
+    """
+
+    # campos lidos por cada parser, descobertos uma única vez
+    REQUIRED_PATHS = {
+        "gateway": required_paths(parse_gateway_data),
+        "hardware": required_paths(parse_hardware_data),
+        "sensor_modbus": required_paths(parse_sensor_modbus_data),
+        "sensor_dnp3": required_paths(parse_sensor_dnp_data),
+        "register_modbus": required_paths(parse_register_modbus_data),
+        "register_dnp3": required_paths(parse_register_dnp_data),
+    }
+
+    def __init__(
+        self,
+        configs,
+        max_parallel_requests: int = None,
+        list_only: bool = None,
+        watermarks: WatermarkStore = None,
+        journal: "CheckpointJournal" = None,
+        sink: "RecordSink" = None,
+    ):
+        self.configs = configs
+        self.limiter: AdaptiveLimiter = create_limiter(configs, max_parallel_requests)
+        self.list_only = configs.LIST_ONLY if list_only is None else list_only
+        self.detail_stats = DetailFetchStats()
+        self.watermarks = watermarks
+        self.journal = journal
+        self.sink = sink
+        self.coalescer = RequestCoalescer()
+
+    async def _fetch(self, getter: Callable, **kwargs) -> Any:
+        """Executa um getter dentro do orçamento global de requisições."""
+        async with self.limiter.slot(current_gateway.get()):
+            return await getter(
+                host=self.configs.host,
+                auth_token=await self.configs.auth_token,
+                **kwargs,
+            )
+
+    async def _fetch_detail(
+        self, kind: str, item: Dict[str, Any], getter: Callable, **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Retorna o detalhe de um item da listagem, reaproveitando o próprio item
+        no modo `list_only` quando ele já contém os campos exigidos pelo parser,
+        ou o detalhe da execução anterior quando seu `updatedAt` não mudou.
+        """
+        if self.list_only and has_paths(item, self.REQUIRED_PATHS[kind]):
+            self.detail_stats.record(kind, avoided=True)
+            return item
+        if self.watermarks is not None:
+            previous = self.watermarks.lookup(kind, item)
+            if previous is not None:
+                self.detail_stats.record(kind, avoided=True)
+                return previous
+        self.detail_stats.record(kind, avoided=False)
+        data = await self._fetch(getter, **kwargs)
+        if self.watermarks is not None:
+            self.watermarks.store(kind, data)
+        return data
+
+    async def _checkpointed(
+        self,
+        kind: str,
+        entity_id: str,
+        crawl: Callable[[], Awaitable[CollectionResult]],
+    ) -> CollectionResult:
+        """Reaproveita o sensor do diário de checkpoint ou o coleta e o registra."""
+        if self.journal is None:
+            return await crawl()
+        saved = self.journal.load(kind, entity_id)
+        if saved is not None:
+            logger.info(f"  subárvore {kind} {entity_id} retomada do checkpoint")
+            return saved
+        result = await crawl()
+        self.journal.save(kind, entity_id, result)
+        return result
+
+    async def _fetch_parent(
+        self, kind: str, item: Dict[str, Any], getter: Callable, parser: Callable, **kwargs
+    ) -> tuple:
+        """Busca o detalhe de um ancestral (gateway ou hardware) e o parseia uma vez."""
+        data = await self._fetch_detail(kind, item, getter, **kwargs)
+        return data, parser(data)
+
+    async def _flatten(
+        self, sensor_parsed: Dict[str, Any], registers: RecordBatch
+    ) -> RecordBatch:
+        """
+        Achata os registros de um sensor com o sensor, o hardware e o gateway: os
+        campos dos ancestrais são fundidos uma única vez em um prefixo
+        compartilhado pelos registros do sensor; em chaves repetidas prevalece o
+        mais próximo (registro > sensor > hardware > gateway).
+        """
+        parents = await asyncio.gather(*parent_details.get())
+        prefix = {}
+        for parsed in [parsed for _, parsed in parents] + [sensor_parsed]:
+            prefix.update(parsed)
+        return registers.with_prefix(prefix)
+
+    async def _emit_sensor(self, result: CollectionResult) -> CollectionResult:
+        """
+        Sem sink, devolve o resultado do sensor para os níveis superiores. Com sink,
+        grava-o e devolve um resultado vazio.
+        """
+        if self.sink is None:
+            return result
+        self.sink.write(result)
+        return CollectionResult()
+
+    def _fetch_items(self, getter: Callable, **kwargs) -> AsyncIterator[dict]:
+        """Itera sobre todos os itens de uma listagem paginada, página a página."""
+        size = self.configs.MAX_PAGE_SIZE
+        return iter_items(
+            lambda page: self._fetch(getter, page=page, size=size, **kwargs),
+            prefetch=self.configs.PAGE_PREFETCH,
+            size=size,
+        )
+
+    async def _map_stream(
+        self,
+        items: AsyncIterator[dict],
+        handler: Callable,
+        first_only: bool = False,
+    ) -> list:
+        """
+        Dispara `handler` para cada item assim que ele chega da listagem e aguarda
+        todos, preservando a ordem dos itens.
+        """
+        tasks = []
+        try:
+            async for item in items:
+                tasks.append(asyncio.create_task(handler(item)))
+                if first_only:
+                    break
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            await items.aclose()
+
+    def _limit(self, items: List[dict]) -> List[dict]:
+        """Em modo DEBUG apenas o primeiro item de cada nível é coletado."""
+        return items[:1] if self.configs.DEBUG else items
+
+    async def crawl(self, gateways: List[dict]) -> CollectionResult:
+        """Coleta todos os gateways informados em paralelo."""
+        with self.coalescer.activate():
+            results = await asyncio.gather(
+                *(self.crawl_gateway(gateway) for gateway in gateways)
+            )
+        return CollectionResult.merge(results)
+
+    async def crawl_each(self, gateways: List[dict]) -> AsyncIterator[CollectionResult]:
+        """
+        Coleta os gateways em paralelo, entregando o resultado de cada um assim que
+        ele termina (ordem de conclusão, não de entrada).
+        """
+        with self.coalescer.activate():
+            tasks = [asyncio.create_task(self.crawl_gateway(gw)) for gw in gateways]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def crawl_gateway(self, gateway: Dict[str, Any]) -> CollectionResult:
+        gateway_id = gateway["id"]
+        current_gateway.set(gateway_id)
+        logger.info(f"gateway name: {gateway['name']}")
+        gateway_task = asyncio.ensure_future(
+            self._fetch_parent(
+                "gateway",
+                gateway,
+                fetch_gateway_by_id,
+                parse_gateway_data,
+                gateway_id=gateway_id,
+            )
+        )
+        parent_details.set((gateway_task,))
+        (gateway_data, _), hardwares = await asyncio.gather(
+            gateway_task,
+            self._fetch(fetch_hardwares_by_gateway, cma_gateway_id=gateway_id),
+        )
+
+        hardware_results = await asyncio.gather(
+            *(self.crawl_hardware(hardware) for hardware in self._limit(hardwares))
+        )
+        if self.sink is not None:
+            self.sink.write(CollectionResult(gateways=[gateway_data]))
+            return CollectionResult()
+        result = CollectionResult.merge(hardware_results)
+        result.gateways.insert(0, gateway_data)
+        logger.info(f"total de sensores modbus: {len(result.flat_modbus)}")
+        logger.info(f"total de sensores dnp3: {len(result.flat_dnp3)}")
+        return result
+
+    async def crawl_hardware(self, hardware: Dict[str, Any]) -> CollectionResult:
+        if self.journal is not None:
+            resumed = self._resume_hardware(hardware["id"])
+            if resumed is not None:
+                hardware_data, sensor_results = resumed
+                logger.info(
+                    f"  subárvore hardware {hardware['id']} retomada do checkpoint"
+                )
+                sensor_results = [
+                    await self._emit_sensor(result) for result in sensor_results
+                ]
+                return self._hardware_result(hardware_data, sensor_results)
+        return await self._crawl_hardware(hardware)
+
+    def _resume_hardware(self, hardware_id: str) -> Optional[tuple]:
+        """
+        Detalhe do hardware e resultados dos seus sensores, lidos do diário, ou
+        None se o hardware não foi concluído (ou algum sensor falta no diário).
+        """
+        marker = self.journal.load_marker("hardware", hardware_id)
+        if marker is None:
+            return None
+        sensor_results = []
+        for kind, sensor_id in marker["sensors"]:
+            result = self.journal.load(kind, sensor_id)
+            if result is None:
+                return None
+            sensor_results.append(result)
+        return marker["hardware"], sensor_results
+
+    async def _crawl_hardware(self, hardware: Dict[str, Any]) -> CollectionResult:
+        hardware_id = hardware["id"]
+        logger.info(f"  nome hardware {hardware['name']}")
+        # sensores de cada ramo, na ordem da listagem (marcador do checkpoint)
+        modbus_ids, dnp_ids = [], []
+
+        def listed(ids: list, handler: Callable) -> Callable:
+            def track(sensor: Dict[str, Any]) -> Awaitable[CollectionResult]:
+                ids.append(sensor["id"])
+                return handler(sensor)
+
+            return track
+
+        # ramos Modbus e DNP3 em paralelo; cada sensor é coletado assim que chega
+        # da listagem paginada
+        hardware_task = asyncio.ensure_future(
+            self._fetch_parent(
+                "hardware",
+                hardware,
+                fetch_hardware_by_id,
+                parse_hardware_data,
+                hardware_id=hardware_id,
+            )
+        )
+        parent_details.set(parent_details.get() + (hardware_task,))
+        (hardware_data, _), modbus_results, dnp_results = await asyncio.gather(
+            hardware_task,
+            self._map_stream(
+                self._fetch_items(fetch_sensors_modbus, hardware_id=hardware_id),
+                listed(modbus_ids, self.crawl_sensor_modbus),
+                first_only=self.configs.DEBUG,
+            ),
+            self._map_stream(
+                self._fetch_items(
+                    fetch_sensors_dnp, active=True, hardware_id=hardware_id
+                ),
+                listed(dnp_ids, self.crawl_sensor_dnp),
+                first_only=self.configs.DEBUG,
+            ),
+        )
+        if not modbus_results:
+            logger.warning(f"O hardware id: {hardware_id} não tem sensores modbus")
+        if not dnp_results:
+            logger.warning(f"O hardware id: {hardware_id} não tem sensores dnp3")
+
+        if self.journal is not None:
+            # os registros já estão nos sensores do diário: o hardware só marca a
+            # conclusão
+            sensors = [["sensor_modbus", sensor_id] for sensor_id in modbus_ids]
+            sensors += [["sensor_dnp3", sensor_id] for sensor_id in dnp_ids]
+            self.journal.save_marker(
+                "hardware", hardware_id, {"hardware": hardware_data, "sensors": sensors}
+            )
+        return self._hardware_result(hardware_data, modbus_results + dnp_results)
+
+    def _hardware_result(
+        self, hardware_data: Dict[str, Any], sensor_results: List[CollectionResult]
+    ) -> CollectionResult:
+        """
+        Sem sink, junta os resultados dos sensores sob o hardware. Com sink, grava
+        o hardware e devolve um resultado vazio.
+        """
+        if self.sink is not None:
+            self.sink.write(CollectionResult(hardwares=[hardware_data]))
+            return CollectionResult()
+        result = CollectionResult.merge(sensor_results)
+        result.hardwares.insert(0, hardware_data)
+        logger.info(
+            f"  +subtotal de registros por hardware: "
+            f"modbus {len(result.flat_modbus)}, dnp3 {len(result.flat_dnp3)}"
+        )
+        return result
+
+    async def crawl_sensor_modbus(self, sensor: Dict[str, Any]) -> CollectionResult:
+        result = await self._checkpointed(
+            "sensor_modbus", sensor["id"], lambda: self._crawl_sensor_modbus(sensor)
+        )
+        return await self._emit_sensor(result)
+
+    async def _crawl_sensor_modbus(self, sensor: Dict[str, Any]) -> CollectionResult:
+        sensor_id = sensor["id"]
+        logger.info(f"   Nome sensor modbus: {sensor['name']}")
+        sensor_data, registers = await asyncio.gather(
+            self._fetch_detail(
+                "sensor_modbus",
+                sensor,
+                fetch_sensor_modbus_by_id,
+                sensor_modbus_id=sensor_id,
+            ),
+            self.collect_registers_modbus(sensor_id),
+        )
+        sensor_parsed = parse_sensor_modbus_data(sensor_data)
+        return CollectionResult(
+            sensors_modbus=[sensor_data],
+            registers_modbus=registers,
+            flat_modbus=await self._flatten(sensor_parsed, registers),
+        )
+
+    async def crawl_sensor_dnp(self, sensor: Dict[str, Any]) -> CollectionResult:
+        result = await self._checkpointed(
+            "sensor_dnp3", sensor["id"], lambda: self._crawl_sensor_dnp(sensor)
+        )
+        return await self._emit_sensor(result)
+
+    async def _crawl_sensor_dnp(self, sensor: Dict[str, Any]) -> CollectionResult:
+        sensor_id = sensor["id"]
+        logger.info(f"   Nome sensor dnp3: {sensor['name']}")
+        sensor_data, registers = await asyncio.gather(
+            self._fetch_detail(
+                "sensor_dnp3", sensor, fetch_sensor_dnp_by_id, sensor_dnp_id=sensor_id
+            ),
+            self.collect_registers_dnp(sensor_id),
+        )
+        sensor_parsed = parse_sensor_dnp_data(sensor_data)
+        return CollectionResult(
+            sensors_dnp3=[sensor_data],
+            registers_dnp3=registers,
+            flat_dnp3=await self._flatten(sensor_parsed, registers),
+        )
+
+    async def collect_registers_modbus(self, sensor_modbus_id: str) -> RecordBatch:
+        registers = RecordBatch.compact(
+            parse_register_modbus_data.columns,
+            await self._map_stream(
+                self._fetch_items(
+                    fetch_registers_modbus, sensor_modbus_id=sensor_modbus_id
+                ),
+                self.fetch_and_parse_register_modbus,
+            ),
+        )
+        logger.info(
+            f"   - Coletados {len(registers)} registros modbus sensor id: {sensor_modbus_id}"
+        )
+        return registers
+
+    async def collect_registers_dnp(self, sensor_dnp_id: str) -> RecordBatch:
+        registers = RecordBatch.compact(
+            parse_register_dnp_data.columns,
+            await self._map_stream(
+                self._fetch_items(fetch_registers_dnp, sensor_dnp_id=sensor_dnp_id),
+                self.fetch_and_parse_register_dnp,
+            ),
+        )
+        logger.info(
+            f"   - Coletados {len(registers)} registros dnp3 sensor id: {sensor_dnp_id}"
+        )
+        return registers
+
+    async def fetch_and_parse_register_modbus(self, register: Dict[str, Any]) -> tuple:
+        """Detalhe do registro parseado em uma tupla (`parse_register_modbus_data.row`)."""
+        register_data = await self._fetch_detail(
+            "register_modbus",
+            register,
+            fetch_register_modbus_by_id,
+            register_modbus_id=register["id"],
+        )
+        return parse_register_modbus_data.row(register_data)
+
+    async def fetch_and_parse_register_dnp(self, register: Dict[str, Any]) -> tuple:
+        """Detalhe do registro parseado em uma tupla (`parse_register_dnp_data.row`)."""
+        register_data = await self._fetch_detail(
+            "register_dnp3",
+            register,
+            fetch_register_dnp_by_id,
+            register_dnp_id=register["id"],
+        )
+        return parse_register_dnp_data.row(register_data)
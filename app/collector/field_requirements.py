@@ -0,0 +1,89 @@
+from collections import Counter
+from typing import Any, Callable, Dict, FrozenSet, Set, Tuple
+
+Path = Tuple[str, ...]
+
+
+class _AccessRecorder(dict):
+    """Dicionário vazio que registra todos os caminhos de chaves consultados."""
+
+    def __init__(self, path: Path, paths: Set[Path]):
+        super().__init__()
+        self._path = path
+        self._paths = paths
+
+    def _child(self, key) -> "_AccessRecorder":
+        path = self._path + (key,)
+        self._paths.add(path)
+        return _AccessRecorder(path, self._paths)
+
+    def get(self, key, default=None):
+        return self._child(key)
+
+    def __getitem__(self, key):
+        return self._child(key)
+
+
+def required_paths(parser: Callable[[dict], Any]) -> FrozenSet[Path]:
+    """
+    Descobre quais caminhos de campos um `parse_*` lê do JSON da API.
+
+    Parsers gerados por `compile_parser` informam seus caminhos (`paths`). Os
+    demais são executados uma vez sobre um dicionário que registra cada `.get` (e
+    os `.get` encadeados, ex.: `data.get("sensorModbus", {}).get("ip")`). Apenas
+    os caminhos folha são retornados.
+
+    Args:
+        parser (Callable): Função de parse (ex.: `parse_register_modbus_data`).
+
+    Returns:
+        frozenset: Caminhos folha, ex.: {("id",), ("sensorModbus", "ip"), ...}.
+    """
+    if getattr(parser, "paths", None) is not None:
+        return frozenset(parser.paths)
+    paths: Set[Path] = set()
+    parser(_AccessRecorder((), paths))
+    prefixes = {path[:i] for path in paths for i in range(1, len(path))}
+    return frozenset(paths - prefixes)
+
+
+def has_paths(item: Dict[str, Any], paths: FrozenSet[Path]) -> bool:
+    """
+    Indica se `item` contém todos os caminhos informados.
+
+    Um caminho é considerado presente quando todas as chaves existem ou quando um
+    nível intermediário existe com valor não-dicionário (ex.: `"substation": None`),
+    pois nesse caso o detalhe não traria informação adicional para o parser.
+    """
+    for path in paths:
+        current = item
+        for key in path:
+            if not isinstance(current, dict):
+                break
+            if key not in current:
+                return False
+            current = current[key]
+    return True
+
+
+class DetailFetchStats:
+    """Contabiliza, por tipo de entidade, os detalhes buscados e os evitados."""
+
+    def __init__(self):
+        self.fetched = Counter()
+        self.avoided = Counter()
+
+    def record(self, kind: str, avoided: bool):
+        (self.avoided if avoided else self.fetched)[kind] += 1
+
+    @property
+    def total_avoided(self) -> int:
+        return sum(self.avoided.values())
+
+    def summary(self) -> str:
+        kinds = sorted(set(self.fetched) | set(self.avoided))
+        details = ", ".join(
+            f"{kind}: {self.avoided[kind]} evitados/{self.fetched[kind]} buscados"
+            for kind in kinds
+        )
+        return f"Requisições de detalhe evitadas: {self.total_avoided} ({details})"
@@ -0,0 +1,191 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+
+class RecordBatch(Sequence):
+    """
+    Registros com as mesmas colunas, guardados de forma compacta.
+
+    As colunas ficam uma única vez no lote e cada registro é uma tupla de valores
+    (em vez de um dicionário com ~80 chaves por registro). Os campos herdados dos
+    ancestrais (gateway, hardware e sensor) ficam em um único dicionário `prefix`
+    compartilhado por todos os registros do lote; os registros achatados de um
+    sensor e os seus registros parseados compartilham as mesmas tuplas.
+
+    Os dicionários são montados apenas na leitura (`batch[i]`, iteração), com a
+    ordem de chaves do achatamento: primeiro o prefixo e, nas chaves repetidas,
+    o valor do registro.
+
+    Args:
+        columns (tuple): Nomes das colunas dos registros.
+        rows (list): Valores de cada registro, na ordem de `columns`.
+        prefix (dict, optional): Campos comuns a todos os registros.
+    """
+
+    __slots__ = ("columns", "rows", "prefix")
+
+    def __init__(
+        self,
+        columns: Tuple[str, ...],
+        rows: List[tuple],
+        prefix: Optional[Dict[str, Any]] = None,
+    ):
+        self.columns = tuple(columns)
+        self.rows = rows
+        self.prefix = prefix
+
+    @classmethod
+    def compact(cls, columns: Tuple[str, ...], rows: Iterable[tuple]) -> "RecordBatch":
+        """
+        Cria o lote compartilhando os textos repetidos entre os registros.
+
+        Os valores de texto iguais (ex.: nome do sensor, unidade, tipo de registro,
+        que vêm repetidos em cada registro da API) passam a ser um único objeto. O
+        dicionário de deduplicação vale apenas durante a criação do lote, de modo
+        que valores únicos (IDs, datas) não ocupam memória extra.
+        """
+        pool: Dict[str, str] = {}
+        intern = pool.setdefault
+        return cls(
+            columns,
+            [
+                tuple(intern(value, value) if type(value) is str else value for value in row)
+                for row in rows
+            ],
+        )
+
+    def with_prefix(self, prefix: Dict[str, Any]) -> "RecordBatch":
+        """Mesmos registros (sem cópia) achatados com os campos de `prefix`."""
+        return RecordBatch(self.columns, self.rows, prefix)
+
+    def keys(self) -> List[str]:
+        """Chaves dos dicionários montados, na ordem em que aparecem."""
+        if not self.prefix:
+            return list(self.columns)
+        return list(dict.fromkeys([*self.prefix, *self.columns]))
+
+    def _record(self, row: tuple) -> Dict[str, Any]:
+        record = dict(self.prefix) if self.prefix else {}
+        record.update(zip(self.columns, row))
+        return record
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(row) for row in self.rows[index]]
+        return self._record(self.rows[index])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in self.rows:
+            yield self._record(row)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def column(self, name: str) -> list:
+        """Valores de uma coluna (None onde ela não existe)."""
+        if name in self.columns:
+            position = self.columns.index(name)
+            return [row[position] for row in self.rows]
+        value = self.prefix.get(name) if self.prefix else None
+        return [value] * len(self.rows)
+
+
+class RecordList(Sequence):
+    """
+    Sequência de registros formada por lotes (`RecordBatch`).
+
+    Usada em `CollectionResult` para os registros parseados e achatados: juntar os
+    resultados de sensores, hardwares e gateways apenas junta os lotes, sem copiar
+    registros. Aceita listas de dicionários (ex.: resultados de checkpoint e
+    testes), convertidas em lotes de colunas iguais.
+    """
+
+    __slots__ = ("batches",)
+
+    def __init__(self, batches: Iterable[RecordBatch] = ()):
+        self.batches: List[RecordBatch] = [batch for batch in batches if len(batch)]
+
+    @classmethod
+    def of(cls, records: Iterable[Any]) -> "RecordList":
+        """Converte `records` (RecordList, RecordBatch ou dicionários)."""
+        if isinstance(records, RecordList):
+            return records
+        if isinstance(records, RecordBatch):
+            return cls([records])
+        return cls.from_dicts(records)
+
+    @classmethod
+    def from_dicts(cls, records: Iterable[Dict[str, Any]]) -> "RecordList":
+        """Agrupa dicionários consecutivos com as mesmas chaves em lotes."""
+        batches = []
+        columns, rows = None, []
+        for record in records:
+            keys = tuple(record)
+            if keys != columns:
+                if rows:
+                    batches.append(RecordBatch.compact(columns, rows))
+                columns, rows = keys, []
+            rows.append(tuple(record.values()))
+        if rows:
+            batches.append(RecordBatch.compact(columns, rows))
+        return cls(batches)
+
+    def extend(self, records: Iterable[Any]):
+        self.batches += RecordList.of(records).batches
+
+    def __iadd__(self, records: Iterable[Any]) -> "RecordList":
+        self.extend(records)
+        return self
+
+    def __add__(self, records: Iterable[Any]) -> "RecordList":
+        return RecordList(self.batches + RecordList.of(records).batches)
+
+    def __radd__(self, records: Iterable[Any]) -> "RecordList":
+        return RecordList(RecordList.of(records).batches + self.batches)
+
+    def __len__(self) -> int:
+        return sum(len(batch) for batch in self.batches)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for batch in self.batches:
+            yield from batch
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if index >= 0:
+            for batch in self.batches:
+                if index < len(batch):
+                    return batch[index]
+                index -= len(batch)
+        raise IndexError("RecordList index out of range")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (RecordList, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        preview = ", ".join(repr(record) for record in islice(self, 3))
+        more = ", ..." if len(self) > 3 else ""
+        return f"RecordList([{preview}{more}])"
+
+    def columns(self) -> List[str]:
+        """União das chaves de todos os registros, na ordem em que aparecem."""
+        return list(dict.fromkeys(key for batch in self.batches for key in batch.keys()))
+
+    def to_columns(self) -> Dict[str, list]:
+        """Registros em colunas (`{coluna: [valores]}`), sem montar os dicionários."""
+        columns = {name: [] for name in self.columns()}
+        for batch in self.batches:
+            for name, values in columns.items():
+                values += batch.column(name)
+        return columns
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame com uma linha por registro (como `pd.DataFrame(list(self))`)."""
+        return pd.DataFrame(self.to_columns())
@@ -0,0 +1,288 @@
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List
+
+from app.utils import json_codec
+from app.utils.columnar import ParquetSnapshotWriter
+
+from .crawler import CollectionResult, current_gateway
+
+# arquivos de entidades gravados junto com o data.json (mesmos nomes da coleta)
+ACCUMULATOR_FILES = {
+    "gateways": "cma_gateways.json",
+    "hardwares": "cma_hardwares.json",
+    # MODBUS
+    "sensors_modbus": "cma_sensors_modbus.json",
+    "registers_modbus": "registers_modbus.json",
+    # DNP3
+    "sensors_dnp3": "cma_sensors_dnp3.json",
+    "registers_dnp3": "cma_registers_dnp3.json",
+}
+
+
+class RecordSink(ABC):
+    """
+    Destino dos dados coletados, gravados à medida que cada subárvore termina.
+
+    O crawler chama `write` com o resultado de cada sensor (registros achatados já
+    combinados com hardware e gateway) e com as entidades de cada hardware e
+    gateway, de modo que nenhum nível precisa manter toda a coleta em memória.
+    """
+
+    total_records = 0
+
+    @abstractmethod
+    def write(self, result: CollectionResult):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class JsonArrayWriter:
+    """Grava um array JSON item a item, sem montar a lista em memória."""
+
+    def __init__(self, path: str):
+        self.file = open(path, "wb")
+        self.file.write(b"[")
+        self.count = 0
+
+    def write_many(self, items: Iterable[Any]):
+        for item in items:
+            if self.count:
+                self.file.write(b", ")
+            json_codec.dump(item, self.file)
+            self.count += 1
+
+    def close(self):
+        self.file.write(b"]")
+        self.file.close()
+
+
+class JsonSink(RecordSink):
+    """
+    Grava `data.json` e os arquivos de entidades (`cma_gateways.json`, ...) no mesmo
+    formato da coleta em lote (arrays JSON), porém de forma incremental.
+    """
+
+    def __init__(self, output_dir: str = "."):
+        os.makedirs(output_dir, exist_ok=True)
+        self.data = JsonArrayWriter(os.path.join(output_dir, "data.json"))
+        self.accumulators = {
+            attr: JsonArrayWriter(os.path.join(output_dir, file_name))
+            for attr, file_name in ACCUMULATOR_FILES.items()
+        }
+
+    @property
+    def total_records(self) -> int:
+        return self.data.count
+
+    def write(self, result: CollectionResult):
+        self.data.write_many(result.flat_modbus)
+        self.data.write_many(result.flat_dnp3)
+        for attr, writer in self.accumulators.items():
+            writer.write_many(getattr(result, attr))
+
+    def close(self):
+        self.data.close()
+        for writer in self.accumulators.values():
+            writer.close()
+
+
+class JsonLinesSink(RecordSink):
+    """Grava os registros achatados em `data.jsonl` (um objeto JSON por linha)."""
+
+    def __init__(self, output_dir: str = "."):
+        os.makedirs(output_dir, exist_ok=True)
+        self.file = open(os.path.join(output_dir, "data.jsonl"), "wb")
+        self.total_records = 0
+
+    def write(self, result: CollectionResult):
+        for record in result.flat_data:
+            self.file.write(json_codec.dumps_bytes(record))
+            self.file.write(b"\n")
+            self.total_records += 1
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink(RecordSink):
+    """Grava os registros achatados no snapshot colunar `data.parquet` (requer pyarrow)."""
+
+    def __init__(self, output_dir: str = "."):
+        os.makedirs(output_dir, exist_ok=True)
+        self.writer = ParquetSnapshotWriter(os.path.join(output_dir, "data.parquet"))
+
+    @property
+    def total_records(self) -> int:
+        return self.writer.count
+
+    def write(self, result: CollectionResult):
+        self.writer.write_many(result.flat_data)
+
+    def close(self):
+        self.writer.close()
+
+
+class SQLiteSink(RecordSink):
+    """
+    Grava os registros achatados na tabela `dados` de `dados.db` com inserções em
+    lote.
+
+    A tabela é recriada na abertura (como o `to_sql(if_exists="replace")` da
+    coleta em lote) e ganha novas colunas conforme aparecem campos novos (ex.: os
+    registros DNP3 depois dos Modbus).
+
+    Args:
+        output_dir (str): Diretório do `dados.db`.
+        table (str): Nome da tabela. Padrão: "dados".
+        batch_size (int): Registros acumulados antes de cada `executemany`.
+    """
+
+    def __init__(self, output_dir: str = ".", table: str = "dados", batch_size: int = 500):
+        os.makedirs(output_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(output_dir, "dados.db"))
+        self.table = table
+        self.batch_size = batch_size
+        self.columns: List[str] = []
+        self._batch: List[Dict[str, Any]] = []
+        self.total_records = 0
+        self.conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        self.conn.commit()
+
+    def write(self, result: CollectionResult):
+        self._batch.extend(result.flat_data)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def _ensure_columns(self, records: List[Dict[str, Any]]):
+        new_columns = []
+        known = set(self.columns)
+        for record in records:
+            for key in record:
+                if key not in known:
+                    known.add(key)
+                    new_columns.append(key)
+        if not new_columns:
+            return
+        if not self.columns:
+            definition = ", ".join(f'"{column}"' for column in new_columns)
+            self.conn.execute(f'CREATE TABLE "{self.table}" ({definition})')
+        else:
+            for column in new_columns:
+                self.conn.execute(f'ALTER TABLE "{self.table}" ADD COLUMN "{column}"')
+        self.columns += new_columns
+
+    @staticmethod
+    def _to_sql_value(value: Any) -> Any:
+        if isinstance(value, (dict, list)):
+            return json_codec.dumps(value)
+        return value
+
+    def flush(self):
+        """Insere em lote os registros pendentes e confirma a transação."""
+        if not self._batch:
+            return
+        self._ensure_columns(self._batch)
+        placeholders = ", ".join("?" for _ in self.columns)
+        names = ", ".join(f'"{column}"' for column in self.columns)
+        self.conn.executemany(
+            f'INSERT INTO "{self.table}" ({names}) VALUES ({placeholders})',
+            (
+                [self._to_sql_value(record.get(column)) for column in self.columns]
+                for record in self._batch
+            ),
+        )
+        self.conn.commit()
+        self.total_records += len(self._batch)
+        self._batch.clear()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class MultiSink(RecordSink):
+    """Repassa cada resultado para vários destinos."""
+
+    def __init__(self, sinks: List[RecordSink]):
+        self.sinks = sinks
+
+    @property
+    def total_records(self) -> int:
+        return max((sink.total_records for sink in self.sinks), default=0)
+
+    def write(self, result: CollectionResult):
+        for sink in self.sinks:
+            sink.write(result)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class PartitionedSink(RecordSink):
+    """
+    Direciona cada resultado para o destino do gateway em coleta
+    (`current_gateway`), criando-o na primeira gravação.
+
+    Args:
+        factory (Callable): Recebe o ID do gateway e retorna o seu `RecordSink`.
+    """
+
+    def __init__(self, factory: Callable[[str], RecordSink]):
+        self.factory = factory
+        self.sinks: Dict[str, RecordSink] = {}
+
+    @property
+    def total_records(self) -> int:
+        return sum(sink.total_records for sink in self.sinks.values())
+
+    def write(self, result: CollectionResult):
+        gateway_id = current_gateway.get()
+        if gateway_id not in self.sinks:
+            self.sinks[gateway_id] = self.factory(gateway_id)
+        self.sinks[gateway_id].write(result)
+
+    def close(self):
+        for sink in self.sinks.values():
+            sink.close()
+
+
+SINK_FORMATS = {
+    "json": JsonSink,
+    "jsonl": JsonLinesSink,
+    "parquet": ParquetSink,
+    "sqlite": SQLiteSink,
+}
+
+
+def create_sink(output_dir: str = ".", formats: Iterable[str] = ("json", "sqlite")) -> RecordSink:
+    """
+    Cria o destino de gravação incremental para os formatos informados.
+
+    Args:
+        output_dir (str): Diretório de saída.
+        formats (Iterable[str]): Formatos entre "json" (data.json e entidades),
+            "jsonl" (data.jsonl), "parquet" (data.parquet) e "sqlite" (dados.db).
+            Padrão: os mesmos arquivos da coleta em lote.
+
+    Returns:
+        RecordSink: Destino único ou `MultiSink` com todos os formatos.
+
+    Raises:
+        ValueError: Se algum formato não for suportado.
+    """
+    unknown = [fmt for fmt in formats if fmt not in SINK_FORMATS]
+    if unknown:
+        raise ValueError(f"Formato de saída não suportado: {', '.join(unknown)}")
+    sinks = [SINK_FORMATS[fmt](output_dir) for fmt in formats]
+    return sinks[0] if len(sinks) == 1 else MultiSink(sinks)
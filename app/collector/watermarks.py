@@ -0,0 +1,103 @@
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class WatermarkStore:
+    """
+    Armazena, por entidade, o último `updatedAt` visto e o detalhe correspondente.
+
+    Usado pela coleta incremental: quando o `updatedAt` do item da listagem é igual
+    ao armazenado, o detalhe salvo na execução anterior é reaproveitado em vez de
+    ser buscado novamente na API. As gravações são acumuladas em memória e
+    persistidas em lote por `commit()`.
+
+    Args:
+        db_path (str): Caminho do banco SQLite (criado se não existir).
+
+    Example:
+        >>> with WatermarkStore("watermarks.db") as store:
+        ...     data = store.lookup("hardware", {"id": "HW1", "updatedAt": "..."})
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS watermarks (
+                kind TEXT NOT NULL,
+                id TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (kind, id)
+            )
+            """
+        )
+        self.conn.commit()
+        self._pending: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+    def lookup(self, kind: str, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o detalhe salvo de `item` se seu `updatedAt` não mudou.
+
+        Args:
+            kind (str): Tipo da entidade (ex.: "register_modbus").
+            item (dict): Item da listagem, com `id` e `updatedAt`.
+
+        Returns:
+            dict | None: Detalhe da execução anterior ou None se a entidade é nova,
+            mudou ou a listagem não informa `updatedAt`.
+        """
+        updated_at = item.get("updatedAt")
+        if updated_at is None or item.get("id") is None:
+            return None
+        key = (kind, str(item["id"]))
+        if key in self._pending:
+            stored_at, payload = self._pending[key]
+        else:
+            row = self.conn.execute(
+                "SELECT updated_at, payload FROM watermarks WHERE kind = ? AND id = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            stored_at, payload = row
+        if stored_at != str(updated_at):
+            return None
+        return json.loads(payload)
+
+    def store(self, kind: str, data: Dict[str, Any]):
+        """Registra o detalhe buscado de uma entidade (persistido em `commit`)."""
+        if data.get("id") is None or data.get("updatedAt") is None:
+            return
+        self._pending[(kind, str(data["id"]))] = (
+            str(data["updatedAt"]),
+            json.dumps(data),
+        )
+
+    def commit(self):
+        """Persiste em lote os detalhes registrados desde o último commit."""
+        if not self._pending:
+            return
+        rows: List[Tuple[str, str, str, str]] = [
+            (kind, entity_id, updated_at, payload)
+            for (kind, entity_id), (updated_at, payload) in self._pending.items()
+        ]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO watermarks (kind, id, updated_at, payload) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self.conn.commit()
+        self._pending.clear()
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
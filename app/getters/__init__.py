@@ -1,14 +1,19 @@
 from .gateway import fetch_all_gateways, fetch_gateway_by_id
 from .hardware import fetch_hardware_by_id, fetch_hardwares_by_gateway
+from .pagination import iter_items, iter_pages
 from .register import (
     fetch_register_dnp_by_id,
     fetch_register_modbus_by_id,
     fetch_registers_dnp,
     fetch_registers_modbus,
+    iter_registers_dnp,
+    iter_registers_modbus,
 )
 from .sensors import (
     fetch_sensor_dnp_by_id,
     fetch_sensor_modbus_by_id,
     fetch_sensors_dnp,
     fetch_sensors_modbus,
+    iter_sensors_dnp,
+    iter_sensors_modbus,
 )
@@ -1,5 +1,6 @@
 import aiohttp
 
+from app.getters.schema import Field, compile_parser
 from app.utils.http_utils import fetch_with_retry
 
 
@@ -28,34 +29,36 @@ async def fetch_all_gateways(host, auth_token):
     return await fetch_with_retry(url=url, headers=headers)
 
 
-def parse_gateway_data(data_gateway):
-    """
+GATEWAY_FIELDS = [
+    Field("id_gtw", "id"),
+    Field("name_gtw", "name"),
+    Field("ip_gtw", "ip"),
+    Field("active_gtw", "active"),
+    Field("id_sub", "substation.id"),
+    Field("name_sub", "substation.name"),
+    Field("active_sub", "substation.active"),
+    Field("sapAbbreviation_sub", "substation.sapAbbreviation"),
+    Field("createdAt_gtw", "createdAt"),
+    Field("updatedAt_gtw", "updatedAt"),
+    Field("userCreatedId_gtw", "userCreatedId"),
+    Field("userUpdatedId_gtw", "userUpdatedId"),
+    Field("substationId_gtw", "substationId"),
+]
+
+parse_gateway_data = compile_parser(
+    GATEWAY_FIELDS,
+    "parse_gateway_data",
+    doc="""
     Converte os campos do gateway para o novo formato especificado.
 
     Args:
-        data_gateway (dict): Dicionário com os dados originais do gateway
+        data (dict): Dicionário com os dados originais do gateway
 
     Returns:
         dict: Dicionário com os campos convertidos
-    """
-    parsed_data = {
-        "id_gtw": data_gateway.get("id", None),
-        "name_gtw": data_gateway.get("name", None),
-        "ip_gtw": data_gateway.get("ip", None),
-        "active_gtw": data_gateway.get("active", None),
-        "id_sub": data_gateway.get("substation", {}).get("id", None),
-        "name_sub": data_gateway.get("substation", {}).get("name", None),
-        "active_sub": data_gateway.get("substation", {}).get("active", None),
-        "sapAbbreviation_sub": data_gateway.get("substation", {}).get(
-            "sapAbbreviation", None
-        ),
-        "createdAt_gtw": data_gateway.get("createdAt", None),
-        "updatedAt_gtw": data_gateway.get("updatedAt", None),
-        "userCreatedId_gtw": data_gateway.get("userCreatedId", None),
-        "userUpdatedId_gtw": data_gateway.get("userUpdatedId", None),
-        "substationId_gtw": data_gateway.get("substationId", None),
-    }
-    return parsed_data
+    """,
+    module=__name__,
+)
 
 
 async def fetch_gateway_by_id(host, auth_token, gateway_id):
@@ -78,7 +81,7 @@ async def fetch_gateway_by_id(host, auth_token, gateway_id):
     """
     url = f"{host}/cma-gateways/{gateway_id}"
     headers = {"Authorization": f"Bearer {auth_token}"}
-    return await fetch_with_retry(url=url, headers=headers)
+    return await fetch_with_retry(url=url, headers=headers, cacheable=True)
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ import asyncio
 
 import aiohttp
 
+from app.getters.schema import Field, compile_parser
 from app.utils.http_utils import fetch_with_retry
 
 
@@ -53,35 +54,39 @@ async def fetch_hardwares_by_gateway(
     return await fetch_with_retry(url=url, headers=headers, params=params)
 
 
-def parse_hardware_data(data_hardware):
-    """
+HARDWARE_FIELDS = [
+    Field("id_hdw", "id"),
+    Field("createdAt_hdw", "createdAt"),
+    Field("updatedAt_hdw", "updatedAt"),
+    Field("userCreatedId_hdw", "userCreatedId"),
+    Field("userUpdatedId_hdw", "userUpdatedId"),
+    Field("cmaGatewayId_hdw", "cmaGatewayId"),
+    Field("name_hdw", "name"),
+    Field("sapId_hdw", "sapId"),
+    Field("active_hdw", "active"),
+    Field("id_cma", "cmaGateway.id"),
+    Field("name_cma", "cmaGateway.name"),
+    Field("ip_cma", "cmaGateway.ip"),
+    Field("active_cma", "cmaGateway.active"),
+    # New fields
+    Field("type_hdw", "type", {}),
+    Field("model_hdw", "model", {}),
+]
+
+parse_hardware_data = compile_parser(
+    HARDWARE_FIELDS,
+    "parse_hardware_data",
+    doc="""
     Converte os campos do hardware para o novo formato especificado.
 
     Args:
-        data_hardware (dict): Dicionário com os dados originais do hardware
+        data (dict): Dicionário com os dados originais do hardware
 
     Returns:
         dict: Dicionário com os campos convertidos
-    """
-    parsed_data = {
-        "id_hdw": data_hardware.get("id", None),
-        "createdAt_hdw": data_hardware.get("createdAt", None),
-        "updatedAt_hdw": data_hardware.get("updatedAt", None),
-        "userCreatedId_hdw": data_hardware.get("userCreatedId", None),
-        "userUpdatedId_hdw": data_hardware.get("userUpdatedId", None),
-        "cmaGatewayId_hdw": data_hardware.get("cmaGatewayId", None),
-        "name_hdw": data_hardware.get("name", None),
-        "sapId_hdw": data_hardware.get("sapId", None),
-        "active_hdw": data_hardware.get("active", None),
-        "id_cma": data_hardware.get("cmaGateway", {}).get("id", None),
-        "name_cma": data_hardware.get("cmaGateway", {}).get("name", None),
-        "ip_cma": data_hardware.get("cmaGateway", {}).get("ip", None),
-        "active_cma": data_hardware.get("cmaGateway", {}).get("active", None),
-        # New fields
-        "type_hdw": data_hardware.get("type", {}),
-        "model_hdw": data_hardware.get("model", {}),
-    }
-    return parsed_data
+    """,
+    module=__name__,
+)
 
 
 async def fetch_hardware_by_id(host, auth_token, hardware_id):
@@ -106,7 +111,7 @@ async def fetch_hardware_by_id(host, auth_token, hardware_id):
     """
     url = f"{host}/hardwares/{hardware_id}"
     headers = {"Authorization": f"Bearer {auth_token}"}
-    return await fetch_with_retry(url=url, headers=headers)
+    return await fetch_with_retry(url=url, headers=headers, cacheable=True)
 
 
 if __name__ == "__main__":
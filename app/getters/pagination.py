@@ -0,0 +1,87 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+
+FetchPage = Callable[[int], Awaitable[Dict[str, Any]]]
+
+
+def is_last_page(page_data: Dict[str, Any], page: int, size: Optional[int] = None) -> bool:
+    """
+    Indica se `page_data` é a última página de uma listagem paginada (formato Spring).
+
+    Usa, nesta ordem, o campo `last`, o campo `totalPages` e, na ausência de ambos,
+    uma página vazia ou menor que `size`.
+    """
+    if page_data.get("last") is not None:
+        return bool(page_data["last"])
+    total_pages = page_data.get("totalPages")
+    if total_pages is not None:
+        return page + 1 >= total_pages
+    content = page_data.get("content") or []
+    return not content or (size is not None and len(content) < size)
+
+
+async def iter_pages(
+    fetch_page: FetchPage, prefetch: int = 2, size: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Itera sobre todas as páginas de um endpoint paginado.
+
+    A primeira página é buscada sozinha; a partir dela as próximas `prefetch`
+    páginas são buscadas em paralelo enquanto o chamador consome a atual. No
+    máximo `prefetch` páginas ficam em memória ao mesmo tempo, independentemente
+    do total de páginas.
+
+    Args:
+        fetch_page (Callable): Função assíncrona que recebe o número da página
+            (a partir de 0) e retorna o JSON da página.
+        prefetch (int): Quantidade de páginas buscadas antecipadamente. Padrão: 2.
+        size (int, optional): Tamanho da página, usado para detectar a última
+            página quando a API não informa `last` nem `totalPages`.
+
+    Yields:
+        dict: JSON de cada página, na ordem.
+
+    Example:
+        >>> async for page in iter_pages(lambda page: fetch_sensors_modbus(host, token, page=page)):
+        ...     print(len(page["content"]))
+    """
+    first = await fetch_page(0)
+    yield first
+    if is_last_page(first, 0, size):
+        return
+
+    total_pages = first.get("totalPages")
+    next_page = 1
+    pending: Deque[asyncio.Task] = deque()
+    try:
+        while True:
+            while len(pending) < max(prefetch, 1) and (
+                total_pages is None or next_page < total_pages
+            ):
+                pending.append(asyncio.create_task(fetch_page(next_page)))
+                next_page += 1
+            if not pending:
+                return
+            page = next_page - len(pending)
+            page_data = await pending.popleft()
+            yield page_data
+            if is_last_page(page_data, page, size):
+                return
+    finally:
+        # páginas buscadas antecipadamente além da última são descartadas
+        for task in pending:
+            task.cancel()
+
+
+async def iter_items(
+    fetch_page: FetchPage, prefetch: int = 2, size: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Itera sobre os itens (`content`) de todas as páginas de um endpoint paginado."""
+    pages = iter_pages(fetch_page, prefetch=prefetch, size=size)
+    try:
+        async for page_data in pages:
+            for item in page_data.get("content") or []:
+                yield item
+    finally:
+        await pages.aclose()
@@ -2,6 +2,8 @@ import json
 
 import aiohttp
 
+from app.getters.pagination import iter_items
+from app.getters.schema import Field, compile_parser
 from app.utils.http_utils import fetch_with_retry
 
 
@@ -108,6 +110,38 @@ async def fetch_registers_modbus(
     return await fetch_with_retry(url=url, headers=headers, params=params)
 
 
+def iter_registers_modbus(
+    host: str,
+    auth_token: str,
+    page_size: int = 10,
+    prefetch: int = 2,
+    **filters,
+):
+    """
+    Itera sobre todos os registros Modbus, percorrendo todas as páginas de `/registers-modbus`.
+
+    As páginas são buscadas sob demanda (com `prefetch` páginas antecipadas) e os
+    itens entregues um a um, sem acumular a listagem completa em memória.
+
+    Args:
+        host (str): URL base da API.
+        auth_token (str): Token de autenticação Bearer.
+        page_size (int, optional): Tamanho de cada página. Padrão: 10.
+        prefetch (int, optional): Páginas buscadas antecipadamente. Padrão: 2.
+        **filters: Filtros aceitos por `fetch_registers_modbus` (ex.: sensor_modbus_id).
+
+    Yields:
+        dict: Cada registro Modbus da listagem.
+    """
+    return iter_items(
+        lambda page: fetch_registers_modbus(
+            host, auth_token, page=page, size=page_size, **filters
+        ),
+        prefetch=prefetch,
+        size=page_size,
+    )
+
+
 async def fetch_registers_dnp(
     host: str,
     auth_token: str,
@@ -183,6 +217,38 @@ async def fetch_registers_dnp(
     return await fetch_with_retry(url=url, headers=headers, params=params)
 
 
+def iter_registers_dnp(
+    host: str,
+    auth_token: str,
+    page_size: int = 10,
+    prefetch: int = 2,
+    **filters,
+):
+    """
+    Itera sobre todos os registros DNP, percorrendo todas as páginas de `/registers-dnp`.
+
+    As páginas são buscadas sob demanda (com `prefetch` páginas antecipadas) e os
+    itens entregues um a um, sem acumular a listagem completa em memória.
+
+    Args:
+        host (str): URL base da API.
+        auth_token (str): Token de autenticação Bearer.
+        page_size (int, optional): Tamanho de cada página. Padrão: 10.
+        prefetch (int, optional): Páginas buscadas antecipadamente. Padrão: 2.
+        **filters: Filtros aceitos por `fetch_registers_dnp` (ex.: sensor_dnp_id).
+
+    Yields:
+        dict: Cada registro DNP da listagem.
+    """
+    return iter_items(
+        lambda page: fetch_registers_dnp(
+            host, auth_token, page=page, size=page_size, **filters
+        ),
+        prefetch=prefetch,
+        size=page_size,
+    )
+
+
 async def fetch_register_dnp_by_id(host: str, auth_token: str, register_dnp_id: str):
     """
     Obtém um registro DNP específico pelo seu ID.
@@ -209,183 +275,128 @@ async def fetch_register_dnp_by_id(host: str, auth_token: str, register_dnp_id:
     return await fetch_with_retry(url=url, headers=headers)
 
 
-def parse_register_modbus_data(data_register_modbus):
-    """
+REGISTER_MODBUS_FIELDS = [
+    Field("id_reg_mod", "id"),
+    Field("createdAt_reg_mod", "createdAt"),
+    Field("updatedAt_reg_mod", "updatedAt"),
+    Field("userCreatedId_reg_mod", "userCreatedId"),
+    Field("userUpdatedId_reg_mod", "userUpdatedId"),
+    Field("sensorModbusId_reg_mod", "sensorModbusId"),
+    Field("registerTypeId_reg_mod", "registerTypeId"),
+    Field("sensorTypeId_reg_mod", "sensorTypeId"),
+    Field("name_reg_mod", "name"),
+    Field("description_reg_mod", "description"),
+    Field("addressSlave_reg_mod", "addressSlave"),
+    Field("addressRegister_reg_mod", "addressRegister"),
+    Field("registerModbusType_reg_mod", "registerModbusType"),
+    Field("registerDataFormat_reg_mod", "registerDataFormat"),
+    Field("bit_reg_mod", "bit"),
+    Field("multiplier_reg_mod", "multiplier"),
+    Field("additive_reg_mod", "additive"),
+    Field("active_reg_mod", "active"),
+    Field("id_sen_reg_mod", "sensorModbus.id"),
+    Field("name_sen_reg_mod", "sensorModbus.name"),
+    Field("description_sen_reg_mod", "sensorModbus.description"),
+    Field("model_sen_reg_mod", "sensorModbus.model"),
+    Field("ip_sen_reg_mod", "sensorModbus.ip"),
+    Field("port_sen_reg_mod", "sensorModbus.port"),
+    Field("type_sen_reg_mod", "sensorModbus.type"),
+    Field("attempts_sen_reg_mod", "sensorModbus.attempts"),
+    Field("timeLimit_sen_reg_mod", "sensorModbus.timeLimit"),
+    Field("actualizationPeriod_sen_reg_mod", "sensorModbus.actualizationPeriod"),
+    Field("actualizationTime_sen_reg_mod", "sensorModbus.actualizationTime"),
+    Field("maxRegisterRead_sen_reg_mod", "sensorModbus.maxRegisterRead"),
+    Field("maxRegisterWrite_sen_reg_mod", "sensorModbus.maxRegisterWrite"),
+    Field("maxRegisterBitsRead_sen_reg_mod", "sensorModbus.maxRegisterBitsRead"),
+    Field("active_sen_reg_mod", "sensorModbus.active"),
+    Field("id_man_reg_mod", "sensorModbus.manufacturer.id"),
+    Field("name_man_reg_mod", "sensorModbus.manufacturer.name"),
+    Field("active_man_reg_mod", "sensorModbus.manufacturer.active"),
+    Field("id_reg_reg_mod", "registerType.id"),
+    Field("name_reg_reg_mod", "registerType.name"),
+    Field("active_reg_reg_mod", "registerType.active"),
+    # repete colunas de sensorModbus: prevalece o valor de sensorType
+    Field("id_sen_reg_mod", "sensorType.id"),
+    Field("name_sen_reg_mod", "sensorType.name"),
+    Field("active_sen_reg_mod", "sensorType.active"),
+    Field("reg_mod_tags", "tags", {}, json.dumps),
+    # New fields
+    Field("phase_reg_mod", "phase", {}),
+    Field("circuitBreakerManeuverType_reg_mod", "circuitBreakerManeuverType", {}),
+    Field("bushingSide_reg_mod", "bushingSide", {}),
+]
+
+parse_register_modbus_data = compile_parser(
+    REGISTER_MODBUS_FIELDS,
+    "parse_register_modbus_data",
+    doc="""
     Converte os campos do registro Modbus para o novo formato especificado.
 
     Args:
-        data_register_modbus (dict): Dicionário com os dados originais do registro Modbus
+        data (dict): Dicionário com os dados originais do registro Modbus
 
     Returns:
         dict: Dicionário com os campos convertidos
-    """
-    parsed_data = {
-        "id_reg_mod": data_register_modbus.get("id", None),
-        "createdAt_reg_mod": data_register_modbus.get("createdAt", None),
-        "updatedAt_reg_mod": data_register_modbus.get("updatedAt", None),
-        "userCreatedId_reg_mod": data_register_modbus.get("userCreatedId", None),
-        "userUpdatedId_reg_mod": data_register_modbus.get("userUpdatedId", None),
-        "sensorModbusId_reg_mod": data_register_modbus.get("sensorModbusId", None),
-        "registerTypeId_reg_mod": data_register_modbus.get("registerTypeId", None),
-        "sensorTypeId_reg_mod": data_register_modbus.get("sensorTypeId", None),
-        "name_reg_mod": data_register_modbus.get("name", None),
-        "description_reg_mod": data_register_modbus.get("description", None),
-        "addressSlave_reg_mod": data_register_modbus.get("addressSlave", None),
-        "addressRegister_reg_mod": data_register_modbus.get("addressRegister", None),
-        "registerModbusType_reg_mod": data_register_modbus.get(
-            "registerModbusType", None
-        ),
-        "registerDataFormat_reg_mod": data_register_modbus.get(
-            "registerDataFormat", None
-        ),
-        "bit_reg_mod": data_register_modbus.get("bit", None),
-        "multiplier_reg_mod": data_register_modbus.get("multiplier", None),
-        "additive_reg_mod": data_register_modbus.get("additive", None),
-        "active_reg_mod": data_register_modbus.get("active", None),
-        "id_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get("id", None),
-        "name_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get(
-            "name", None
-        ),
-        "description_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get(
-            "description", None
-        ),
-        "model_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get(
-            "model", None
-        ),
-        "ip_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get("ip", None),
-        "port_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get(
-            "port", None
-        ),
-        "type_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get(
-            "type", None
-        ),
-        "attempts_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get(
-            "attempts", None
-        ),
-        "timeLimit_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get(
-            "timeLimit", None
-        ),
-        "actualizationPeriod_sen_reg_mod": data_register_modbus.get(
-            "sensorModbus", {}
-        ).get("actualizationPeriod", None),
-        "actualizationTime_sen_reg_mod": data_register_modbus.get(
-            "sensorModbus", {}
-        ).get("actualizationTime", None),
-        "maxRegisterRead_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get(
-            "maxRegisterRead", None
-        ),
-        "maxRegisterWrite_sen_reg_mod": data_register_modbus.get(
-            "sensorModbus", {}
-        ).get("maxRegisterWrite", None),
-        "maxRegisterBitsRead_sen_reg_mod": data_register_modbus.get(
-            "sensorModbus", {}
-        ).get("maxRegisterBitsRead", None),
-        "active_sen_reg_mod": data_register_modbus.get("sensorModbus", {}).get(
-            "active", None
-        ),
-        "id_man_reg_mod": data_register_modbus.get("sensorModbus", {})
-        .get("manufacturer", {})
-        .get("id", None),
-        "name_man_reg_mod": data_register_modbus.get("sensorModbus", {})
-        .get("manufacturer", {})
-        .get("name", None),
-        "active_man_reg_mod": data_register_modbus.get("sensorModbus", {})
-        .get("manufacturer", {})
-        .get("active", None),
-        "id_reg_reg_mod": data_register_modbus.get("registerType", {}).get("id", None),
-        "name_reg_reg_mod": data_register_modbus.get("registerType", {}).get(
-            "name", None
-        ),
-        "active_reg_reg_mod": data_register_modbus.get("registerType", {}).get(
-            "active", None
-        ),
-        "id_sen_reg_mod": data_register_modbus.get("sensorType", {}).get("id", None),
-        "name_sen_reg_mod": data_register_modbus.get("sensorType", {}).get(
-            "name", None
-        ),
-        "active_sen_reg_mod": data_register_modbus.get("sensorType", {}).get(
-            "active", None
-        ),
-        "reg_mod_tags": json.dumps(data_register_modbus.get("tags", {})),
-        # New fields
-        "phase_reg_mod": data_register_modbus.get("phase", {}),
-        "circuitBreakerManeuverType_reg_mod": data_register_modbus.get("circuitBreakerManeuverType", {}),
-        "bushingSide_reg_mod": data_register_modbus.get("bushingSide", {}),
-    }
-    return parsed_data
-
-
-def parse_register_dnp_data(data_reg_dnp3):
-    """
+    """,
+    module=__name__,
+)
+
+
+REGISTER_DNP_FIELDS = [
+    Field("id_reg_dnp3", "id"),
+    Field("createdAt_reg_dnp3", "createdAt"),
+    Field("updatedAt_reg_dnp3", "updatedAt"),
+    Field("userCreatedId_reg_dnp3", "userCreatedId"),
+    Field("userUpdatedId_reg_dnp3", "userUpdatedId"),
+    Field("sensorDnpId_reg_dnp3", "sensorDnpId"),
+    Field("registerTypeId_reg_dnp3", "registerTypeId"),
+    Field("sensorTypeId_reg_dnp3", "sensorTypeId"),
+    Field("name_reg_dnp3", "name"),
+    Field("description_reg_dnp3", "description"),
+    Field("index_reg_dnp3", "index"),
+    Field("timeOn_reg_dnp3", "timeOn"),
+    Field("timeOff_reg_dnp3", "timeOff"),
+    Field("registerDataType_reg_dnp3", "registerDataType"),
+    Field("registerControlCommand_reg_dnp3", "registerControlCommand"),
+    Field("active_reg_dnp3", "active"),
+    Field("id_dnp_reg_dnp3", "sensorDnp.id"),
+    Field("name_dnp_reg_dnp3", "sensorDnp.name"),
+    Field("description_dnp_reg_dnp3", "sensorDnp.description"),
+    Field("model_dnp_reg_dnp3", "sensorDnp.model"),
+    Field("ip_dnp_reg_dnp3", "sensorDnp.ip"),
+    Field("port_dnp_reg_dnp3", "sensorDnp.port"),
+    Field("type_dnp_reg_dnp3", "sensorDnp.type"),
+    Field("attempts_dnp_reg_dnp3", "sensorDnp.attempts"),
+    Field("timeLimit_dnp_reg_dnp3", "sensorDnp.timeLimit"),
+    Field("actualizationPeriod_dnp_reg_dnp3", "sensorDnp.actualizationPeriod"),
+    Field("pollRbePeriod_dnp_reg_dnp3", "sensorDnp.pollRbePeriod"),
+    Field("pollStaticPeriod_dnp_reg_dnp3", "sensorDnp.pollStaticPeriod"),
+    Field("addressSource_dnp_reg_dnp3", "sensorDnp.addressSource"),
+    Field("addressSlave_dnp_reg_dnp3", "sensorDnp.addressSlave"),
+    Field("active_dnp_reg_dnp3", "sensorDnp.active"),
+    Field("id_man_reg_dnp3", "manufacturer.id"),
+    Field("name_man_reg_dnp3", "manufacturer.name"),
+    Field("active_man_reg_mod", "manufacturer.active"),
+    Field("id_reg_reg_dnp3", "registerType.id"),
+    Field("name_reg_reg_dnp3", "registerType.name"),
+    Field("active_reg_reg_dnp_dnp3", "registerType.active"),
+    Field("id_sen_reg_dnp3", "sensorType.id"),
+    Field("name_sen_reg_dnp3", "sensorType.name"),
+    Field("active_sen_reg_dnp3", "sensorType.active"),
+    Field("reg_dnp3_tags", "tags", {}, json.dumps),
+]
+
+parse_register_dnp_data = compile_parser(
+    REGISTER_DNP_FIELDS,
+    "parse_register_dnp_data",
+    doc="""
     Converte os campos do registro DNP para o novo formato especificado.
 
     Args:
-        data_reg_dnp3 (dict): Dicionário com os dados originais do registro DNP
+        data (dict): Dicionário com os dados originais do registro DNP
 
     Returns:
         dict: Dicionário com os campos convertidos
-    """
-    parsed_data = {
-        "id_reg_dnp3": data_reg_dnp3.get("id", None),
-        "createdAt_reg_dnp3": data_reg_dnp3.get("createdAt", None),
-        "updatedAt_reg_dnp3": data_reg_dnp3.get("updatedAt", None),
-        "userCreatedId_reg_dnp3": data_reg_dnp3.get("userCreatedId", None),
-        "userUpdatedId_reg_dnp3": data_reg_dnp3.get("userUpdatedId", None),
-        "sensorDnpId_reg_dnp3": data_reg_dnp3.get("sensorDnpId", None),
-        "registerTypeId_reg_dnp3": data_reg_dnp3.get("registerTypeId", None),
-        "sensorTypeId_reg_dnp3": data_reg_dnp3.get("sensorTypeId", None),
-        "name_reg_dnp3": data_reg_dnp3.get("name", None),
-        "description_reg_dnp3": data_reg_dnp3.get("description", None),
-        "index_reg_dnp3": data_reg_dnp3.get("index", None),
-        "timeOn_reg_dnp3": data_reg_dnp3.get("timeOn", None),
-        "timeOff_reg_dnp3": data_reg_dnp3.get("timeOff", None),
-        "registerDataType_reg_dnp3": data_reg_dnp3.get("registerDataType", None),
-        "registerControlCommand_reg_dnp3": data_reg_dnp3.get(
-            "registerControlCommand", None
-        ),
-        "active_reg_dnp3": data_reg_dnp3.get("active", None),
-        "id_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get("id", None),
-        "name_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get("name", None),
-        "description_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get(
-            "description", None
-        ),
-        "model_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get("model", None),
-        "ip_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get("ip", None),
-        "port_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get("port", None),
-        "type_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get("type", None),
-        "attempts_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get(
-            "attempts", None
-        ),
-        "timeLimit_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get(
-            "timeLimit", None
-        ),
-        "actualizationPeriod_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get(
-            "actualizationPeriod", None
-        ),
-        "pollRbePeriod_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get(
-            "pollRbePeriod", None
-        ),
-        "pollStaticPeriod_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get(
-            "pollStaticPeriod", None
-        ),
-        "addressSource_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get(
-            "addressSource", None
-        ),
-        "addressSlave_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get(
-            "addressSlave", None
-        ),
-        "active_dnp_reg_dnp3": data_reg_dnp3.get("sensorDnp", {}).get("active", None),
-        "id_man_reg_dnp3": data_reg_dnp3.get("manufacturer", {}).get("id", None),
-        "name_man_reg_dnp3": data_reg_dnp3.get("manufacturer", {}).get("name", None),
-        "active_man_reg_mod": data_reg_dnp3.get("manufacturer", {}).get("active", None),
-        "id_reg_reg_dnp3": data_reg_dnp3.get("registerType", {}).get("id", None),
-        "name_reg_reg_dnp3": data_reg_dnp3.get("registerType", {}).get("name", None),
-        "active_reg_reg_dnp_dnp3": data_reg_dnp3.get("registerType", {}).get(
-            "active", None
-        ),
-        "id_sen_reg_dnp3": data_reg_dnp3.get("sensorType", {}).get("id", None),
-        "name_sen_reg_dnp3": data_reg_dnp3.get("sensorType", {}).get("name", None),
-        "active_sen_reg_dnp3": data_reg_dnp3.get("sensorType", {}).get("active", None),
-        "reg_dnp3_tags": json.dumps(data_reg_dnp3.get("tags", {})),
-    }
-    return parsed_data
+    """,
+    module=__name__,
+)
@@ -0,0 +1,175 @@
+import linecache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+# nível intermediário ausente ou nulo: as buscas seguintes retornam o padrão
+_EMPTY = MappingProxyType({})
+
+
+class Field(NamedTuple):
+    """
+    Campo de saída de um parser: coluna, caminho no JSON da API e valor padrão.
+
+    Args:
+        column (str): Nome da coluna de saída (ex.: "id_sen_reg_mod").
+        path (str): Caminho separado por pontos (ex.: "sensorModbus.manufacturer.id").
+        default (Any): Valor quando o campo não existe. `{}` e `[]` criam um objeto
+            novo a cada registro. Padrão: None.
+        transform (Callable, optional): Função aplicada ao valor (ex.: json.dumps).
+    """
+
+    column: str
+    path: str
+    default: Any = None
+    transform: Optional[Callable[[Any], Any]] = None
+
+    @property
+    def keys(self) -> Tuple[str, ...]:
+        return tuple(self.path.split("."))
+
+
+class _Generator:
+    """Monta o código-fonte dos extratores de um esquema."""
+
+    def __init__(self, fields: List[Field]):
+        self.namespace: Dict[str, Any] = {"_EMPTY": _EMPTY}
+        self.nodes: Dict[Tuple[str, ...], str] = {(): "data"}
+        self.node_lines: List[str] = []
+        # colunas repetidas: vale a última definição, na posição da primeira
+        # (mesma semântica de um dict literal com chaves repetidas)
+        self.columns: Dict[str, str] = {}
+        for field in fields:
+            self.columns[field.column] = self._expression(field)
+
+    def _node(self, keys: Tuple[str, ...]) -> str:
+        """Variável do nível intermediário `keys`, buscado uma única vez."""
+        if keys not in self.nodes:
+            parent = self._node(keys[:-1])
+            name = f"_n{len(self.nodes)}"
+            self.nodes[keys] = name
+            self.node_lines += [
+                f"{name} = {parent}.get({keys[-1]!r})",
+                f"if not isinstance({name}, dict):",
+                f"    {name} = _EMPTY",
+            ]
+        return self.nodes[keys]
+
+    def _constant(self, value: Any) -> str:
+        if value == {} and isinstance(value, dict):
+            return "{}"
+        if value == [] and isinstance(value, list):
+            return "[]"
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return repr(value)
+        name = f"_k{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def _expression(self, field: Field) -> str:
+        keys = field.keys
+        node = self._node(keys[:-1])
+        if field.default is None:
+            expression = f"{node}.get({keys[-1]!r})"
+        else:
+            expression = f"{node}.get({keys[-1]!r}, {self._constant(field.default)})"
+        if field.transform is not None:
+            name = f"_t{len(self.namespace)}"
+            self.namespace[name] = field.transform
+            expression = f"{name}({expression})"
+        return expression
+
+    def record_source(self, name: str) -> str:
+        body = self.node_lines + ["return {"]
+        body += [f"    {column!r}: {expr}," for column, expr in self.columns.items()]
+        body += ["}"]
+        return f"def {name}(data):\n" + "".join(f"    {line}\n" for line in body)
+
+    def row_source(self, name: str) -> str:
+        body = self.node_lines + ["return ("]
+        body += [f"    {expr}," for expr in self.columns.values()]
+        body += [")"]
+        return f"def {name}(data):\n" + "".join(f"    {line}\n" for line in body)
+
+    def batch_source(self, name: str) -> str:
+        body = []
+        for index in range(len(self.columns)):
+            body += [f"_c{index} = []", f"_a{index} = _c{index}.append"]
+        body += ["for data in items:"]
+        body += [f"    {line}" for line in self.node_lines]
+        body += [
+            f"    _a{index}({expr})" for index, expr in enumerate(self.columns.values())
+        ]
+        body += ["return {"]
+        body += [f"    {column!r}: _c{index}," for index, column in enumerate(self.columns)]
+        body += ["}"]
+        return f"def {name}(items):\n" + "".join(f"    {line}\n" for line in body)
+
+
+def _build(source: str, name: str, namespace: Dict[str, Any], module: str) -> Callable:
+    filename = f"<schema {module}.{name}>"
+    code = compile(source, filename, "exec")
+    # permite ver o código gerado nos tracebacks
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec(code, namespace)
+    function = namespace[name]
+    function.__module__ = module
+    function.source = source
+    return function
+
+
+def compile_parser(
+    fields: Iterable[Field], name: str, doc: str = None, module: str = None
+) -> Callable[[dict], dict]:
+    """
+    Gera, a partir de um esquema declarativo, o parser de um registro da API.
+
+    O código gerado busca cada nível aninhado uma única vez (ex.: `sensorModbus`
+    é lido uma vez para todos os seus campos) e monta o resultado em um único
+    dict literal. Um nível ausente ou nulo resulta no valor padrão dos campos
+    abaixo dele.
+
+    O parser gerado expõe:
+        - `fields`: o esquema;
+        - `paths`: os caminhos lidos (usados por `required_paths`);
+        - `batch(items)`: variante que converte uma página inteira em colunas
+          (`{coluna: [valores]}`), pronta para `pd.DataFrame`;
+        - `row(data)`: variante que devolve apenas os valores, em uma tupla na
+          ordem de `columns` (representação compacta da coleta);
+        - `columns`: as colunas de saída, sem repetições;
+        - `source`: o código gerado.
+
+    Args:
+        fields (Iterable[Field]): Campos de saída, na ordem das colunas.
+        name (str): Nome da função gerada (ex.: "parse_gateway_data").
+        doc (str, optional): Docstring da função gerada.
+        module (str, optional): Módulo a que a função pertence.
+
+    Returns:
+        Callable: Função `parser(data) -> dict`.
+    """
+    fields = list(fields)
+    module = module or __name__
+    generator = _Generator(fields)
+    parser = _build(
+        generator.record_source(name), name, dict(generator.namespace), module
+    )
+    batch_name = f"{name}_batch"
+    parser.batch = _build(
+        generator.batch_source(batch_name), batch_name, dict(generator.namespace), module
+    )
+    row_name = f"{name}_row"
+    parser.row = _build(
+        generator.row_source(row_name), row_name, dict(generator.namespace), module
+    )
+    parser.__doc__ = doc
+    parser.fields = fields
+    parser.columns = tuple(generator.columns)
+    parser.paths = schema_paths(fields)
+    return parser
+
+
+def schema_paths(fields: Iterable[Field]) -> FrozenSet[Tuple[str, ...]]:
+    """Caminhos folha lidos por um esquema."""
+    paths = {field.keys for field in fields}
+    prefixes = {path[:i] for path in paths for i in range(1, len(path))}
+    return frozenset(paths - prefixes)
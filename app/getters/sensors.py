@@ -2,6 +2,8 @@ import json
 
 import aiohttp
 
+from app.getters.pagination import iter_items
+from app.getters.schema import Field, compile_parser
 from app.utils.http_utils import fetch_with_retry
 
 
@@ -73,6 +75,38 @@ async def fetch_sensors_modbus(
     return await fetch_with_retry(url=url, headers=headers, params=params)
 
 
+def iter_sensors_modbus(
+    host: str,
+    auth_token: str,
+    page_size: int = 10,
+    prefetch: int = 2,
+    **filters,
+):
+    """
+    Itera sobre todos os sensores Modbus, percorrendo todas as páginas de `/sensors-modbus`.
+
+    As páginas são buscadas sob demanda (com `prefetch` páginas antecipadas) e os
+    itens entregues um a um, sem acumular a listagem completa em memória.
+
+    Args:
+        host (str): URL base da API.
+        auth_token (str): Token de autenticação Bearer.
+        page_size (int, optional): Tamanho de cada página. Padrão: 10.
+        prefetch (int, optional): Páginas buscadas antecipadamente. Padrão: 2.
+        **filters: Filtros aceitos por `fetch_sensors_modbus` (ex.: hardware_id).
+
+    Yields:
+        dict: Cada sensor Modbus da listagem.
+    """
+    return iter_items(
+        lambda page: fetch_sensors_modbus(
+            host, auth_token, page=page, size=page_size, **filters
+        ),
+        prefetch=prefetch,
+        size=page_size,
+    )
+
+
 async def fetch_sensors_dnp(
     host: str,
     auth_token: str,
@@ -141,102 +175,138 @@ async def fetch_sensors_dnp(
     return await fetch_with_retry(url=url, headers=headers, params=params)
 
 
-def parse_sensor_modbus_data(data_sensores):
+def iter_sensors_dnp(
+    host: str,
+    auth_token: str,
+    page_size: int = 10,
+    prefetch: int = 2,
+    **filters,
+):
+    """
+    Itera sobre todos os sensores DNP, percorrendo todas as páginas de `/sensors-dnp`.
+
+    As páginas são buscadas sob demanda (com `prefetch` páginas antecipadas) e os
+    itens entregues um a um, sem acumular a listagem completa em memória.
+
+    Args:
+        host (str): URL base da API.
+        auth_token (str): Token de autenticação Bearer.
+        page_size (int, optional): Tamanho de cada página. Padrão: 10.
+        prefetch (int, optional): Páginas buscadas antecipadamente. Padrão: 2.
+        **filters: Filtros aceitos por `fetch_sensors_dnp` (ex.: hardware_id).
+
+    Yields:
+        dict: Cada sensor DNP da listagem.
     """
+    return iter_items(
+        lambda page: fetch_sensors_dnp(
+            host, auth_token, page=page, size=page_size, **filters
+        ),
+        prefetch=prefetch,
+        size=page_size,
+    )
+
+
+SENSOR_MODBUS_FIELDS = [
+    Field("id_sen", "id"),
+    Field("createdAt_sen", "createdAt"),
+    Field("updatedAt_sen", "updatedAt"),
+    Field("userCreatedId_sen", "userCreatedId"),
+    Field("userUpdatedId_sen", "userUpdatedId"),
+    Field("manufacturerId_sen", "manufacturerId"),
+    Field("hardwareId_sen", "hardwareId"),
+    Field("name_sen", "name"),
+    Field("description_sen", "description"),
+    Field("model_sen", "model"),
+    Field("ip_sen", "ip"),
+    Field("port_sen", "port"),
+    Field("type_sen", "type"),
+    Field("attempts_sen", "attempts"),
+    Field("timeLimit_sen", "timeLimit"),
+    Field("actualizationPeriod_sen", "actualizationPeriod"),
+    Field("actualizationTime_sen", "actualizationTime"),
+    Field("maxRegisterRead_sen", "maxRegisterRead"),
+    Field("maxRegisterWrite_sen", "maxRegisterWrite"),
+    Field("maxRegisterBitsRead_sen", "maxRegisterBitsRead"),
+    Field("active_sen", "active"),
+    Field("id_man", "manufacturer.id"),
+    Field("name_man", "manufacturer.name"),
+    Field("active_man", "manufacturer.active"),
+    Field("id_hw_sen", "hardware.id"),
+    Field("name_hw_sen", "hardware.name"),
+    Field("sapId_hd_sen", "hardware.sapId"),
+    Field("sen_mod_tags", "tags", {}, json.dumps),
+]
+
+parse_sensor_modbus_data = compile_parser(
+    SENSOR_MODBUS_FIELDS,
+    "parse_sensor_modbus_data",
+    doc="""
     Converte os campos do sensor para o novo formato especificado.
 
     Args:
-        data_sensores (dict): Dicionário com os dados originais do sensor
+        data (dict): Dicionário com os dados originais do sensor
 
     Returns:
         dict: Dicionário com os campos convertidos
-    """
-    parsed_data = {
-        "id_sen": data_sensores.get("id", None),
-        "createdAt_sen": data_sensores.get("createdAt", None),
-        "updatedAt_sen": data_sensores.get("updatedAt", None),
-        "userCreatedId_sen": data_sensores.get("userCreatedId", None),
-        "userUpdatedId_sen": data_sensores.get("userUpdatedId", None),
-        "manufacturerId_sen": data_sensores.get("manufacturerId", None),
-        "hardwareId_sen": data_sensores.get("hardwareId", None),
-        "name_sen": data_sensores.get("name", None),
-        "description_sen": data_sensores.get("description", None),
-        "model_sen": data_sensores.get("model", None),
-        "ip_sen": data_sensores.get("ip", None),
-        "port_sen": data_sensores.get("port", None),
-        "type_sen": data_sensores.get("type", None),
-        "attempts_sen": data_sensores.get("attempts", None),
-        "timeLimit_sen": data_sensores.get("timeLimit", None),
-        "actualizationPeriod_sen": data_sensores.get("actualizationPeriod", None),
-        "actualizationTime_sen": data_sensores.get("actualizationTime", None),
-        "maxRegisterRead_sen": data_sensores.get("maxRegisterRead", None),
-        "maxRegisterWrite_sen": data_sensores.get("maxRegisterWrite", None),
-        "maxRegisterBitsRead_sen": data_sensores.get("maxRegisterBitsRead", None),
-        "active_sen": data_sensores.get("active", None),
-        "id_man": data_sensores.get("manufacturer", {}).get("id", None),
-        "name_man": data_sensores.get("manufacturer", {}).get("name", None),
-        "active_man": data_sensores.get("manufacturer", {}).get("active", None),
-        "id_hw_sen": data_sensores.get("hardware", {}).get("id", None),
-        "name_hw_sen": data_sensores.get("hardware", {}).get("name", None),
-        "sapId_hd_sen": data_sensores.get("hardware", {}).get("sapId", None),
-        "sen_mod_tags": json.dumps(data_sensores.get("tags", {})),
-    }
-    return parsed_data
-
-
-def parse_sensor_dnp_data(data_sensor_dnp3):
-    """
+    """,
+    module=__name__,
+)
+
+
+SENSOR_DNP_FIELDS = [
+    Field("id_sen_dnp3", "id"),
+    Field("createdAt_sen_dnp3", "createdAt"),
+    Field("updatedAt_sen_dnp3", "updatedAt"),
+    Field("userCreatedId_sen_dnp3", "userCreatedId"),
+    Field("userUpdatedId_sen_dnp3", "userUpdatedId"),
+    Field("manufacturerId_sen_dnp3", "manufacturerId"),
+    Field("hardwareId_sen_dnp3", "hardwareId"),
+    Field("name_sen_dnp3", "name"),
+    Field("description_sen_dnp3", "description"),
+    Field("model_sen_dnp3", "model"),
+    Field("ip_sen_dnp3", "ip"),
+    Field("port_sen_dnp3", "port"),
+    Field("type_sen_dnp3", "type"),
+    Field("attempts_sen_dnp3", "attempts"),
+    Field("timeLimit_sen_dnp3", "timeLimit"),
+    Field("actualizationPeriod_sen_dnp3", "actualizationPeriod"),
+    Field("pollRbePeriod_sen_dnp3", "pollRbePeriod"),
+    Field("pollStaticPeriod_sen_dnp3", "pollStaticPeriod"),
+    Field("addressSource_sen_dnp3", "addressSource"),
+    Field("addressSlave_sen_dnp3", "addressSlave"),
+    Field("active_sen_dnp3", "active"),
+    # Manufacturer data
+    Field("id_sen_dnp3_man", "manufacturer.id"),
+    Field("name_sen_dnp3_man", "manufacturer.name"),
+    Field("active_sen_dnp3_man", "manufacturer.active"),
+    # Hardware data
+    Field("id_sen_dnp3_hw", "hardware.id"),
+    Field("name_sen_dnp3_hw", "hardware.name"),
+    Field("sapId_sen_dnp3_hw", "hardware.sapId"),
+    Field("active_sen_dnp3_hw", "hardware.active"),
+    # CMA data
+    Field("id_sen_dnp3_cma", "cma.id"),
+    Field("name_sen_dnp3_cma", "cma.name"),
+    Field("ip_sen_dnp3_cma", "cma.ip"),
+    Field("active_sen_dnp3_cma", "cma.active"),
+    Field("sen_dnp3_tags", "tags", {}, json.dumps),
+]
+
+parse_sensor_dnp_data = compile_parser(
+    SENSOR_DNP_FIELDS,
+    "parse_sensor_dnp_data",
+    doc="""
     Converte os campos do sensor DNP3 para o novo formato especificado.
 
     Args:
-        data_sensor_dnp3 (dict): Dicionário com os dados originais do sensor DNP3
+        data (dict): Dicionário com os dados originais do sensor DNP3
 
     Returns:
         dict: Dicionário com os campos convertidos
-    """
-    parsed_data = {
-        "id_sen_dnp3": data_sensor_dnp3.get("id", None),
-        "createdAt_sen_dnp3": data_sensor_dnp3.get("createdAt", None),
-        "updatedAt_sen_dnp3": data_sensor_dnp3.get("updatedAt", None),
-        "userCreatedId_sen_dnp3": data_sensor_dnp3.get("userCreatedId", None),
-        "userUpdatedId_sen_dnp3": data_sensor_dnp3.get("userUpdatedId", None),
-        "manufacturerId_sen_dnp3": data_sensor_dnp3.get("manufacturerId", None),
-        "hardwareId_sen_dnp3": data_sensor_dnp3.get("hardwareId", None),
-        "name_sen_dnp3": data_sensor_dnp3.get("name", None),
-        "description_sen_dnp3": data_sensor_dnp3.get("description", None),
-        "model_sen_dnp3": data_sensor_dnp3.get("model", None),
-        "ip_sen_dnp3": data_sensor_dnp3.get("ip", None),
-        "port_sen_dnp3": data_sensor_dnp3.get("port", None),
-        "type_sen_dnp3": data_sensor_dnp3.get("type", None),
-        "attempts_sen_dnp3": data_sensor_dnp3.get("attempts", None),
-        "timeLimit_sen_dnp3": data_sensor_dnp3.get("timeLimit", None),
-        "actualizationPeriod_sen_dnp3": data_sensor_dnp3.get(
-            "actualizationPeriod", None
-        ),
-        "pollRbePeriod_sen_dnp3": data_sensor_dnp3.get("pollRbePeriod", None),
-        "pollStaticPeriod_sen_dnp3": data_sensor_dnp3.get("pollStaticPeriod", None),
-        "addressSource_sen_dnp3": data_sensor_dnp3.get("addressSource", None),
-        "addressSlave_sen_dnp3": data_sensor_dnp3.get("addressSlave", None),
-        "active_sen_dnp3": data_sensor_dnp3.get("active", None),
-        # Manufacturer data
-        "id_sen_dnp3_man": data_sensor_dnp3.get("manufacturer", {}).get("id", None),
-        "name_sen_dnp3_man": data_sensor_dnp3.get("manufacturer", {}).get("name", None),
-        "active_sen_dnp3_man": data_sensor_dnp3.get("manufacturer", {}).get(
-            "active", None
-        ),
-        # Hardware data
-        "id_sen_dnp3_hw": data_sensor_dnp3.get("hardware", {}).get("id", None),
-        "name_sen_dnp3_hw": data_sensor_dnp3.get("hardware", {}).get("name", None),
-        "sapId_sen_dnp3_hw": data_sensor_dnp3.get("hardware", {}).get("sapId", None),
-        "active_sen_dnp3_hw": data_sensor_dnp3.get("hardware", {}).get("active", None),
-        # CMA data
-        "id_sen_dnp3_cma": data_sensor_dnp3.get("cma", {}).get("id", None),
-        "name_sen_dnp3_cma": data_sensor_dnp3.get("cma", {}).get("name", None),
-        "ip_sen_dnp3_cma": data_sensor_dnp3.get("cma", {}).get("ip", None),
-        "active_sen_dnp3_cma": data_sensor_dnp3.get("cma", {}).get("active", None),
-        "sen_dnp3_tags": json.dumps(data_sensor_dnp3.get("tags", {})),
-    }
-    return parsed_data
+    """,
+    module=__name__,
+)
 
 
 async def fetch_sensor_modbus_by_id(host, auth_token, sensor_modbus_id):
@@ -261,7 +331,7 @@ async def fetch_sensor_modbus_by_id(host, auth_token, sensor_modbus_id):
     """
     url = f"{host}/sensors-modbus/{sensor_modbus_id}"
     headers = {"Authorization": f"Bearer {auth_token}"}
-    return await fetch_with_retry(url=url, headers=headers)
+    return await fetch_with_retry(url=url, headers=headers, cacheable=True)
 
 
 async def fetch_sensor_dnp_by_id(host, auth_token, sensor_dnp_id):
@@ -286,4 +356,4 @@ async def fetch_sensor_dnp_by_id(host, auth_token, sensor_dnp_id):
     """
     url = f"{host}/sensors-dnp/{sensor_dnp_id}"
     headers = {"Authorization": f"Bearer {auth_token}"}
-    return await fetch_with_retry(url=url, headers=headers)
+    return await fetch_with_retry(url=url, headers=headers, cacheable=True)
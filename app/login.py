@@ -1,35 +1,166 @@
 import asyncio
+import base64
 import json
 import os
+import time
+from typing import Awaitable, Callable, Optional
 
 import aiohttp
 
+from app.logger import logger
+from app.utils.http_client import http_client
+
 
 async def get_auth_token(host: str, username: str, password: str):
     url = f"{host}/auth/token"
     headers = {"Content-Type": "application/json"}
     payload = {"username": username, "password": password}
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, headers=headers, json=payload) as response:
-            if response.status == 201:
-                token_response = await response.json()
-                return token_response.get(
-                    "access_token"
-                )  # Assumindo que o token está nesta chave
-            else:
-                # Gerencia o erro de autenticação
-                raise Exception(f"Failed to get token, status code: {response.status}")
-        response
+    session = await http_client.get_session()
+    async with session.post(url, headers=headers, json=payload) as response:
+        if response.status == 201:
+            token_response = await response.json()
+            return token_response.get(
+                "access_token"
+            )  # Assumindo que o token está nesta chave
+        else:
+            # Gerencia o erro de autenticação
+            raise Exception(f"Failed to get token, status code: {response.status}")
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """
+    Lê o instante de expiração (`exp`, em segundos desde a época) de um JWT.
+
+    A assinatura não é verificada: o valor só é usado para renovar o token antes
+    que ele expire.
+
+    Returns:
+        float | None: Expiração do token ou None se ele não for um JWT com `exp`.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+class TokenManager:
+    """
+    Mantém o token de acesso da API CMA Web válido durante toda a coleta.
+
+    - O token é obtido no primeiro uso e renovado em segundo plano
+      `refresh_margin` segundos antes do `exp` do JWT.
+    - Renovações simultâneas (ex.: várias requisições recebendo 401 ao mesmo
+      tempo) são agrupadas em um único login.
+    - `refresh(stale_token)` não faz novo login se o token recusado já foi
+      substituído por outra tarefa; basta repetir a requisição com o atual.
+
+    Args:
+        login (Callable): Função assíncrona sem argumentos que retorna um token novo.
+        refresh_margin (float): Antecedência da renovação, em segundos. Padrão: 60.
+    """
+
+    def __init__(
+        self, login: Callable[[], Awaitable[str]], refresh_margin: float = 60
+    ):
+        self._login = login
+        self.refresh_margin = refresh_margin
+        self._token: Optional[str] = None
+        self._refresh_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Future] = None
+        self._background: Optional[asyncio.Task] = None
+        self.logins = 0
+
+    @property
+    def token(self) -> Optional[str]:
+        return self._token
+
+    def set_token(self, token: Optional[str]):
+        """Define o token atual e calcula quando ele deve ser renovado."""
+        self._token = token
+        expires_at = token_expiry(token) if token else None
+        if expires_at is None:
+            self._refresh_at = None
+            return
+        # tokens de vida curta são renovados na metade da validade
+        lifetime = max(expires_at - time.time(), 0)
+        self._refresh_at = expires_at - min(self.refresh_margin, lifetime / 2)
+
+    def is_fresh(self) -> bool:
+        return self._token is not None and (
+            self._refresh_at is None or time.time() < self._refresh_at
+        )
+
+    async def get_token(self) -> str:
+        """Retorna o token atual, fazendo login se não houver token válido."""
+        if self.is_fresh():
+            return self._token
+        return await self.refresh()
+
+    async def refresh(self, stale_token: Optional[str] = None) -> str:
+        """
+        Obtém um token novo, compartilhando o login com renovações em andamento.
+
+        Args:
+            stale_token (str, optional): Token recusado pela API (401). Se já foi
+                substituído por um token válido, este é retornado sem novo login.
+
+        Returns:
+            str: Token válido.
+        """
+        if stale_token is not None and self._token != stale_token and self.is_fresh():
+            return self._token
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._do_refresh())
+        # shield: o cancelamento de quem espera não cancela o login compartilhado
+        return await asyncio.shield(self._refresh_task)
+
+    async def _do_refresh(self) -> str:
+        self.logins += 1
+        logger.info("Obtendo novo token de acesso...")
+        self.set_token(await self._login())
+        self._schedule_background_refresh()
+        return self._token
+
+    def _schedule_background_refresh(self):
+        if self._background is not None and self._background is not asyncio.current_task():
+            self._background.cancel()
+        self._background = None
+        if self._refresh_at is None:
+            return
+        delay = max(self._refresh_at - time.time(), 0)
+        self._background = asyncio.get_running_loop().create_task(
+            self._refresh_later(delay)
+        )
+
+    async def _refresh_later(self, delay: float):
+        await asyncio.sleep(delay)
+        try:
+            await self.refresh()
+        except Exception as e:
+            # a próxima requisição tenta novamente (get_token ou replay do 401)
+            logger.warning(f"Falha na renovação antecipada do token: {e}")
+
+    def invalidate(self):
+        """Descarta o token atual; o próximo `get_token` fará login."""
+        self._token = None
+        self._refresh_at = None
+
+    async def close(self):
+        """Cancela a renovação em segundo plano."""
+        if self._background is not None:
+            self._background.cancel()
+            self._background = None
 
 
 def relogin():
+    """Descarta o token atual para que o próximo uso faça um novo login."""
     from .settings import configs
 
-    host = os.environ.get("GWTDADOS_HOST")
-    username = os.environ.get("GWTDADOS_USERNAME")
-    password = os.environ.get("GWTDADOS_PASSWORD")
-    configs.auth_token = asyncio.run(get_auth_token(host, username, password))
+    configs.token_manager.invalidate()
 
 
 if __name__ == "__main__":
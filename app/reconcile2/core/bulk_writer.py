@@ -0,0 +1,253 @@
+import sqlite3
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from app.logger import logger
+
+from .db_connection import DatabaseConnection
+
+# linhas enviadas por executemany
+DEFAULT_CHUNK_SIZE = 5000
+
+# chaves por `IN (?, ...)`: abaixo do limite de variáveis de qualquer versão do SQLite
+IN_CHUNK_SIZE = 500
+
+
+def sql_rows(df: pd.DataFrame) -> Iterator[tuple]:
+    """
+    Converte o DataFrame, uma única vez, em tuplas de tipos nativos do Python.
+
+    Nulos (NaN/None/NaT) viram None e os escalares numpy viram int/float/bool,
+    aceitos diretamente pelo sqlite3.
+    """
+    values = df.astype(object).where(df.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def coerce_columns(df: pd.DataFrame, types: Dict[str, type]) -> pd.DataFrame:
+    """
+    Converte, coluna a coluna e de uma só vez, os tipos das colunas de `types`.
+
+    `str`, `int` e `float` mantêm os nulos (gravados como NULL); `int` trunca a
+    parte decimal e `bool` segue a veracidade do Python (nulo é False).
+
+    Args:
+        df (pd.DataFrame): Linhas a converter.
+        types (dict): Tipo (str, int, float ou bool) de cada coluna.
+
+    Returns:
+        pd.DataFrame: Novo DataFrame só com as colunas de `types`, nesta ordem.
+
+    Raises:
+        ValueError: Se uma coluna numérica tiver valores não numéricos.
+    """
+    columns = {}
+    for column, kind in types.items():
+        series = df[column]
+        if kind is str:
+            values = series.astype(object)
+            columns[column] = values.where(series.isna(), values.astype(str))
+        elif kind is int:
+            numbers = np.trunc(pd.to_numeric(series).astype("float64"))
+            columns[column] = pd.Series(numbers, index=df.index).astype("Int64")
+        elif kind is float:
+            columns[column] = pd.to_numeric(series).astype("float64")
+        elif kind is bool:
+            columns[column] = series.notna() & series.astype(bool)
+        else:
+            raise ValueError(f"Tipo não suportado para {column}: {kind}")
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _chunks(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def upsert_dataframe(
+    db: DatabaseConnection,
+    table_name: str,
+    df: pd.DataFrame,
+    primary_key: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Insere ou atualiza as linhas de `df` na tabela, sem recriá-la.
+
+    Usa `INSERT ... ON CONFLICT(pk) DO UPDATE` com `executemany` em lotes de
+    `chunk_size` linhas, todos dentro de um único SAVEPOINT: ou todas as linhas
+    são gravadas ou nenhuma. O esquema, a chave primária e os índices da tabela
+    são preservados e o custo depende só das linhas gravadas. Em tabelas sem
+    restrição de unicidade na chave (ex.: recriadas pelo antigo
+    `to_sql(if_exists="replace")`) as linhas são apagadas e reinseridas.
+
+    Args:
+        db (DatabaseConnection): Conexão aberta.
+        table_name (str): Tabela de destino.
+        df (pd.DataFrame): Linhas a gravar; as colunas devem existir na tabela.
+        primary_key (str): Coluna da chave primária.
+        chunk_size (int): Linhas por `executemany`. Padrão: `DEFAULT_CHUNK_SIZE`.
+
+    Returns:
+        int: Número de linhas gravadas.
+    """
+    if df.empty:
+        return 0
+    columns = list(df.columns)
+    names = ", ".join(map(_quote, columns))
+    placeholders = ", ".join("?" * len(columns))
+    updates = ", ".join(
+        f"{_quote(c)} = excluded.{_quote(c)}" for c in columns if c != primary_key
+    )
+    insert = f"INSERT INTO {_quote(table_name)} ({names}) VALUES ({placeholders})"
+    if updates:
+        query = f"{insert} ON CONFLICT({_quote(primary_key)}) DO UPDATE SET {updates}"
+    else:
+        query = f"{insert} ON CONFLICT({_quote(primary_key)}) DO NOTHING"
+
+    with db.savepoint(f"upsert_{table_name}"):
+        try:
+            for chunk in _chunks(sql_rows(df), chunk_size):
+                db.executemany(query, chunk)
+        except sqlite3.OperationalError as e:
+            if "ON CONFLICT" not in str(e):
+                raise
+            logger.warning(
+                f"Tabela {table_name} sem chave primária ({e}): "
+                "gravando com DELETE + INSERT"
+            )
+            _replace_rows(db, table_name, df, primary_key, insert, chunk_size)
+    return len(df)
+
+
+def _replace_rows(
+    db: DatabaseConnection,
+    table_name: str,
+    df: pd.DataFrame,
+    primary_key: str,
+    insert: str,
+    chunk_size: int,
+):
+    """Alternativa ao UPSERT para tabelas sem restrição de unicidade na chave."""
+    delete = f"DELETE FROM {_quote(table_name)} WHERE {_quote(primary_key)} = ?"
+    for chunk in _chunks(sql_rows(df[[primary_key]]), chunk_size):
+        db.executemany(delete, chunk)
+    for chunk in _chunks(sql_rows(df), chunk_size):
+        db.executemany(insert, chunk)
+
+
+def update_dataframe(
+    db: DatabaseConnection,
+    table_name: str,
+    df: pd.DataFrame,
+    primary_key: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Atualiza as linhas já existentes da tabela com os valores de `df`.
+
+    Um único `UPDATE ... WHERE pk = ?` é enviado por `executemany` em lotes de
+    `chunk_size` linhas, dentro de um SAVEPOINT. Chaves que não existem na tabela
+    são ignoradas.
+
+    Args:
+        db (DatabaseConnection): Conexão aberta.
+        table_name (str): Tabela de destino.
+        df (pd.DataFrame): Linhas a gravar (a chave primária e as colunas a atualizar).
+        primary_key (str): Coluna da chave primária.
+        chunk_size (int): Linhas por `executemany`. Padrão: `DEFAULT_CHUNK_SIZE`.
+
+    Returns:
+        int: Número de linhas da tabela atualizadas.
+    """
+    if df.empty:
+        return 0
+    columns = [c for c in df.columns if c != primary_key]
+    updates = ", ".join(f"{_quote(c)} = ?" for c in columns)
+    query = f"UPDATE {_quote(table_name)} SET {updates} WHERE {_quote(primary_key)} = ?"
+    updated = 0
+    with db.savepoint(f"update_{table_name}"):
+        for chunk in _chunks(sql_rows(df[columns + [primary_key]]), chunk_size):
+            db.executemany(query, chunk)
+            updated += db.cursor.rowcount
+    return updated
+
+
+def _in_chunks(keys: Iterable[Any], size: int) -> Iterator[tuple]:
+    """Chaves em tuplas de `size` (a última pode ser menor)"""
+    keys = iter(keys)
+    while chunk := tuple(islice(keys, size)):
+        yield chunk
+
+
+def _where_in(column: str, count: int) -> str:
+    return f"{_quote(column)} IN ({', '.join('?' * count)})"
+
+
+def delete_keys(
+    db: DatabaseConnection,
+    table_name: str,
+    primary_key: str,
+    keys: Iterable[Any],
+    chunk_size: int = IN_CHUNK_SIZE,
+) -> int:
+    """
+    Remove da tabela as linhas cujas chaves estão em `keys`.
+
+    As chaves seguem como parâmetros de um único `DELETE ... WHERE pk IN (?, ...)`
+    de `chunk_size` posições, executado por `executemany` (o comando é preparado
+    uma vez) e, para o resto, um segundo comando menor; tudo dentro de um
+    SAVEPOINT. O tamanho do SQL e o número de variáveis ficam limitados, e nenhum
+    valor é interpolado no comando.
+
+    Args:
+        db (DatabaseConnection): Conexão aberta.
+        table_name (str): Tabela de origem.
+        primary_key (str): Coluna da chave primária.
+        keys (Iterable): Chaves a remover.
+        chunk_size (int): Chaves por comando. Padrão: `IN_CHUNK_SIZE`.
+
+    Returns:
+        int: Número de linhas removidas.
+    """
+    query = f"DELETE FROM {_quote(table_name)} WHERE "
+    # em ordem, os lotes percorrem o índice da chave sequencialmente
+    chunks = list(_in_chunks(sorted(keys, key=str), chunk_size))
+    full = [chunk for chunk in chunks if len(chunk) == chunk_size]
+    rest = [chunk for chunk in chunks if len(chunk) < chunk_size]
+    removed = 0
+    with db.savepoint(f"delete_{table_name}"):
+        if full:
+            db.executemany(query + _where_in(primary_key, chunk_size), full)
+            removed += db.cursor.rowcount
+        for chunk in rest:
+            db.execute(query + _where_in(primary_key, len(chunk)), chunk)
+            removed += db.cursor.rowcount
+    return removed
+
+
+def fetch_keys(
+    db: DatabaseConnection,
+    table_name: str,
+    primary_key: str,
+    keys: Iterable[Any],
+    chunk_size: int = IN_CHUNK_SIZE,
+) -> pd.DataFrame:
+    """Lê da tabela as linhas cujas chaves estão em `keys`, em lotes como `delete_keys`."""
+    query = f"SELECT * FROM {_quote(table_name)} WHERE "
+    frames = [
+        pd.read_sql_query(
+            query + _where_in(primary_key, len(chunk)), db.connection, params=chunk
+        )
+        for chunk in _in_chunks(keys, chunk_size)
+    ]
+    if not frames:
+        return db.fetch_dataframe(f"SELECT * FROM {_quote(table_name)} LIMIT 0")
+    return pd.concat(frames, ignore_index=True)
@@ -1,9 +1,12 @@
-import json
+import os
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
+from app.utils import json_codec
+from app.utils.columnar import read_parquet
+
 
 class DataLoader(ABC):
     """Base para carregamento de dados"""
@@ -18,11 +21,47 @@ class JsonDataLoader(DataLoader):
 
     def __init__(self, file_path: str):
         self.file_path = file_path
+        self._df = None
 
-    def load(self) -> pd.DataFrame:
-        """Carrega dados de um arquivo JSON e retorna um DataFrame."""
-        with open(self.file_path) as f:
-            return pd.DataFrame(json.load(f))
+    def load(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Carrega dados de um arquivo JSON e retorna um DataFrame.
+
+        Com `columns`, o arquivo é lido uma única vez e cada chamada recebe uma
+        cópia apenas com as colunas pedidas (as ausentes são ignoradas).
+        """
+        if columns is None:
+            with open(self.file_path, "rb") as f:
+                return pd.DataFrame(json_codec.load(f))
+        if self._df is None:
+            self._df = self.load()
+        return self._df[[c for c in dict.fromkeys(columns) if c in self._df]].copy()
+
+
+class ParquetDataLoader(DataLoader):
+    """Carrega dados do snapshot colunar (Parquet), lendo só as colunas pedidas."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def load(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Carrega as colunas `columns` (todas se None) do arquivo Parquet."""
+        return read_parquet(self.file_path, columns)
+
+
+def create_snapshot_loader(directory: str = ".") -> DataLoader:
+    """
+    Retorna o loader do snapshot da coleta: `data.parquet` quando existir e não
+    for mais antigo que o `data.json` (leitura colunar com projeção) ou `data.json`.
+    """
+    parquet_path = os.path.join(directory, "data.parquet")
+    json_path = os.path.join(directory, "data.json")
+    if os.path.exists(parquet_path) and (
+        not os.path.exists(json_path)
+        or os.path.getmtime(parquet_path) >= os.path.getmtime(json_path)
+    ):
+        return ParquetDataLoader(parquet_path)
+    return JsonDataLoader(json_path)
 
 
 class GatewayDataLoader(JsonDataLoader):
@@ -34,6 +73,9 @@ class GatewayDataLoader(JsonDataLoader):
 
     def load(self) -> pd.DataFrame:
         """Carrega e parseia dados de gateways de um arquivo JSON e retorna um DataFrame."""
-        with open(self.file_path) as f:
-            data = [self.parser(gw) for gw in json.load(f)]
-            return pd.DataFrame(data)
+        with open(self.file_path, "rb") as f:
+            items = json_codec.load(f)
+        # parsers gerados por compile_parser convertem a lista direto em colunas
+        if hasattr(self.parser, "batch"):
+            return pd.DataFrame(self.parser.batch(items))
+        return pd.DataFrame([self.parser(gw) for gw in items])
@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Set
+from typing import Dict, List, Optional
 
 import pandas as pd
 
 from app.logger import logger
+from app.settings import configs
 
+from .bulk_writer import delete_keys, fetch_keys, upsert_dataframe
 from .db_connection import DatabaseConnection
+from .row_hash import RowHashStore, diff_hashes, normalize_column, row_hashes
 
 
 class DataSynchronizer(ABC):
@@ -22,105 +25,92 @@ class BaseDataSynchronizer(DataSynchronizer):
     def __init__(self, table_name: str, primary_key: str):
         self.table_name = table_name
         self.primary_key = primary_key
+        # hashes das linhas persistidos no banco (evita ler a tabela inteira)
+        self.hash_store: Optional[RowHashStore] = (
+            RowHashStore() if configs.RECONCILE_HASH_STORE else None
+        )
 
     def synchronize(self, df: pd.DataFrame, db: DatabaseConnection):
-        existing_data = self._get_existing_data(db)
-        changes = self._analyze_changes(df, existing_data)
+        changes = self._analyze_changes(df, db)
 
         self._log_changes(changes)
         self._apply_changes(changes, df, db)
+        self._save_hashes(changes, db)
 
     def _get_existing_data(self, db: DatabaseConnection) -> pd.DataFrame:
         return db.fetch_dataframe(f"SELECT * FROM {self.table_name}")
 
+    def _get_columns(self, db: DatabaseConnection) -> List[str]:
+        """Colunas da tabela, na ordem do esquema"""
+        db.execute(f'PRAGMA table_info("{self.table_name}")')
+        return [row[1] for row in db.cursor.fetchall()]
+
+    def _get_stored_hashes(
+        self, db: DatabaseConnection, columns: List[str]
+    ) -> pd.Series:
+        """
+        Hashes das linhas do banco: lidos do `hash_store` quando conferem com a
+        tabela ou recalculados a partir dela (e então persistidos no `hash_store`).
+        """
+        if self.hash_store is not None:
+            stored = self.hash_store.load(db, self.table_name)
+            if stored is not None:
+                return stored
+        stored = row_hashes(self._get_existing_data(db), self.primary_key, columns)
+        if self.hash_store is not None:
+            self.hash_store.replace(db, self.table_name, stored)
+        return stored
+
     def _analyze_changes(
-        self, df: pd.DataFrame, existing_data: pd.DataFrame
+        self, df: pd.DataFrame, db: DatabaseConnection
     ) -> Dict[str, any]:
         """
-        Analisa as diferenças entre os DataFrames e retorna um dicionário com as alterações.
+        Analisa as diferenças entre o DataFrame e a tabela e retorna um dicionário com as alterações.
+
+        As linhas são comparadas pelos pares (chave primária, hash do conteúdo
+        normalizado), ver `row_hash.py`.
 
         args:
             df: DataFrame com os novos dados
-            existing_data: DataFrame com os dados existentes no banco de dados
+            db: Conexão com o banco de dados
 
         returns:
             Dicionário com 'new' (novos registros), 'update' (registros a atualizar),
-            'remove' (IDs a remover) e 'total' (total de registros de entrada)
+            'remove' (IDs a remover), 'total' (total de registros de entrada) e
+            'hashes' (hashes dos registros novos e atualizados)
         """
-        if df.empty:
-            return {
-                "new": df,  # df vazio não há novos registros
-                "update": df,  # df vazio não há registros a atualizar
-                "remove": set(
-                    existing_data[self.primary_key]
-                ),  # remover todos os registros existentes
-                "total": len(df),  # total de registros de entrada
-            }
-        # verificar se o df tem totas as colunas do existing_data
-        if not df.columns.equals(existing_data.columns):
-            # quais colunas estão faltando no df
-            missing_columns = existing_data.columns.difference(df.columns)
+        columns = self._get_columns(db) or list(df.columns)
+        # verificar se o df tem todas as colunas da tabela
+        missing_columns = [column for column in columns if column not in df.columns]
+        for column in missing_columns:
             # criar as colunas faltantes no df com valores string vazios
-            for column in missing_columns:
-                df[column] = ""
-                print(f"Coluna {column} criada no DataFrame com valores vazios")
-
-        # só manter as colunas que existem no existing_data
-        df = df[existing_data.columns]
-
-        new_records = df[~df[self.primary_key].isin(existing_data[self.primary_key])]
-        common_records = df[df[self.primary_key].isin(existing_data[self.primary_key])]
-
-        # IDs a remover (registros que não estão no DataFrame são desnecessários)
-        df_ids = set(df[self.primary_key])  # conjunto de IDs do DataFrame
-        db_ids = set(
-            existing_data[self.primary_key]
-        )  # conjunto de IDs do banco de dados
-        records_to_remove = (
-            db_ids - df_ids
-        )  # IDs a remover são os IDs do banco de dados que não estão no DataFrame
-
-        # Regra de negócio: só atualizar registros que possuem diferenças
-        if not common_records.empty:
-            # Normalizar os tipos de dados entre os DataFrames novos e existentes (se necessário)
-            if list(common_records.dtypes) != list(existing_data.dtypes):
-                for column in common_records.columns:  # analisar cada coluna
-                    if (
-                        common_records[column].dtype != existing_data[column].dtype
-                    ):  # se o tipo de dado for diferente
-                        # converter o tipo de dado da coluna do DataFrame comum para o tipo de dado do DataFrame existente
-                        try:
-                            existing_data[column] = existing_data[column].astype(
-                                common_records[column].dtype
-                            )
-                            logger.warning(
-                                f"{column} convertido para {common_records[column].dtype}"
-                            )
-                        except ValueError as e:
-                            logger.error(
-                                f"Erro ao converter {column} para {existing_data[column].dtype}: {e}"
-                            )
-                            # converter o tipo de ambos os DataFrames para o tipo para string
-                            common_records[column] = common_records[column].astype(str)
-                            existing_data[column] = existing_data[column].astype(str)
+            df[column] = ""
+            print(f"Coluna {column} criada no DataFrame com valores vazios")
 
-            # regra de negócio: só atualizar registros que possuem diferenças
-            merged_df = existing_data.merge(
-                common_records, indicator=True, how="outer"
-            )  # merge dos DataFrames
-            changed_rows_df = merged_df[
-                merged_df["_merge"] == "right_only"
-            ]  # registros que possuem diferenças
-            diff_df = changed_rows_df.drop("_merge", axis=1)  # remover a coluna _merge
-            common_records = diff_df  # atualizar common_records para os registros que possuem diferenças
+        # só manter as colunas que existem na tabela
+        df = df[columns]
+
+        incoming = row_hashes(df, self.primary_key, columns)
+        diff = diff_hashes(incoming, self._get_stored_hashes(db, columns))
 
+        keys = normalize_column(df[self.primary_key])
         return {
-            "new": new_records,  # novos registros para inserir
-            "update": common_records,  # registros necessitando atualizar
-            "remove": records_to_remove,  # IDs a remover (registros que não estão no DataFrame são desnecessários)
+            "new": df[keys.isin(diff.new)],  # novos registros para inserir
+            # regra de negócio: só atualizar registros que possuem diferenças
+            "update": df[keys.isin(diff.changed)],
+            # IDs a remover (registros que não estão no DataFrame são desnecessários)
+            "remove": diff.removed,
             "total": len(df),  # total de registros de entrada
+            "hashes": incoming[incoming.index.isin(diff.new | diff.changed)],
         }
 
+    def _save_hashes(self, changes: Dict[str, any], db: DatabaseConnection):
+        """Atualiza o `hash_store` com as alterações aplicadas"""
+        if self.hash_store is None:
+            return
+        self.hash_store.remove(db, self.table_name, changes["remove"])
+        self.hash_store.save(db, self.table_name, changes["hashes"])
+
     def _log_changes(self, changes: Dict[str, any]):
         """Exibe um resumo das alterações identificadas"""
         mgs = (
@@ -173,20 +163,18 @@ class BaseDataSynchronizer(DataSynchronizer):
             logger.info(f"Nenhum novo registro inserido na tabela {self.table_name}.")
 
     def _remove_records(self, record_ids: set, db: DatabaseConnection):
-        """Remove registros do banco de dados"""
-        query = f"DELETE FROM {self.table_name} WHERE {self.primary_key} IN (\"{'","'.join(map(str, record_ids))}\")"
-        db.execute(query)
+        """Remove registros do banco de dados (DELETE parametrizado em lotes)"""
+        delete_keys(db, self.table_name, self.primary_key, record_ids)
 
     def _update_records(self, records: pd.DataFrame, db: DatabaseConnection):
-        """Atualiza registros existentes no banco de dados"""
-        records.to_sql(self.table_name, db.connection, if_exists="replace", index=False)
+        """Atualiza registros existentes no banco de dados (UPSERT em lote)"""
+        upsert_dataframe(db, self.table_name, records, self.primary_key)
 
     def _insert_records(self, records: pd.DataFrame, db: DatabaseConnection):
-        """Insere novos registros no banco de dados"""
+        """Insere novos registros no banco de dados (UPSERT em lote)"""
         print("Inserindo registros no banco de dados")
-        records.to_sql(self.table_name, db.connection, if_exists="append", index=False)
+        upsert_dataframe(db, self.table_name, records, self.primary_key)
 
-    def _get_record_by_ids(self, ids: list, db: DatabaseConnection) -> Set[str]:
+    def _get_record_by_ids(self, ids: list, db: DatabaseConnection) -> pd.DataFrame:
         """Obtém os registros dos IDs fornecidos"""
-        query = f"SELECT * FROM {self.table_name} WHERE {self.primary_key} IN (\"{'","'.join(map(str, ids))}\")"
-        return db.fetch_dataframe(query)
+        return fetch_keys(db, self.table_name, self.primary_key, ids)
@@ -1,29 +1,133 @@
 import sqlite3
-from typing import Optional
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
 
 import pandas as pd
 
+from app.logger import logger
+
+# pragmas da sessão de conciliação: WAL (leitores não bloqueiam durante a escrita),
+# fsync só nos checkpoints, 64 MB de cache de páginas, leitura via mmap e
+# tabelas temporárias em memória
+RECONCILE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+@dataclass
+class SyncStats:
+    """
+    Pontos de sincronização com o disco (fsync) de uma conexão.
+
+    O SQLite não expõe a contagem de fsync: eles ocorrem nos commits (modo
+    rollback journal ou `synchronous=FULL`) e nos checkpoints do WAL, que são
+    contados e cronometrados aqui.
+    """
+
+    commits: int = 0
+    commit_seconds: float = 0.0
+    checkpoints: int = 0
+    checkpoint_seconds: float = 0.0
+    wal_frames: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.commits} commits ({self.commit_seconds:.3f} s), "
+            f"{self.checkpoints} checkpoints ({self.checkpoint_seconds:.3f} s, "
+            f"{self.wal_frames} páginas do WAL)"
+        )
+
 
 class DatabaseConnection:
-    """Gerencia conexão com banco de dados"""
+    """
+    Gerencia conexão com banco de dados
 
-    def __init__(self, db_path: str):
+    Args:
+        db_path (str): Caminho do banco SQLite.
+        pragmas (dict): PRAGMAs aplicados ao abrir (ex.: `RECONCILE_PRAGMAS`).
+        single_transaction (bool): Abre uma transação explícita, confirmada só na
+            saída do bloco `with` e desfeita por inteiro se ele falhar.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: Optional[Dict[str, Any]] = None,
+        single_transaction: bool = False,
+    ):
         self.db_path = db_path
+        self.pragmas = pragmas or {}
+        self.single_transaction = single_transaction
         self.connection: Optional[sqlite3.Connection] = None
         self.cursor: Optional[sqlite3.Cursor] = None
+        self.journal_mode: Optional[str] = None
+        self.stats = SyncStats()
 
     def __enter__(self):
         self.connection = sqlite3.connect(self.db_path)
         self.cursor = self.connection.cursor()
+        for name, value in self.pragmas.items():
+            self.cursor.execute(f"PRAGMA {name} = {value}")
+        self.journal_mode = self.cursor.execute("PRAGMA journal_mode").fetchone()[0]
+        if self.single_transaction:
+            self.cursor.execute("BEGIN")
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.connection:
-            self.connection.commit()
-            self.connection.close()
+            try:
+                if exc_type is not None and self.single_transaction:
+                    self.connection.rollback()
+                    logger.error(f"Transação desfeita em {self.db_path}: {exc_val}")
+                else:
+                    self.commit()
+                if self.journal_mode == "wal":
+                    self.checkpoint()
+            finally:
+                self.connection.close()
+
+    def commit(self):
+        """Confirma a transação corrente, contabilizando o tempo em `stats`"""
+        start = time.perf_counter()
+        self.connection.commit()
+        self.stats.commit_seconds += time.perf_counter() - start
+        self.stats.commits += 1
+
+    def checkpoint(self):
+        """Copia o WAL para o banco sem bloquear os leitores (checkpoint PASSIVE)"""
+        start = time.perf_counter()
+        row = self.cursor.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        self.stats.checkpoint_seconds += time.perf_counter() - start
+        self.stats.checkpoints += 1
+        self.stats.wal_frames += max(row[2], 0)
 
     def execute(self, query: str, params: tuple = ()):
         self.cursor.execute(query, params)
 
+    def executemany(self, query: str, rows: Iterable[tuple]):
+        self.cursor.executemany(query, rows)
+
+    @contextmanager
+    def savepoint(self, name: str):
+        """
+        Executa o bloco dentro de um SAVEPOINT: desfeito por inteiro se falhar.
+
+        Fora de uma transação o SAVEPOINT abre uma, confirmada no fim do bloco.
+        """
+        self.cursor.execute(f'SAVEPOINT "{name}"')
+        try:
+            yield self
+        except BaseException:
+            self.cursor.execute(f'ROLLBACK TO "{name}"')
+            self.cursor.execute(f'RELEASE "{name}"')
+            raise
+        self.cursor.execute(f'RELEASE "{name}"')
+
     def fetch_dataframe(self, query: str) -> pd.DataFrame:
         return pd.read_sql_query(query, self.connection)
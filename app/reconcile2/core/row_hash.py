@@ -0,0 +1,201 @@
+import math
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from .db_connection import DatabaseConnection
+
+# marcador de valor nulo na forma normalizada (não colide com textos comuns)
+NULL = "\x00"
+
+# tabela auxiliar com os hashes das linhas já sincronizadas
+HASH_TABLE = "RECONCILE_ROW_HASHES"
+
+
+def normalize_value(value: Any) -> str:
+    """
+    Converte um valor para a forma textual usada no hash.
+
+    A forma é a mesma para o valor vindo do snapshot e para o lido do SQLite:
+    nulos (None/NaN) viram `NULL`, booleanos viram "1"/"0" e floats inteiros
+    perdem a parte decimal (1.0 e 1 são iguais), como acontece com as colunas
+    INTEGER/BOOLEAN/FLOAT do banco.
+    """
+    if value is None:
+        return NULL
+    if isinstance(value, (bool, np.bool_)):
+        return "1" if value else "0"
+    if isinstance(value, (float, np.floating)):
+        if math.isnan(value):
+            return NULL
+        if value.is_integer() and abs(value) < 2**53:
+            return str(int(value))
+        return repr(float(value))
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if value is pd.NA or value is pd.NaT:
+        return NULL
+    return str(value)
+
+
+def normalize_column(series: pd.Series) -> pd.Series:
+    """
+    Normaliza uma coluna inteira com `normalize_value`.
+
+    Colunas numéricas, booleanas e de texto puro são convertidas de forma
+    vetorizada; só colunas com tipos misturados passam valor a valor.
+    """
+    values = series.to_numpy()
+    if pd.api.types.is_bool_dtype(series.dtype) and not series.hasnans:
+        out = np.where(values.astype(bool), "1", "0").astype(object)
+    elif pd.api.types.is_integer_dtype(series.dtype) and not series.hasnans:
+        out = np.array(list(map(str, values.tolist())), dtype=object)
+    elif pd.api.types.is_float_dtype(series.dtype):
+        floats = values.astype("float64")
+        integral = np.isfinite(floats) & (np.floor(floats) == floats)
+        integral &= np.abs(floats) < 2**53
+        out = np.empty(len(floats), dtype=object)
+        out[:] = list(map(repr, floats.tolist()))
+        out[integral] = list(map(str, floats[integral].astype("int64").tolist()))
+        out[np.isnan(floats)] = NULL
+    elif pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+        out = series.to_numpy(dtype=object, copy=True)
+        out[series.isna().to_numpy()] = NULL
+    else:
+        out = np.array([normalize_value(v) for v in values], dtype=object)
+    return pd.Series(out, index=series.index, dtype=object)
+
+
+def row_hashes(
+    df: pd.DataFrame, primary_key: str, columns: Optional[List[str]] = None
+) -> pd.Series:
+    """
+    Calcula o hash de conteúdo de cada linha.
+
+    Args:
+        df (pd.DataFrame): Linhas a resumir.
+        primary_key (str): Coluna da chave primária.
+        columns (list): Colunas que entram no hash, nesta ordem (padrão: todas).
+
+    Returns:
+        pd.Series: Hash (int64) de cada linha, indexado pela chave normalizada.
+        Chaves repetidas ficam com a última ocorrência.
+    """
+    if df.empty:
+        return pd.Series([], index=pd.Index([], dtype=object), dtype="int64")
+    columns = list(df.columns) if columns is None else columns
+    keys = normalize_column(df[primary_key])
+    normalized = pd.DataFrame(
+        {i: normalize_column(df[column]) for i, column in enumerate(columns)}
+    )
+    hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+    result = pd.Series(hashes.view("int64"), index=pd.Index(keys, dtype=object))
+    return result[~result.index.duplicated(keep="last")]
+
+
+@dataclass
+class RowDiff:
+    """Chaves (normalizadas) novas, alteradas e removidas entre dois conjuntos de hashes."""
+
+    new: Set[str] = field(default_factory=set)
+    changed: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+
+
+def diff_hashes(incoming: pd.Series, stored: pd.Series) -> RowDiff:
+    """
+    Compara os pares (chave, hash) recebidos com os armazenados.
+
+    Args:
+        incoming (pd.Series): Hashes das linhas de entrada (de `row_hashes`).
+        stored (pd.Series): Hashes das linhas do banco.
+
+    Returns:
+        RowDiff: Chaves a inserir, a atualizar e a remover.
+    """
+    # posição de cada chave recebida entre as armazenadas (-1: chave nova)
+    positions = stored.index.get_indexer(incoming.index)
+    found = positions >= 0
+    differs = incoming.to_numpy()[found] != stored.to_numpy()[positions[found]]
+    kept = np.zeros(len(stored), dtype=bool)
+    kept[positions[found]] = True
+    return RowDiff(
+        new=set(incoming.index[~found]),
+        changed=set(incoming.index[found][differs]),
+        removed=set(stored.index[~kept]),
+    )
+
+
+class RowHashStore:
+    """
+    Guarda, por tabela, o hash de cada linha sincronizada (`HASH_TABLE`).
+
+    Com ele o sincronizador lê do banco só os pares (chave, hash), sem carregar a
+    tabela inteira. Os hashes são recalculados a partir da tabela sempre que o
+    número de linhas não confere (ex.: a tabela foi alterada por outro processo);
+    alterações de conteúdo feitas por fora não são percebidas, e nesse caso basta
+    chamar `clear` (ou apagar a tabela auxiliar) para forçar o recálculo.
+
+    Args:
+        table_name (str): Nome da tabela auxiliar. Padrão: `HASH_TABLE`.
+    """
+
+    def __init__(self, table_name: str = HASH_TABLE):
+        self.table_name = table_name
+
+    def initialize(self, db: DatabaseConnection):
+        db.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS "{self.table_name}" (
+                tabela VARCHAR NOT NULL,
+                chave VARCHAR NOT NULL,
+                hash INTEGER NOT NULL,
+                PRIMARY KEY (tabela, chave)
+            )
+            """
+        )
+
+    def load(self, db: DatabaseConnection, table: str) -> Optional[pd.Series]:
+        """
+        Retorna os hashes salvos de `table` ou None se não conferem com a tabela.
+        """
+        self.initialize(db)
+        db.execute(
+            f'SELECT chave, hash FROM "{self.table_name}" WHERE tabela = ?', (table,)
+        )
+        rows = db.cursor.fetchall()
+        db.execute(f'SELECT COUNT(*) FROM "{table}"')
+        (count,) = db.cursor.fetchone()
+        if not rows or len(rows) != count:
+            return None
+        keys, hashes = zip(*rows)
+        return pd.Series(hashes, index=pd.Index(keys, dtype=object), dtype="int64")
+
+    def save(self, db: DatabaseConnection, table: str, hashes: pd.Series):
+        """Grava (ou substitui) os hashes de `hashes`, indexados pela chave."""
+        self.initialize(db)
+        db.executemany(
+            f'INSERT OR REPLACE INTO "{self.table_name}" (tabela, chave, hash) '
+            "VALUES (?, ?, ?)",
+            zip([table] * len(hashes), hashes.index, map(int, hashes.to_numpy())),
+        )
+
+    def remove(self, db: DatabaseConnection, table: str, keys: Set[str]):
+        """Apaga os hashes das chaves `keys`."""
+        self.initialize(db)
+        db.executemany(
+            f'DELETE FROM "{self.table_name}" WHERE tabela = ? AND chave = ?',
+            ((table, key) for key in keys),
+        )
+
+    def replace(self, db: DatabaseConnection, table: str, hashes: pd.Series):
+        """Substitui todos os hashes de `table` por `hashes`."""
+        self.clear(db, table)
+        self.save(db, table, hashes)
+
+    def clear(self, db: DatabaseConnection, table: str):
+        """Apaga os hashes de `table`, forçando o recálculo na próxima sincronização."""
+        self.initialize(db)
+        db.execute(f'DELETE FROM "{self.table_name}" WHERE tabela = ?', (table,))
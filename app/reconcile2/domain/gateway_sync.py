@@ -18,16 +18,13 @@ class GatewayDataSynchronizer(BaseDataSynchronizer):
         self, changes: Dict[str, any], df: pd.DataFrame, db: DatabaseConnection
     ):
         if changes["remove"]:
-            query = f"DELETE FROM {self.table_name} WHERE {self.primary_key} IN (\"{'","'.join(map(str, changes['remove']))}\")"
-            db.execute(query)
+            self._remove_records(changes["remove"], db)
             logger.info(f"Removido o gateway de id: {changes['remove']}")
         else:
             logger.info("Nenhum gateway removido")
 
         if not changes["update"].empty:
-            changes["update"].to_sql(
-                self.table_name, db.connection, if_exists="replace", index=False
-            )
+            self._update_records(changes["update"], db)
             logger.info(
                 f"Atualizado gateway: {changes['update']["xid_gateway"].to_list()}"
             )
@@ -35,9 +32,7 @@ class GatewayDataSynchronizer(BaseDataSynchronizer):
             logger.info("Nenhum gateway atualizado")
 
         if not changes["new"].empty:
-            changes["new"].to_sql(
-                self.table_name, db.connection, if_exists="append", index=False
-            )
+            self._insert_records(changes["new"], db)
             logger.info(
                 f"Inserido novo gateway {changes['new']["xid_gateway"].to_list()}"
             )
@@ -3,6 +3,7 @@ from typing import Dict
 import pandas as pd
 
 from app.logger import logger
+from app.reconcile2.core.bulk_writer import coerce_columns, update_dataframe
 from app.reconcile2.core.data_synchronizer import BaseDataSynchronizer
 from app.reconcile2.core.db_connection import DatabaseConnection
 from app.reconcile2.scadalts.mutations import (  # import_datapoint_modbus,; import_datasource_modbus,; send_data_to_scada,
@@ -20,9 +21,34 @@ from app.scadalts import (
 class DpModbusDataSynchronizer(BaseDataSynchronizer):
     """Sincroniza dados Modbus"""
 
+    # tipos gravados em cada coluna atualizada de DP_MODBUS_IP
+    UPDATE_TYPES = {
+        "xid_equip": str,
+        "range": str,
+        "modbusDataType": str,
+        "additive": int,
+        "offset": int,
+        "bit": int,
+        "multiplier": float,
+        "slaveId": int,
+        "enabled": bool,
+        "nome": str,
+        "tipo": str,
+        "classificacao": str,
+        "xid_sensor": str,
+    }
+
     def __init__(self):
         super().__init__(table_name="DP_MODBUS_IP", primary_key="xid_sensor")
 
+    def _update_records(self, records: pd.DataFrame, db: DatabaseConnection):
+        """
+        Atualiza os datapoints existentes: os tipos de todas as colunas são
+        convertidos uma única vez e as linhas seguem em um único `executemany`.
+        """
+        typed = coerce_columns(records, self.UPDATE_TYPES)
+        update_dataframe(db, self.table_name, typed, self.primary_key)
+
     def _apply_changes(
         self, changes: Dict[str, any], df: pd.DataFrame, db: DatabaseConnection
     ):
@@ -39,30 +65,7 @@ class DpModbusDataSynchronizer(BaseDataSynchronizer):
             logger.info("Nenhum dispositivo foi remover.")
 
         if not changes["update"].empty:  # se houver registros a atualizar
-            for _, row in changes["update"].iterrows():
-                update_query = f"""
-                    UPDATE {self.table_name} SET
-                        xid_equip = ?, range = ?, modbusDataType = ?, additive = ?,
-                        offset = ?, bit = ?, multiplier = ?, slaveId = ?, enabled = ?,
-                        nome = ?, tipo = ?, classificacao = ?
-                    WHERE xid_sensor = ?
-                """
-                values = (
-                    str(row["xid_equip"]),
-                    str(row["range"]),
-                    str(row["modbusDataType"]),
-                    int(row["additive"]) if pd.notnull(row["additive"]) else None,
-                    int(row["offset"]) if pd.notnull(row["offset"]) else None,
-                    int(row["bit"]) if pd.notnull(row["bit"]) else None,
-                    float(row["multiplier"]) if pd.notnull(row["multiplier"]) else None,
-                    int(row["slaveId"]) if pd.notnull(row["slaveId"]) else None,
-                    bool(row["enabled"]),
-                    str(row["nome"]),
-                    str(row["tipo"]),
-                    str(row["classificacao"]),
-                    str(row["xid_sensor"]),
-                )
-                db.execute(update_query, values)
+            self._update_records(changes["update"], db)
             logger.info(f"Atualizados {len(changes['update'])} registros.")
             # send data to update in scada
             self._sync_datapoint_scada(df=changes["update"])
@@ -70,9 +73,7 @@ class DpModbusDataSynchronizer(BaseDataSynchronizer):
             logger.info("Nenhum dispositivo foi atualizado.")
 
         if not changes["new"].empty:  # se houver registros a inserir
-            changes["new"].to_sql(
-                self.table_name, db.connection, if_exists="append", index=False
-            )
+            self._insert_records(changes["new"], db)
             logger.info(f"Inseridos {len(changes['new'])} novos registros.")
             # send data to insert in scada
             self._sync_datapoint_scada(df=changes["new"])
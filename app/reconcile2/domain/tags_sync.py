@@ -17,24 +17,19 @@ class DpTagsDataSynchronizer(BaseDataSynchronizer):
         self, changes: Dict[str, any], df: pd.DataFrame, db: DatabaseConnection
     ):
         if changes["remove"]:
-            query = f"DELETE FROM {self.table_name} WHERE {self.primary_key} IN ({','.join(map(str, changes['remove']))})"
-            db.execute(query)
+            self._remove_records(changes["remove"], db)
             logger.info(f"Removido o DP_TAG de id: {changes['remove']}")
         else:
             logger.info("Nenhum DP_TAG removido")
 
         if not changes["update"].empty:
-            changes["update"].to_sql(
-                self.table_name, db.connection, if_exists="replace", index=False
-            )
+            self._update_records(changes["update"], db)
             logger.info(f"Atualizado DP_TAG: {changes['update']['id'].to_list()}")
         else:
             logger.info("Nenhum DP_TAG atualizado")
 
         if not changes["new"].empty:
-            changes["new"].to_sql(
-                self.table_name, db.connection, if_exists="append", index=False
-            )
+            self._insert_records(changes["new"], db)
             logger.info(f"Inserido novo DP_TAG {changes['new']['id'].to_list()}")
         else:
             logger.info("Nenhum novo DP_TAG inserido")
@@ -50,24 +45,19 @@ class EqpTagsDataSynchronizer(BaseDataSynchronizer):
         self, changes: Dict[str, any], df: pd.DataFrame, db: DatabaseConnection
     ):
         if changes["remove"]:
-            query = f"DELETE FROM {self.table_name} WHERE {self.primary_key} IN ({','.join(map(str, changes['remove']))})"
-            db.execute(query)
+            self._remove_records(changes["remove"], db)
             logger.info(f"Removido o EQP_TAG de id: {changes['remove']}")
         else:
             logger.info("Nenhum EQP_TAG removido")
 
         if not changes["update"].empty:
-            changes["update"].to_sql(
-                self.table_name, db.connection, if_exists="replace", index=False
-            )
+            self._update_records(changes["update"], db)
             logger.info(f"Atualizado EQP_TAG: {changes['update']['id'].to_list()}")
         else:
             logger.info("Nenhum EQP_TAG atualizado")
 
         if not changes["new"].empty:
-            changes["new"].to_sql(
-                self.table_name, db.connection, if_exists="append", index=False
-            )
+            self._insert_records(changes["new"], db)
             logger.info(f"Inserido novo EQP_TAG {changes['new']['id'].to_list()}")
         else:
             logger.info("Nenhum novo EQP_TAG inserido")
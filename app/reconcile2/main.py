@@ -1,13 +1,18 @@
 import json
 import sys
+import time
+from contextlib import contextmanager
 
 import pandas as pd
 
 from app.getters.gateway import parse_gateway_data
 from app.logger import logger
-from app.reconcile2.core.data_loader import GatewayDataLoader, JsonDataLoader
+from app.reconcile2.core.data_loader import (
+    GatewayDataLoader,
+    create_snapshot_loader,
+)
 from app.reconcile2.core.data_translator import DataTranslator
-from app.reconcile2.core.db_connection import DatabaseConnection
+from app.reconcile2.core.db_connection import RECONCILE_PRAGMAS, DatabaseConnection
 from app.reconcile2.core.db_schema import GenericSchema
 from app.reconcile2.domain.equipment_sync import ModbusEquipmentSynchronizer
 from app.reconcile2.domain.gateway_sync import GatewayDataSynchronizer
@@ -116,7 +121,7 @@ def create_equipment_dnp3_schema() -> GenericSchema:
 
 def create_eqp_tags_schema() -> GenericSchema:
     return GenericSchema(
-        table_name="TAGS_EQP",
+        table_name="EQP_TAGS",
         fields={
             "id": "VARCHAR NOT NULL",
             "xid_equip": "VARCHAR",
@@ -140,7 +145,7 @@ def create_dp_tags_schema() -> GenericSchema:
     )
 
 
-def sync_gateways():
+def sync_gateways(db: DatabaseConnection):
     logger.info("Sincronizando dados de gateways...")
     loader = GatewayDataLoader("./cma_gateways.json", parse_gateway_data)
     translator = DataTranslator(
@@ -154,34 +159,77 @@ def sync_gateways():
     # no df_translated, manter apenas as colunas que existem no schema
     df_translated = df_translated[schema.fields.keys()]
 
-    with DatabaseConnection(configs.sqlite_db_path) as db:
-        schema.initialize(db)
-        synchronizer.synchronize(df_translated, db)
+    schema.initialize(db)
+    synchronizer.synchronize(df_translated, db)
 
     print("Atualização gateway concluída!\n")
 
 
-def sync_dp_modbus(df: pd.DataFrame):
-    logger.info("Sincronizando dados Modbus...")
-    # loader = JsonDataLoader("./data.json")
-    translator = DataTranslator(
-        map_fields(
-            registradores_modbus_translate + sensores_modbus_translate,
-            "Lógica de montagem",
-            "Banco Middlware",
-        )
+def dp_modbus_fields() -> dict:
+    return map_fields(
+        registradores_modbus_translate + sensores_modbus_translate,
+        "Lógica de montagem",
+        "Banco Middlware",
+    )
+
+
+def eqp_modbus_fields() -> dict:
+    gt = gateway_translate.copy()
+    for index, row in enumerate(gt):
+        if "host" in row:
+            gt.pop(index)
+    matrix_translate = gt + hardware_translate + sensores_modbus_translate
+    return map_fields(
+        matrix_translate,
+        "Lógica de montagem",
+        "Banco Middlware",
     )
+
+
+# colunas do snapshot lidas por cada sincronização (projeção do loader)
+TAGS_COLUMNS = ["id_sen", "sen_mod_tags"]
+
+
+def dp_modbus_columns() -> list:
+    return ["id_reg_mod", *dp_modbus_fields()]
+
+
+def eqp_modbus_columns() -> list:
+    return ["id_sen", *eqp_modbus_fields()]
+
+
+def modbus_rows(df: pd.DataFrame, key: str, *required: str) -> pd.DataFrame:
+    """
+    Linhas Modbus do snapshot: `key` e `required` preenchidos, `key` como texto.
+
+    Registros DNP3 ficam no mesmo snapshot, associados ao próprio sensor DNP3, e
+    não têm `id_sen`, `id_reg_mod` nem `sen_mod_tags`. Por isso os nulos são
+    removidos antes da conversão para str, que os transformaria em "nan".
+
+    Args:
+        df (pd.DataFrame): Snapshot da coleta (projeção das colunas da etapa).
+        key (str): Coluna de identificação, convertida para str.
+        *required (str): Outras colunas que não podem ser nulas.
+
+    Returns:
+        pd.DataFrame: Cópia só com as linhas Modbus válidas.
+    """
+    columns = [key, *required]
+    df = df.reindex(columns=list(dict.fromkeys([*df.columns, *columns])))
+    df = df[df[columns].notna().all(axis=1)].copy()
+    df[key] = df[key].astype(str)  # converter para string evitando erros
+    return df[df[key].str.strip().astype(bool)]  # remover chaves vazias
+
+
+def sync_dp_modbus(df: pd.DataFrame, db: DatabaseConnection):
+    logger.info("Sincronizando dados Modbus...")
+    translator = DataTranslator(dp_modbus_fields())
     schema = create_modbus_schema()
     synchronizer = DpModbusDataSynchronizer()
 
     # df = loader.load()  # carregar dados do arquivo json
+    df = modbus_rows(df, "id_reg_mod")  # remover registros DNP3, nulos ou vazios
     df = df.drop_duplicates(subset=["id_reg_mod"])  # remover registros duplicados
-    df["id_reg_mod"] = df["id_reg_mod"].astype(
-        str
-    )  # converter para string evitando erros
-    df = df[
-        df["id_reg_mod"].notnull() & (df["id_reg_mod"] != "")
-    ]  # remover registros nulos ou vazios
     df_translated = translator.translate(df)  # traduzir campos cma_web to cma_gateway
     # remover colunas duplicadas depois da tradução
     df_translated = df_translated.loc[:, ~df_translated.columns.duplicated()]
@@ -202,37 +250,21 @@ def sync_dp_modbus(df: pd.DataFrame):
     ]
     df_final = df_translated[out_fields]  # manter apenas as colunas desejadas
 
-    with DatabaseConnection(configs.sqlite_db_path) as db:
-        schema.initialize(db)
-        synchronizer.synchronize(df_final, db)
+    schema.initialize(db)
+    synchronizer.synchronize(df_final, db)
 
     print("Atualização dp modbus concluída!\n")
 
 
-def sync_eqp_modbus(df: pd.DataFrame):
+def sync_eqp_modbus(df: pd.DataFrame, db: DatabaseConnection):
     logger.info("Sincronizando dados de equipamentos Modbus...")
-    # loader = JsonDataLoader("./data.json")
-    gt = gateway_translate.copy()
-    for index, row in enumerate(gt):
-        if "host" in row:
-            gt.pop(index)
-    matrix_translate = gt + hardware_translate + sensores_modbus_translate
-    translator = DataTranslator(
-        map_fields(
-            matrix_translate,
-            "Lógica de montagem",
-            "Banco Middlware",
-        )
-    )
+    translator = DataTranslator(eqp_modbus_fields())
     schema = create_modbus_equipment_schema()
     synchronizer = ModbusEquipmentSynchronizer()
 
     # df = loader.load()  # carregar dados do arquivo json
+    df = modbus_rows(df, "id_sen")  # remover registros DNP3, nulos ou vazios
     df = df.drop_duplicates(subset=["id_sen"])  # remover sensores duplicados
-    df["id_sen"] = df["id_sen"].astype(str)  # converter para string evitando erros
-    df = df[
-        df["id_sen"].notnull() & (df["id_sen"] != "")
-    ]  # remover registros nulos ou vazios
     df_translated = translator.translate(df)  # traduzir campos cma_web to cma_gateway
     # remover colunas duplicadas depois da tradução
     df_translated = df_translated.loc[:, ~df_translated.columns.duplicated()]
@@ -240,13 +272,12 @@ def sync_eqp_modbus(df: pd.DataFrame):
         synchronizer.OUTPUT_FIELDS
     ]  # manter apenas as colunas desejadas
     # remover colunas duplicadas depois da
-    with DatabaseConnection(configs.sqlite_db_path) as db:
-        schema.initialize(db)
-        synchronizer.synchronize(df_final, db)
+    schema.initialize(db)
+    synchronizer.synchronize(df_final, db)
     print("Atualização equipamento modbus concluída!\n")
 
 
-def sync_eqp_tags(df: pd.DataFrame):  # tags dos registradores
+def sync_eqp_tags(df: pd.DataFrame, db: DatabaseConnection):  # tags dos registradores
     logger.info("Sincronizando tags de equipamentos...")
     # loader = JsonDataLoader("./data.json")
     translator = DataTranslator(
@@ -260,10 +291,9 @@ def sync_eqp_tags(df: pd.DataFrame):  # tags dos registradores
     synchronizer = EqpTagsDataSynchronizer()
 
     # df = loader.load()  # carregar dados do arquivo json
+    # remover registros DNP3 e os id_sen/sen_mod_tags nulos ou vazios
+    df = modbus_rows(df, "id_sen", "sen_mod_tags")
     df = df.drop_duplicates(subset=["id_sen"])  # remover registros duplicados
-    df["id_sen"] = df["id_sen"].astype(str)  # converter para string evitando erros
-    # remover os id_sen com valores nulos ou vazios
-    df = df[df["id_sen"].notna() & df["id_sen"].str.strip().astype(bool)]
 
     df["sen_mod_tags"] = df["sen_mod_tags"].apply(lambda x: json.loads(x))
 
@@ -287,13 +317,12 @@ def sync_eqp_tags(df: pd.DataFrame):  # tags dos registradores
     df_final["nome"] = df_final["nome"].astype(str)
     df_final["valor"] = df_final["valor"].astype(str)
 
-    with DatabaseConnection(configs.sqlite_db_path) as db:
-        schema.initialize(db)
-        synchronizer.synchronize(df_final, db)
+    schema.initialize(db)
+    synchronizer.synchronize(df_final, db)
     print("Atualização tags de equipamentos concluída!\n")
 
 
-def sync_dp_tags(df: pd.DataFrame):  # tags dos sensores
+def sync_dp_tags(df: pd.DataFrame, db: DatabaseConnection):  # tags dos sensores
     logger.info("Sincronizando tags dos sensores...")
     # loader = JsonDataLoader("./data.json")
     translator = DataTranslator(
@@ -307,10 +336,9 @@ def sync_dp_tags(df: pd.DataFrame):  # tags dos sensores
     synchronizer = DpTagsDataSynchronizer()
 
     # df = loader.load()  # carregar dados do arquivo json
+    # remover registros DNP3 e os id_sen/sen_mod_tags nulos ou vazios
+    df = modbus_rows(df, "id_sen", "sen_mod_tags")
     df = df.drop_duplicates(subset=["id_sen"])  # remover registros duplicados
-    df["id_sen"] = df["id_sen"].astype(str)  # converter para string evitando erros
-    # remover os id_sen com valores nulos ou vazios
-    df = df[df["id_sen"].notna() & df["id_sen"].str.strip().astype(bool)]
 
     df["sen_mod_tags"] = df["sen_mod_tags"].apply(lambda x: json.loads(x))
 
@@ -333,28 +361,55 @@ def sync_dp_tags(df: pd.DataFrame):  # tags dos sensores
     df_final["nome"] = df_final["nome"].astype(str)
     df_final["valor"] = df_final["valor"].astype(str)
 
-    with DatabaseConnection(configs.sqlite_db_path) as db:
-        schema.initialize(db)
-        synchronizer.synchronize(df_final, db)
+    schema.initialize(db)
+    synchronizer.synchronize(df_final, db)
     print("Atualização tags dos sensores concluída!\n")
 
 
+@contextmanager
+def reconcile_step(db: DatabaseConnection, name: str):
+    """Executa uma etapa da conciliação em um SAVEPOINT, registrando seu tempo."""
+    start = time.perf_counter()
+    with db.savepoint(name):
+        yield
+    logger.info(f"Etapa {name} concluída em {time.perf_counter() - start:.2f} s")
+
+
+def reconcile(db_path: str, directory: str = "."):
+    """
+    Concilia o snapshot da coleta com o banco do middleware.
+
+    O banco é aberto uma única vez (WAL, `RECONCILE_PRAGMAS`) e todas as tabelas
+    são sincronizadas em uma só transação, com um SAVEPOINT por etapa: o processo
+    do gateway, que lê o banco, nunca vê uma conciliação pela metade.
+    """
+    # data.parquet (se existir) é lido por coluna: cada etapa carrega só o que usa
+    loader = create_snapshot_loader(directory)
+    with DatabaseConnection(
+        db_path, pragmas=RECONCILE_PRAGMAS, single_transaction=True
+    ) as db:
+        with reconcile_step(db, "gateways"):
+            sync_gateways(db)
+        auth_ScadaLTS()
+        with reconcile_step(db, "eqp_modbus"):
+            sync_eqp_modbus(df=loader.load(columns=eqp_modbus_columns()), db=db)
+        # sync_eqp_dnp3() # TODO: implementar sincronização de equipamentos dnp3
+        with reconcile_step(db, "eqp_tags"):
+            # TODO: implementar tags de equipamentos dnp3
+            sync_eqp_tags(df=loader.load(columns=TAGS_COLUMNS), db=db)
+        with reconcile_step(db, "dp_modbus"):
+            sync_dp_modbus(df=loader.load(columns=dp_modbus_columns()), db=db)
+        with reconcile_step(db, "dp_tags"):
+            # TODO: implementar tags de equipamentos dnp3
+            sync_dp_tags(df=loader.load(columns=TAGS_COLUMNS), db=db)
+        # Adicionar outras sincronizações aqui
+    logger.info(f"Sincronização em disco: {db.stats.summary()}")
+    print(f"Sincronização em disco: {db.stats.summary()}")
+
+
 if __name__ == "__main__":
     print("Iniciando sincronização...\n")
     logger.info("Iniciando sincronização...")
-    loader = JsonDataLoader("./data.json")
-    collected_data = loader.load()
-    sync_gateways()
-    auth_ScadaLTS()
-    sync_eqp_modbus(df=collected_data.copy())
-    # sync_eqp_dnp3() # TODO: implementar sincronização de equipamentos dnp3
-    sync_eqp_tags(
-        df=collected_data.copy()
-    )  # TODO: implementar tags de equipamentos dnp3
-    sync_dp_modbus(df=collected_data.copy())
-    sync_dp_tags(
-        df=collected_data.copy()
-    )  # TODO: implementar tags de equipamentos dnp3
-    # Adicionar outras sincronizações aqui
+    reconcile(configs.sqlite_db_path)
     logger.info("Sincronização concluída!")
     print("\nSincronização concluída!\n")
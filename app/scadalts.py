@@ -9,6 +9,7 @@ import pycurl
 from dotenv import load_dotenv
 
 from app.logger import logger
+from app.utils.circuit_breaker import get_breaker
 
 if not load_dotenv():
     raise Exception("Could not load .env file")
@@ -27,6 +28,42 @@ AUTH_URL = f"{URL_BASE}/Scada-LTS/api/auth/admin/admin"
 # Cache do cookie e tempo de expiração
 cookie_cache = {"value": None, "expires_at": 0}
 
+# Nome do disjuntor compartilhado por todas as chamadas ao SCADA-LTS
+SCADALTS_BREAKER = "scadalts"
+
+
+def _perform(curl):
+    """
+    Executa a requisição `curl` protegida pelo disjuntor do SCADA-LTS.
+
+    Erros de transporte e status 5xx contam como falha; com o circuito aberto a
+    chamada falha na hora, sem esperar os timeouts do pycurl.
+
+    Returns:
+        int: Status HTTP da resposta.
+
+    Raises:
+        CircuitOpenError: Se o circuito do SCADA-LTS estiver aberto.
+        pycurl.error: Se a requisição falhar.
+    """
+    breaker = get_breaker(SCADALTS_BREAKER)
+    trial = breaker.before_call()
+    try:
+        try:
+            curl.perform()
+        except pycurl.error:
+            breaker.record_failure()
+            raise
+        status_code = curl.getinfo(pycurl.RESPONSE_CODE)
+        if status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return status_code
+    finally:
+        # interrompida sem resultado (ex.: cancelamento): libera o teste do semiaberto
+        breaker.release_trial(trial)
+
 
 def get_cookie_from_url(url):
     """Obtém um novo cookie de autenticação da URL fornecida."""
@@ -41,8 +78,7 @@ def get_cookie_from_url(url):
     curl.setopt(curl.COOKIEFILE, "")
 
     try:
-        curl.perform()
-        status_code = curl.getinfo(pycurl.RESPONSE_CODE)
+        status_code = _perform(curl)
         headers = header_buffer.getvalue().decode("utf-8").splitlines()
 
         print(f"Status Code ao obter cookie: {status_code}")
@@ -90,8 +126,7 @@ def get_with_cookie(url, cookie, xid_sensor):
     curl.setopt(curl.COOKIE, cookie)
 
     try:
-        curl.perform()
-        status_code = curl.getinfo(pycurl.RESPONSE_CODE)
+        status_code = _perform(curl)
         response_data = buffer.getvalue().decode("utf-8")
 
         print(f"Status Code GET: {status_code}")
@@ -181,7 +216,7 @@ def auth_ScadaLTS():
         c.setopt(c.COOKIEJAR, "cookies")
         c.setopt(c.WRITEDATA, buffer)
         c.setopt(c.CONNECTTIMEOUT, 10)
-        c.perform()
+        _perform(c)
         c.close()
         response = buffer.getvalue().decode("utf-8")
         logger.info("OK\n")
@@ -204,7 +239,7 @@ def send_data_to_scada(raw_data):
         c.setopt(c.POSTFIELDS, raw_data)
         c.setopt(c.COOKIEFILE, "cookies")
         c.setopt(c.WRITEDATA, buffer)
-        c.perform()
+        _perform(c)
         c.close()
         response = buffer.getvalue().decode("utf-8")
         logger.debug(f"send_data_to_scada {raw_data} response:{response}")
@@ -478,8 +513,7 @@ def delete_datasource(ds_id):  # ds_id = xid_equip
         c.setopt(c.POSTFIELDS, raw_data)
         c.setopt(c.COOKIEFILE, "cookies")
         c.setopt(c.WRITEDATA, buffer)
-        c.perform()
-        status_code = c.getinfo(pycurl.RESPONSE_CODE)
+        status_code = _perform(c)
         c.close()
 
         response = buffer.getvalue().decode("utf-8")
@@ -514,8 +548,7 @@ def delete_datapoint(ds_id, dp_id):  # dp_id = xid_sensor, sd_id = xid_equip
         c.setopt(c.URL, f"{URL_BASE}/Scada-LTS/data_source_edit.shtm?dsid={ds_id}")
         c.setopt(c.COOKIEFILE, "cookies")
         c.setopt(c.NOBODY, 1)  # HEAD request
-        c.perform()
-        status_code = c.getinfo(pycurl.RESPONSE_CODE)
+        status_code = _perform(c)
         c.close()
 
         if status_code != 200:
@@ -546,8 +579,7 @@ def delete_datapoint(ds_id, dp_id):  # dp_id = xid_sensor, sd_id = xid_equip
         c.setopt(c.POSTFIELDS, raw_data)
         c.setopt(c.COOKIEFILE, "cookies")
         c.setopt(c.WRITEDATA, buffer)
-        c.perform()
-        status_code = c.getinfo(pycurl.RESPONSE_CODE)
+        status_code = _perform(c)
         c.close()
 
         response = buffer.getvalue().decode("utf-8")
@@ -5,7 +5,7 @@ from dotenv import load_dotenv
 
 from app.logger import logger
 
-from .login import get_auth_token, relogin
+from .login import TokenManager, get_auth_token, relogin
 
 if not load_dotenv():
     raise Exception("Could not load .env file")
@@ -21,36 +21,102 @@ class Configs:
 
     def __init__(self):
         if not hasattr(self, "initialized"):
-            self._auth_token = None
+            # login sob demanda, renovação antecipada e replay de 401 (app/login.py)
+            self.token_manager = TokenManager(
+                lambda: get_auth_token(self.host, self.username, self.password),
+                refresh_margin=float(os.environ.get("TOKEN_REFRESH_MARGIN", 60)),
+            )
             self.host = os.environ.get("GWTDADOS_HOST")
             self.username = os.environ.get("GWTDADOS_USERNAME")
             self.password = os.environ.get("GWTDADOS_PASSWORD")
             self.sqlite_db_path = os.environ.get("SQLITE_MIDDLEWARE_PATH")
             self.gateway_name = os.environ.get("GATEWAY_NAME", None)
+            # lista de gateways (separados por vírgula, aceita curingas) para coleta múltipla
+            self.gateway_names = os.environ.get("GATEWAY_NAMES", None)
+            self.COLLECT_OUTPUT_DIR = os.environ.get("COLLECT_OUTPUT_DIR", "./output")
             self.DEBUG = str(os.environ.get("DEBUG", False)).lower() == "true"
             self.MAX_RETRIES = int(os.environ.get("MAX_RETRIES", 3))
+            # backoff exponencial com jitter entre tentativas (app/utils/retry.py)
+            self.RETRY_BASE_DELAY = float(os.environ.get("RETRY_BASE_DELAY", 0.5))
+            self.RETRY_MAX_DELAY = float(os.environ.get("RETRY_MAX_DELAY", 30))
+            # retentativas permitidas por requisição (orçamento compartilhado)
+            self.RETRY_BUDGET_RATIO = float(os.environ.get("RETRY_BUDGET_RATIO", 0.2))
+            # disjuntor por serviço: falhas consecutivas para abrir e segundos em aberto
+            self.CIRCUIT_FAILURE_THRESHOLD = int(
+                os.environ.get("CIRCUIT_FAILURE_THRESHOLD", 5)
+            )
+            self.CIRCUIT_RECOVERY_TIMEOUT = float(
+                os.environ.get("CIRCUIT_RECOVERY_TIMEOUT", 30)
+            )
             self.MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", 9999))
+            self.PAGE_PREFETCH = int(os.environ.get("PAGE_PREFETCH", 2))
+            # só busca o detalhe quando a listagem não traz os campos necessários
+            self.LIST_ONLY = str(os.environ.get("LIST_ONLY", False)).lower() == "true"
+            # coleta incremental: reaproveita detalhes cujo updatedAt não mudou
+            self.INCREMENTAL = str(os.environ.get("INCREMENTAL", False)).lower() == "true"
+            self.WATERMARK_DB_PATH = os.environ.get(
+                "WATERMARK_DB_PATH", "./watermarks.db"
+            )
+            # cache em disco das respostas de gateways, hardwares e sensores
+            self.HTTP_CACHE = str(os.environ.get("HTTP_CACHE", False)).lower() == "true"
+            self.HTTP_CACHE_PATH = os.environ.get("HTTP_CACHE_PATH", "./http_cache.db")
+            self.HTTP_CACHE_TTL = float(os.environ.get("HTTP_CACHE_TTL", 3600))
+            self.HTTP_CACHE_MAX_ENTRIES = int(
+                os.environ.get("HTTP_CACHE_MAX_ENTRIES", 100000)
+            )
+            # diário das subárvores concluídas, usado por --resume; sem --resume só é
+            # gravado com --checkpoint ou CHECKPOINT=true
+            self.CHECKPOINT = str(os.environ.get("CHECKPOINT", False)).lower() == "true"
+            self.CHECKPOINT_DB_PATH = os.environ.get(
+                "CHECKPOINT_DB_PATH", "./checkpoint.db"
+            )
+            # gravação incremental (ex.: "json,sqlite"); vazio grava ao final
+            self.STREAM_FORMATS = os.environ.get("STREAM_FORMATS", None)
+            # snapshot colunar data.parquet (requer pyarrow)
+            self.SNAPSHOT_PARQUET = (
+                str(os.environ.get("SNAPSHOT_PARQUET", False)).lower() == "true"
+            )
+            # conciliação: hashes das linhas do middleware em tabela auxiliar
+            # (RECONCILE_ROW_HASHES), evitando ler as tabelas inteiras a cada execução
+            self.RECONCILE_HASH_STORE = (
+                str(os.environ.get("RECONCILE_HASH_STORE", False)).lower() == "true"
+            )
             self.MAX_PARALLEL_REQUESTS = int(
                 os.environ.get("MAX_PARALLEL_REQUESTS", 10)
             )
+            # limite adaptativo (AIMD): parte de MAX_PARALLEL_REQUESTS e varia até
+            # MAX_ADAPTIVE_REQUESTS conforme latência e erros da API
+            self.ADAPTIVE_CONCURRENCY = (
+                str(os.environ.get("ADAPTIVE_CONCURRENCY", True)).lower() == "true"
+            )
+            self.MAX_ADAPTIVE_REQUESTS = int(
+                os.environ.get("MAX_ADAPTIVE_REQUESTS", 4 * self.MAX_PARALLEL_REQUESTS)
+            )
+            # codec JSON das respostas e snapshots: auto (orjson se instalado), orjson ou json
+            self.JSON_BACKEND = os.environ.get("JSON_BACKEND", "auto")
+            # Pool de conexões HTTP compartilhado (app/utils/http_client.py)
+            self.HTTP_POOL_LIMIT = int(os.environ.get("HTTP_POOL_LIMIT", 100))
+            self.HTTP_POOL_LIMIT_PER_HOST = int(
+                os.environ.get("HTTP_POOL_LIMIT_PER_HOST", 20)
+            )
+            self.HTTP_DNS_CACHE_TTL = int(os.environ.get("HTTP_DNS_CACHE_TTL", 300))
+            self.HTTP_KEEPALIVE_TIMEOUT = float(
+                os.environ.get("HTTP_KEEPALIVE_TIMEOUT", 30)
+            )
             self.initialized = True
 
     @property
     async def auth_token(self):
-        if self._auth_token is None:
-            self._auth_token = await get_auth_token(
-                self.host, self.username, self.password
-            )
-        return self._auth_token
+        return await self.token_manager.get_token()
 
     @auth_token.setter
-    async def auth_token(self, value):
-        self._auth_token = value
+    def auth_token(self, value):
+        self.token_manager.set_token(value)
 
     async def login(self):
         logger.info("Logging in...")
-        self.auth_token = await get_auth_token(self.host, self.username, self.password)
-        logger.info("Logged in successfully. ({})".format(self.auth_token))
+        await self.token_manager.refresh()
+        logger.info("Logged in successfully. ({})".format(self.token_manager.token))
 
 
 configs = Configs()
@@ -0,0 +1,197 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from app.logger import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Chamada recusada porque o circuito do serviço está aberto."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(
+            f"Circuito '{name}' aberto: serviço indisponível, "
+            f"nova tentativa em {retry_in:.1f} s"
+        )
+        self.name = name
+        self.retry_in = retry_in
+
+
+# callbacks (nome, estado anterior, novo estado) chamados a cada mudança de estado
+_listeners: List[Callable[[str, str, str], None]] = []
+
+
+def add_listener(callback: Callable[[str, str, str], None]):
+    """Registra um callback `(nome, anterior, novo)` para as mudanças de estado."""
+    _listeners.append(callback)
+
+
+def remove_listener(callback: Callable[[str, str, str], None]):
+    _listeners.remove(callback)
+
+
+class CircuitBreaker:
+    """
+    Disjuntor de uma família de endpoints (fechado / aberto / semiaberto).
+
+    - fechado: as chamadas passam; `failure_threshold` falhas consecutivas abrem
+      o circuito;
+    - aberto: as chamadas falham na hora com `CircuitOpenError`, sem tocar o
+      serviço, durante `recovery_timeout` segundos;
+    - semiaberto: até `half_open_max_calls` chamadas de teste passam; um sucesso
+      fecha o circuito e uma falha o reabre.
+
+    Seguro para uso simultâneo em threads e em tarefas asyncio (o estado só é
+    alterado sob um lock, sem `await`).
+
+    Args:
+        name (str): Nome da família de endpoints (ex.: "scadalts").
+        failure_threshold (int): Falhas consecutivas para abrir. Padrão: 5.
+        recovery_timeout (float): Segundos em aberto antes do teste. Padrão: 30.
+        half_open_max_calls (int): Chamadas de teste simultâneas. Padrão: 1.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.transitions = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def before_call(self) -> Optional[int]:
+        """
+        Autoriza uma chamada ao serviço.
+
+        Returns:
+            int: Identificador da vaga de teste, se a chamada é o teste do
+                semiaberto (repassar a `release_trial`); None se fechado.
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto (ou o teste do
+                semiaberto já estiver em andamento).
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return None
+            if self._state == HALF_OPEN and self._trial_calls < self.half_open_max_calls:
+                self._trial_calls += 1
+                return self.transitions
+            self.rejected += 1
+            retry_in = max(self._opened_at + self.recovery_timeout - time.monotonic(), 0)
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def release_trial(self, trial: Optional[int]):
+        """
+        Devolve a vaga de teste de uma chamada encerrada sem resultado (ex.:
+        cancelada), para que o circuito não fique semiaberto para sempre.
+
+        Sem efeito se `trial` for None ou se o circuito já mudou de estado desde
+        `before_call` (sucesso ou falha registrados): pode ser chamado em `finally`.
+
+        Args:
+            trial (int, optional): Retorno de `before_call`.
+        """
+        with self._lock:
+            if trial == self.transitions and self._trial_calls > 0:
+                self._trial_calls -= 1
+
+    def reset(self):
+        """Fecha o circuito e zera as falhas."""
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def _maybe_half_open(self):
+        if (
+            self._state == OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str):
+        previous, self._state = self._state, state
+        self._trial_calls = 0
+        self.transitions += 1
+        if state == OPEN:
+            logger.warning(
+                f"Circuito '{self.name}' aberto após {self._failures} falhas "
+                f"consecutivas; chamadas suspensas por {self.recovery_timeout:.0f} s"
+            )
+        else:
+            logger.info(f"Circuito '{self.name}': {previous} -> {state}")
+        for callback in list(_listeners):
+            callback(self.name, previous, state)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Disjuntor da família `name`, criado com os parâmetros de `configs`."""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            from app.settings import configs
+
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=configs.CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=configs.CIRCUIT_RECOVERY_TIMEOUT,
+            )
+        return breaker
+
+
+def breaker_for(url: str) -> CircuitBreaker:
+    """Disjuntor do serviço (host) de `url`."""
+    return get_breaker(urlsplit(url).netloc or url)
+
+
+def all_breakers() -> Dict[str, CircuitBreaker]:
+    return dict(_breakers)
+
+
+def reset_breakers():
+    """Descarta todos os disjuntores (novos são criados sob demanda)."""
+    with _registry_lock:
+        _breakers.clear()
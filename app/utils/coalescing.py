@@ -0,0 +1,119 @@
+import asyncio
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlencode
+
+
+@dataclass
+class CoalescingStats:
+    """Requisições deduplicadas em uma execução."""
+
+    requests: int = 0
+    coalesced: int = 0
+    memo_hits: int = 0
+
+    @property
+    def deduplicated(self) -> int:
+        return self.coalesced + self.memo_hits
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requisições, {self.deduplicated} deduplicadas "
+            f"({self.coalesced} em andamento, {self.memo_hits} já respondidas)"
+        )
+
+
+class RequestCoalescer:
+    """
+    Deduplica GETs idênticos (mesma URL e parâmetros) durante uma coleta.
+
+    Requisições idênticas simultâneas compartilham uma única requisição em
+    andamento ("single flight"); com `memoize`, a resposta também fica guardada
+    até o fim da execução e as chamadas seguintes não vão à API. A memorização é
+    usada apenas para os dados de referência (gateways, hardwares, sensores), para
+    não reter todos os registros em memória. As respostas são compartilhadas entre
+    os chamadores e devem ser tratadas como somente leitura.
+
+    Example:
+        >>> coalescer = RequestCoalescer()
+        >>> with coalescer.activate():
+        ...     await asyncio.gather(fetch_with_retry(url, h), fetch_with_retry(url, h))
+    """
+
+    def __init__(self):
+        self.stats = CoalescingStats()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._memo: Dict[str, Any] = {}
+
+    @staticmethod
+    def key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        if not params:
+            return f"{method} {url}"
+        return f"{method} {url}?{urlencode(sorted(params.items()))}"
+
+    async def run(
+        self, key: str, fetch: Callable[[], Awaitable[Any]], memoize: bool = False
+    ) -> Any:
+        """
+        Executa `fetch` uma única vez por `key` entre as chamadas simultâneas.
+
+        Args:
+            key (str): Identificação da requisição (`RequestCoalescer.key`).
+            fetch (Callable): Função que faz a requisição.
+            memoize (bool): Guarda a resposta até o fim da execução.
+
+        Returns:
+            Any: Resposta compartilhada.
+
+        Raises:
+            Exception: O erro da requisição, repassado a todos os chamadores.
+        """
+        if key in self._memo:
+            self.stats.memo_hits += 1
+            return self._memo[key]
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.stats.coalesced += 1
+            # shield: o cancelamento de um chamador não cancela os demais
+            return await asyncio.shield(in_flight)
+
+        self.stats.requests += 1
+        in_flight = asyncio.ensure_future(fetch())
+        self._in_flight[key] = in_flight
+        try:
+            result = await asyncio.shield(in_flight)
+        finally:
+            if in_flight.done():
+                self._in_flight.pop(key, None)
+            else:
+                in_flight.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        if memoize:
+            self._memo[key] = result
+        return result
+
+    def activate(self) -> "_Activation":
+        """Ativa o coalescer para as tarefas criadas no bloco `with`."""
+        return _Activation(self)
+
+
+class _Activation:
+    def __init__(self, coalescer: RequestCoalescer):
+        self.coalescer = coalescer
+
+    def __enter__(self):
+        self._token = _current.set(self.coalescer)
+        return self.coalescer
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current.reset(self._token)
+
+
+_current: ContextVar[Optional[RequestCoalescer]] = ContextVar(
+    "request_coalescer", default=None
+)
+
+
+def current_coalescer() -> Optional[RequestCoalescer]:
+    """Coalescer da coleta em andamento (None fora de uma coleta)."""
+    return _current.get()
@@ -0,0 +1,189 @@
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from app.utils import json_codec
+
+try:  # dependência opcional: pip install pyarrow (ou uv sync --extra parquet)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# metadado do arquivo com as colunas de campos aninhados (gravados como texto JSON)
+JSON_COLUMNS_KEY = b"json_columns"
+
+
+def require_pyarrow():
+    """
+    Garante que o pyarrow está instalado.
+
+    Raises:
+        ImportError: Se o pyarrow não estiver disponível.
+    """
+    if pa is None:
+        raise ImportError(
+            "O formato Parquet requer o pacote pyarrow (pip install pyarrow)."
+        )
+
+
+def records_to_table(
+    records: Iterable[Dict[str, Any]], json_columns: Optional[Set[str]] = None
+) -> "pa.Table":
+    """
+    Converte registros achatados (dicts) em uma tabela Arrow.
+
+    Campos aninhados (dict/list) são gravados como texto JSON, como em
+    data.json/dados.db; as colunas em que isso ocorre são acrescentadas a
+    `json_columns`, para que `read_parquet` as decodifique.
+    """
+    require_pyarrow()
+    records = list(records)
+    # união das chaves de todos os registros, na ordem em que aparecem
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    data = {}
+    for column in columns:
+        values = [record.get(column) for record in records]
+        if any(isinstance(value, (dict, list)) for value in values):
+            values = [None if v is None else json_codec.dumps(v) for v in values]
+            if json_columns is not None:
+                json_columns.add(column)
+        data[column] = values
+    return pa.table(data)
+
+
+def _column_type(name: str, types: List["pa.DataType"]) -> "pa.DataType":
+    # tipo comum da coluna nos lotes: int64 + double vira double; tipos
+    # incompatíveis (ex.: int64 + string) viram texto
+    schemas = [pa.schema([pa.field(name, kind)]) for kind in types]
+    try:
+        return pa.unify_schemas(schemas, promote_options="permissive").field(name).type
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        return pa.string()
+
+
+def unify_schemas(schemas: List["pa.Schema"]) -> "pa.Schema":
+    """
+    Esquema único para lotes com colunas e tipos diferentes.
+
+    As colunas ficam na ordem em que aparecem nos lotes e cada uma recebe o tipo
+    comum a todos eles (`_column_type`).
+    """
+    types: Dict[str, List["pa.DataType"]] = {}
+    for schema in schemas:
+        for field in schema:
+            types.setdefault(field.name, []).append(field.type)
+    return pa.schema([(name, _column_type(name, kind)) for name, kind in types.items()])
+
+
+def conform_table(table: "pa.Table", schema: "pa.Schema") -> "pa.Table":
+    """Converte a tabela para `schema`; colunas ausentes no lote ficam nulas."""
+    arrays = [
+        table[field.name].cast(field.type)
+        if field.name in table.column_names
+        else pa.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class ParquetSnapshotWriter:
+    """
+    Grava um snapshot Parquet a partir de registros recebidos aos poucos.
+
+    A cada `batch_size` registros o lote é convertido para o formato colunar e
+    gravado em um arquivo temporário, de modo que a memória fica limitada a um
+    lote. Em `close()` as colunas e os tipos de todos os lotes são unificados (os
+    registros Modbus e DNP3 têm colunas diferentes, e um campo numérico pode ser
+    inteiro em um lote e decimal em outro) e os lotes são copiados, um a um, para
+    o arquivo final por um `pq.ParquetWriter`.
+
+    Args:
+        path (str): Caminho do arquivo (ex.: "data.parquet").
+        batch_size (int): Registros por lote convertido. Padrão: 10000.
+    """
+
+    def __init__(self, path: str, batch_size: int = 10000):
+        require_pyarrow()
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch: List[Dict[str, Any]] = []
+        # lotes já convertidos: arquivo temporário e esquema
+        self._parts: List[Tuple[str, "pa.Schema"]] = []
+        self._json_columns: Set[str] = set()
+        self._spill_dir = tempfile.mkdtemp(
+            prefix=".parquet-", dir=os.path.dirname(os.path.abspath(path))
+        )
+
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self._batch.append(record)
+            self.count += 1
+            if len(self._batch) >= self.batch_size:
+                self._convert_batch()
+
+    def _convert_batch(self):
+        if self._batch:
+            table = records_to_table(self._batch, self._json_columns)
+            part = os.path.join(self._spill_dir, f"{len(self._parts)}.parquet")
+            pq.write_table(table, part)
+            self._parts.append((part, table.schema))
+            self._batch = []
+
+    def close(self):
+        try:
+            self._convert_batch()
+            schema = unify_schemas([schema for _, schema in self._parts])
+            if self._json_columns:
+                names = [name for name in schema.names if name in self._json_columns]
+                schema = schema.with_metadata(
+                    {JSON_COLUMNS_KEY: json_codec.dumps(names).encode()}
+                )
+            with pq.ParquetWriter(self.path, schema) as writer:
+                for part, _ in self._parts:
+                    writer.write_table(conform_table(pq.read_table(part), schema))
+        finally:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._parts = []
+
+
+def write_parquet(records: List[Dict[str, Any]], path: str):
+    """Grava os registros achatados em um arquivo Parquet."""
+    writer = ParquetSnapshotWriter(path)
+    writer.write_many(records)
+    writer.close()
+
+
+def read_parquet(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lê um snapshot Parquet, carregando apenas as colunas pedidas.
+
+    Colunas ausentes no arquivo (ex.: campos DNP3 em uma coleta só Modbus) são
+    ignoradas e os campos aninhados gravados como texto JSON voltam a ser
+    dicts/listas, como aconteceria com o DataFrame montado a partir do JSON.
+
+    Args:
+        path (str): Caminho do arquivo Parquet.
+        columns (list, optional): Colunas a carregar. None carrega todas.
+
+    Returns:
+        pd.DataFrame: Dados do snapshot.
+    """
+    require_pyarrow()
+    schema = pq.read_schema(path)
+    if columns is not None:
+        available = set(schema.names)
+        columns = [column for column in dict.fromkeys(columns) if column in available]
+    df = pq.read_table(path, columns=columns).to_pandas()
+    metadata = schema.metadata or {}
+    for column in json_codec.loads(metadata.get(JSON_COLUMNS_KEY, b"[]")):
+        if column in df:
+            df[column] = df[column].map(
+                lambda value: None if value is None else json_codec.loads(value)
+            )
+    return df
@@ -0,0 +1,85 @@
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Hashable
+
+
+class FairBudget:
+    """
+    Orçamento de requisições simultâneas compartilhado entre várias chaves.
+
+    Funciona como um `asyncio.Semaphore` de capacidade `capacity`, mas quando há
+    espera as vagas liberadas são distribuídas em rodízio entre as chaves que têm
+    requisições pendentes (ex.: um gateway por chave). Assim um gateway com milhares
+    de requisições enfileiradas não impede que os demais avancem, e nenhuma vaga
+    fica ociosa enquanto houver alguém esperando.
+    """
+
+    def __init__(self, capacity: int):
+        self._waiters: Dict[Hashable, Deque[asyncio.Future]] = OrderedDict()
+        self.in_use = 0
+        self.capacity = capacity
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, value: int):
+        """
+        Altera a capacidade em tempo de execução. Ao aumentar, os que aguardam são
+        liberados imediatamente; ao reduzir, as vagas em uso não são revogadas e a
+        nova capacidade vale a partir das próximas liberações.
+        """
+        if value < 1:
+            raise ValueError("A capacidade do orçamento deve ser maior que zero")
+        self._capacity = value
+        self._wake_next()
+
+    @property
+    def queue_depth(self) -> int:
+        """Quantidade de requisições aguardando uma vaga."""
+        return sum(
+            1 for queue in self._waiters.values() for fut in queue if not fut.done()
+        )
+
+    async def acquire(self, key: Hashable = None):
+        if self.in_use < self.capacity and not self._waiters:
+            self.in_use += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(fut)
+        # pode haver vaga livre se os únicos aguardando foram cancelados
+        self._wake_next()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # a vaga foi concedida junto com o cancelamento: devolvê-la
+                self.release()
+            raise
+
+    def release(self):
+        self.in_use -= 1
+        self._wake_next()
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable = None):
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _wake_next(self):
+        while self._waiters and self.in_use < self.capacity:
+            key, queue = next(iter(self._waiters.items()))
+            fut = queue.popleft()
+            # a chave atendida vai para o fim da fila (rodízio)
+            del self._waiters[key]
+            if queue:
+                self._waiters[key] = queue
+            if fut.done():
+                continue
+            self.in_use += 1
+            fut.set_result(None)
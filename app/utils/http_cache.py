@@ -0,0 +1,173 @@
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+
+@dataclass
+class CachedResponse:
+    """Resposta armazenada no cache HTTP."""
+
+    body: Any
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Cabeçalhos da requisição condicional (revalidação)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheStats:
+    """Uso do cache HTTP em uma execução."""
+
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stored: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits} respostas do cache, {self.revalidated} revalidadas (304), "
+            f"{self.misses} buscadas na API"
+        )
+
+
+class HttpCache:
+    """
+    Cache persistente (SQLite) de respostas GET, por URL e parâmetros.
+
+    Dentro de `ttl` segundos a resposta é servida do disco sem acessar a API.
+    Depois disso, se a API informou `ETag` ou `Last-Modified`, a requisição é
+    condicional (`If-None-Match` / `If-Modified-Since`) e um 304 renova a
+    resposta armazenada sem transferir o corpo. As entradas menos usadas
+    recentemente além de `max_entries` são descartadas em `evict()`.
+
+    A conexão fica em modo autocommit com WAL: cada resposta é gravada assim que
+    chega, sem fsync por escrita, e sobrevive a uma coleta interrompida.
+
+    Args:
+        db_path (str): Caminho do banco SQLite (criado se não existir).
+        ttl (float): Validade das respostas, em segundos. Padrão: 3600.
+        max_entries (int): Número máximo de respostas armazenadas. Padrão: 100000.
+
+    Example:
+        >>> with HttpCache("http_cache.db", ttl=600) as cache:
+        ...     cached = cache.lookup(cache.key(url))
+    """
+
+    def __init__(self, db_path: str, ttl: float = 3600, max_entries: int = 100000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Chave da resposta: URL e parâmetros em ordem canônica."""
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        """Resposta armazenada para `key` (fresca ou não) ou None."""
+        row = self.conn.execute(
+            "SELECT body, etag, last_modified, stored_at FROM http_cache WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, stored_at = row
+        self.conn.execute(
+            "UPDATE http_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+        )
+        return CachedResponse(json.loads(body), etag, last_modified, stored_at)
+
+    def store(
+        self,
+        key: str,
+        body: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        """Armazena a resposta 200 de `key`."""
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO http_cache "
+            "(key, body, etag, last_modified, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, json.dumps(body), etag, last_modified, now, now),
+        )
+        self.stats.stored += 1
+
+    def revalidate(self, key: str):
+        """Renova a validade de `key` após um 304."""
+        self.conn.execute(
+            "UPDATE http_cache SET stored_at = ? WHERE key = ?", (time.time(), key)
+        )
+
+    def evict(self) -> int:
+        """
+        Descarta as respostas menos usadas recentemente além de `max_entries`.
+
+        Returns:
+            int: Número de respostas descartadas.
+        """
+        cursor = self.conn.execute(
+            "DELETE FROM http_cache WHERE key IN ("
+            "SELECT key FROM http_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+
+    def close(self):
+        self.evict()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_active_cache: Optional[HttpCache] = None
+
+
+def set_http_cache(cache: Optional[HttpCache]):
+    """Ativa (ou desativa, com None) o cache das requisições cacheáveis."""
+    global _active_cache
+    _active_cache = cache
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    return _active_cache
@@ -0,0 +1,150 @@
+import asyncio
+import ssl
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import aiohttp
+
+
+@dataclass
+class HttpClientStats:
+    """Contadores de uso do pool de conexões HTTP."""
+
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+    @property
+    def handshakes_saved(self) -> int:
+        """Quantidade de requisições que reaproveitaram uma conexão (sem novo TCP/TLS)."""
+        return self.connections_reused
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["handshakes_saved"] = self.handshakes_saved
+        return data
+
+    def summary(self) -> str:
+        return (
+            f"Requisições: {self.requests}, "
+            f"conexões criadas: {self.connections_created}, "
+            f"conexões reaproveitadas: {self.connections_reused}, "
+            f"cache DNS (hit/miss): {self.dns_cache_hits}/{self.dns_cache_misses}"
+        )
+
+
+class HttpClient:
+    """
+    Cliente HTTP compartilhado pelo processo para a API CMA Web.
+
+    Mantém uma única `aiohttp.ClientSession` com conector keep-alive, cache de DNS
+    e um único contexto TLS, de forma que as requisições dos getters reaproveitem
+    as conexões abertas em vez de refazer o handshake TCP/TLS a cada chamada.
+
+    A sessão é criada sob demanda no loop em execução e recriada caso o loop mude
+    (ex.: `asyncio.run` chamado mais de uma vez no mesmo processo); a sessão do
+    loop anterior é fechada antes, sem deixar conexões abertas.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        limit_per_host: Optional[int] = None,
+        dns_cache_ttl: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.stats = HttpClientStats()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    async def __aenter__(self):
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Retorna a sessão compartilhada, criando-a no loop atual se necessário."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            await self.close()
+            self._session = self._create_session()
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        """Fecha a sessão compartilhada e libera as conexões do pool."""
+        session, loop = self._session, self._loop
+        self._session = None
+        self._loop = None
+        if session is None or session.closed:
+            return
+        if loop is asyncio.get_running_loop():
+            await session.close()
+        elif loop is not None and loop.is_running():
+            # loop de outra thread: a sessão é fechada nele
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            # loop parado ou encerrado (ex.: `asyncio.run` anterior): desliga o
+            # conector da sessão e fecha suas conexões diretamente
+            connector = session.connector
+            session.detach()
+            if connector is not None:
+                await connector.close()
+
+    def reset_stats(self):
+        self.stats = HttpClientStats()
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        from app.settings import configs
+
+        if self._ssl_context is None:
+            # um único contexto TLS para todas as conexões do pool
+            self._ssl_context = ssl.create_default_context()
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit or configs.HTTP_POOL_LIMIT,
+            limit_per_host=self.limit_per_host or configs.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=self.dns_cache_ttl or configs.HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=self.keepalive_timeout or configs.HTTP_KEEPALIVE_TIMEOUT,
+            use_dns_cache=True,
+            ssl=self._ssl_context,
+        )
+        return aiohttp.ClientSession(
+            connector=connector, trace_configs=[self._create_trace_config()]
+        )
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(self._on_dns_cache_miss)
+        return trace_config
+
+    async def _on_request_start(self, session, trace_config_ctx, params):
+        self.stats.requests += 1
+
+    async def _on_connection_create_end(self, session, trace_config_ctx, params):
+        self.stats.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, trace_config_ctx, params):
+        self.stats.connections_reused += 1
+
+    async def _on_dns_cache_hit(self, session, trace_config_ctx, params):
+        self.stats.dns_cache_hits += 1
+
+    async def _on_dns_cache_miss(self, session, trace_config_ctx, params):
+        self.stats.dns_cache_misses += 1
+
+
+http_client = HttpClient()
@@ -1,37 +1,139 @@
 import asyncio
+import time
+from dataclasses import replace
 from typing import Any, Dict, Optional
 
 import aiohttp
 
+from app.utils import json_codec
+from app.utils.circuit_breaker import breaker_for
+from app.utils.coalescing import current_coalescer
+from app.utils.http_cache import get_http_cache
+from app.utils.http_client import http_client
+from app.utils.limiter import current_limiter
+from app.utils.retry import HttpStatusError, RetryPolicy, policy_for
+
+
+async def _refresh_authorization(headers: Dict[str, str]) -> Dict[str, str]:
+    """Retorna os cabeçalhos com o token recusado substituído por um válido."""
+    from app.settings import configs
+
+    stale_token = headers["Authorization"].removeprefix("Bearer ").strip()
+    token = await configs.token_manager.refresh(stale_token=stale_token)
+    return {**headers, "Authorization": f"Bearer {token}"}
+
 
 async def fetch_with_retry(
     url: str,
     headers: Dict[str, str],
     method: str = "GET",
-    max_attempts: int = 3,
+    max_attempts: Optional[int] = None,
     timeout: Optional[float] = 15,
+    retry_policy: Optional[RetryPolicy] = None,
+    cacheable: bool = False,
     **kwargs,
 ) -> Any:
     """
-    Faz uma requisição HTTP com retentativas em caso de timeout.
+    Faz uma requisição HTTP com retentativas em falhas transitórias.
+
+    Timeouts, erros de conexão e status transitórios (429, 5xx, ...) são repetidos
+    com backoff exponencial e jitter, respeitando o cabeçalho `Retry-After` e o
+    orçamento de retentativas da política. Um 401 renova o token e repete a
+    requisição uma vez, sem consumir tentativa. Com o circuito do serviço aberto
+    (falhas consecutivas), falha na hora com `CircuitOpenError`.
+
+    Com `cacheable` e o cache HTTP ativo (`set_http_cache`), respostas ainda
+    válidas vêm do disco e as vencidas são revalidadas com `ETag`/`Last-Modified`.
+
+    Durante uma coleta (`RequestCoalescer.activate`), GETs idênticos simultâneos
+    compartilham uma única requisição, e os `cacheable` são memorizados até o fim
+    da execução.
 
     Args:
-        url (str): URL do endpoint.
-        headers (Dict[str, str]): Cabeçalhos da requisição.
-        method (str): Método HTTP (padrão: "GET").
-        max_attempts (int): Número máximo de tentativas (padrão: 3).
-        timeout (Optional[float]): Tempo limite em segundos por tentativa (opcional).
-        **kwargs: Argumentos adicionais para aiohttp (ex.: json, data).
+        url (str): URL da requisição.
+        headers (dict): Cabeçalhos da requisição.
+        method (str): Método HTTP. Padrão: "GET".
+        max_attempts (int, optional): Substitui o número de tentativas da política.
+        timeout (float, optional): Timeout total de cada tentativa, em segundos.
+        retry_policy (RetryPolicy, optional): Política de retentativas. Padrão: a
+            registrada para a URL (`policy_for`).
+        cacheable (bool): Usa o cache HTTP (GET de dados de referência).
 
     Returns:
         Any: Resposta da requisição (JSON por padrão).
 
     Raises:
-        Exception: Se todas as tentativas falharem ou o status não for 200.
+        CircuitOpenError: Se o circuito do serviço estiver aberto.
+        Exception: Se todas as tentativas falharem ou o status não for repetível.
     """
-    for attempt in range(1, max_attempts + 1):
+    coalescer = current_coalescer()
+    if coalescer is None or method != "GET":
+        return await _request_with_retry(
+            url, headers, method, max_attempts, timeout, retry_policy, cacheable, **kwargs
+        )
+    limiter = current_limiter()
+
+    async def fetch():
+        # a requisição compartilhada roda em outra tarefa, com a própria vaga: o
+        # backoff a devolve e o cancelamento de um chamador não a libera
+        async with limiter.slot():
+            return await _request_with_retry(
+                url,
+                headers,
+                method,
+                max_attempts,
+                timeout,
+                retry_policy,
+                cacheable,
+                **kwargs,
+            )
+
+    # GETs idênticos da mesma coleta compartilham uma única requisição; a vaga do
+    # chamador fica livre enquanto ele espera a resposta
+    async with limiter.released():
+        return await coalescer.run(
+            coalescer.key(method, url, kwargs.get("params")),
+            fetch,
+            memoize=cacheable,
+        )
+
+
+async def _request_with_retry(
+    url: str,
+    headers: Dict[str, str],
+    method: str,
+    max_attempts: Optional[int],
+    timeout: Optional[float],
+    retry_policy: Optional[RetryPolicy],
+    cacheable: bool,
+    **kwargs,
+) -> Any:
+    policy = retry_policy or policy_for(url)
+    if max_attempts is not None:
+        policy = replace(policy, max_attempts=max_attempts)
+    cache = get_http_cache() if cacheable and method == "GET" else None
+    cached = None
+    if cache is not None:
+        cache_key = cache.key(url, kwargs.get("params"))
+        cached = cache.lookup(cache_key)
+        if cached is not None and cached.is_fresh(cache.ttl):
+            cache.stats.hits += 1
+            return cached.body
+        if cached is not None:
+            headers = {**headers, **cached.conditional_headers()}
+    limiter = current_limiter()
+    breaker = breaker_for(url)
+    token_replayed = False
+    attempt = 0
+    while True:
+        attempt += 1
+        retry_after = None
+        trial = breaker.before_call()
+        policy.on_request()
         try:
-            async with aiohttp.ClientSession() as session:
+            async with limiter.slot():
+                session = await http_client.get_session()
+                started = time.perf_counter()
                 async with session.request(
                     method=method,
                     url=url,
@@ -39,24 +141,60 @@ async def fetch_with_retry(
                     timeout=aiohttp.ClientTimeout(total=timeout),
                     **kwargs,
                 ) as response:
+                    limiter.record(
+                        time.perf_counter() - started,
+                        failure=response.status == 429 or response.status >= 500,
+                    )
+                    if response.status >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    if response.status == 304 and cached is not None:
+                        cache.revalidate(cache_key)
+                        cache.stats.revalidated += 1
+                        return cached.body
                     if response.status == 200:
-                        data = await response.json()
+                        data = await response.json(loads=json_codec.loads)
+                        if cache is not None:
+                            cache.stats.misses += 1
+                            cache.store(
+                                cache_key,
+                                data,
+                                response.headers.get("ETag"),
+                                response.headers.get("Last-Modified"),
+                            )
                         return data
-                    if response.status == 401:
-                        from app.settings import configs
-
-                        configs.relogin()
-                        raise Exception(
-                            "Falha na autenticação. Verifique o token de acesso."
-                        )
-                    raise Exception(
-                        f"Falha na requisição. Código de status: {response.status}"
-                    )
+                    if response.status != 401:
+                        retry_after = response.headers.get("Retry-After")
+                        raise HttpStatusError(response.status)
+            # 401 (conexão já devolvida ao pool): token expirado ou revogado
+            if token_replayed or "Authorization" not in headers:
+                raise Exception("Falha na autenticação. Verifique o token de acesso.")
+            # renova o token (um único login para todas as requisições recusadas)
+            # e repete a requisição sem consumir tentativa
+            token_replayed = True
+            headers = await _refresh_authorization(headers)
+            attempt -= 1
+            continue
+        except HttpStatusError as e:
+            if not policy.is_retryable_status(e.status) or not policy.can_retry(attempt):
+                raise
+            print(f"Tentativa {attempt}: status {e.status}, tentando novamente...")
         except aiohttp.ClientConnectionError as e:
+            limiter.record(0, failure=True)
+            breaker.record_failure()
+            if not policy.can_retry(attempt):
+                raise Exception(f"Falha após {attempt} tentativas: {str(e)}")
             print(f"Tentativa {attempt}: erro de conexão ({e}), tentando novamente...")
-            if attempt == max_attempts:
-                raise Exception(f"Falha após {max_attempts} tentativas: {str(e)}")
         except asyncio.exceptions.TimeoutError:
+            limiter.record(0, failure=True)
+            breaker.record_failure()
+            if not policy.can_retry(attempt):
+                raise Exception(f"Timeout persistente após {attempt} tentativas")
             print(f"Tentativa {attempt}: timeout, tentando novamente...")
-            if attempt == max_attempts:
-                raise Exception(f"Timeout persistente após {max_attempts} tentativas")
+        finally:
+            # cancelada ou interrompida sem resultado: libera o teste do semiaberto
+            breaker.release_trial(trial)
+        # a vaga reservada pelo crawler fica livre durante a espera
+        async with limiter.released():
+            await asyncio.sleep(policy.delay(attempt, retry_after))
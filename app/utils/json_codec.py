@@ -0,0 +1,113 @@
+import json
+from typing import IO, Any, Dict, Optional
+
+try:  # dependência opcional: pip install orjson (ou uv sync --extra fast-json)
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonCodec:
+    """Codec JSON da biblioteca padrão (referência de semântica e fallback)."""
+
+    name = "json"
+
+    def loads(self, data) -> Any:
+        """Decodifica `data` (str ou bytes)."""
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Codec baseado no orjson (decodificação e serialização em código nativo).
+
+    Produz os mesmos valores da biblioteca padrão ao decodificar; a saída é
+    compacta e em UTF-8 (sem escapes `\\uXXXX`). Objetos que o orjson não
+    serializa (ex.: inteiros acima de 64 bits) são serializados pela biblioteca
+    padrão.
+    """
+
+    name = "orjson"
+
+    def loads(self, data) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:  # orjson.JSONEncodeError
+            return super().dumps_bytes(obj)
+
+
+CODECS: Dict[str, type] = {"json": JsonCodec, "orjson": OrjsonCodec}
+
+_codec: Optional[JsonCodec] = None
+
+
+def create_codec(backend: str = "auto") -> JsonCodec:
+    """
+    Cria o codec do `backend` ("auto", "orjson" ou "json").
+
+    "auto" usa o orjson quando instalado e a biblioteca padrão caso contrário.
+
+    Raises:
+        ValueError: Se o backend for desconhecido.
+        ImportError: Se o backend "orjson" for pedido sem o pacote instalado.
+    """
+    backend = (backend or "auto").lower()
+    if backend == "auto":
+        backend = "orjson" if orjson is not None else "json"
+    if backend not in CODECS:
+        raise ValueError(
+            f"Backend JSON desconhecido: {backend} (use auto, {', '.join(CODECS)})"
+        )
+    if backend == "orjson" and orjson is None:
+        raise ImportError("O backend orjson requer o pacote orjson (pip install orjson).")
+    return CODECS[backend]()
+
+
+def get_codec() -> JsonCodec:
+    """Codec em uso, criado a partir de `JSON_BACKEND` no primeiro uso."""
+    global _codec
+    if _codec is None:
+        from app.settings import configs
+
+        _codec = create_codec(configs.JSON_BACKEND)
+    return _codec
+
+
+def set_codec(codec: Optional[JsonCodec]):
+    """Substitui o codec em uso (None volta ao de `JSON_BACKEND`)."""
+    global _codec
+    _codec = codec
+
+
+def loads(data) -> Any:
+    return get_codec().loads(data)
+
+
+def dumps(obj: Any) -> str:
+    return get_codec().dumps(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return get_codec().dumps_bytes(obj)
+
+
+def load(fp: IO) -> Any:
+    """Decodifica o conteúdo de um arquivo (de preferência aberto em modo binário)."""
+    return get_codec().loads(fp.read())
+
+
+def dump(obj: Any, fp: IO[bytes]):
+    """Grava `obj` em um arquivo aberto em modo binário."""
+    fp.write(get_codec().dumps_bytes(obj))
@@ -0,0 +1,262 @@
+import asyncio
+import math
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Hashable, List, Optional
+
+from app.logger import logger
+from app.utils.fair_budget import FairBudget
+
+
+@dataclass
+class _Hold:
+    """Vaga reservada por uma tarefa: limitador, chave, dona e se está em uso."""
+
+    limiter: "AdaptiveLimiter"
+    key: Hashable
+    task: Optional[asyncio.Task]
+    held: bool = True
+
+
+# vaga da tarefa atual (evita adquirir duas vezes quando o crawler já reservou a
+# vaga antes de chamar o getter)
+_holding: ContextVar[Optional[_Hold]] = ContextVar("limiter_holding", default=None)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil `pct` (0-100) pelo método do vizinho mais próximo."""
+    ordered = sorted(values)
+    index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+@dataclass
+class LimiterStats:
+    """Métricas acumuladas de um `AdaptiveLimiter`."""
+
+    requests: int = 0
+    failures: int = 0
+    increases: int = 0
+    decreases: int = 0
+    peak_limit: int = 0
+
+
+class AdaptiveLimiter:
+    """
+    Limite adaptativo de requisições simultâneas à API CMA Web (AIMD).
+
+    A cada janela de `window` respostas o p95 da latência é comparado com a linha
+    de base (menor p95 observado, com lenta deriva para cima):
+
+    - p95 até `tolerance` vezes a linha de base: o limite cresce em 1 (aumento
+      aditivo);
+    - p95 acima disso ou falhas (timeout, erro de conexão, 429, 5xx): o limite é
+      multiplicado por `backoff` (redução multiplicativa), no máximo uma vez por
+      "rodada" de requisições, para que uma rajada de erros não o derrube até o
+      mínimo.
+
+    As vagas são distribuídas em rodízio entre as chaves (`FairBudget`), como no
+    orçamento fixo do crawler. Com `adaptive=False` o limite fica fixo em
+    `initial_limit`.
+
+    Args:
+        initial_limit (int): Limite inicial (ex.: `MAX_PARALLEL_REQUESTS`).
+        min_limit (int): Limite mínimo. Padrão: 1.
+        max_limit (int, optional): Limite máximo. Padrão: 4x o inicial.
+        adaptive (bool): Ajusta o limite conforme latência e erros. Padrão: True.
+        window (int): Respostas por avaliação da latência. Padrão: 20.
+        tolerance (float): Aumento tolerado do p95 sobre a linha de base. Padrão: 1.5.
+        backoff (float): Fator da redução multiplicativa. Padrão: 0.7.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        adaptive: bool = True,
+        window: int = 20,
+        tolerance: float = 1.5,
+        backoff: float = 0.7,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit or initial_limit * 4, initial_limit)
+        self.adaptive = adaptive
+        self.window = window
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.budget = FairBudget(initial_limit)
+        self.stats = LimiterStats(peak_limit=initial_limit)
+        self.baseline_p95: Optional[float] = None
+        self.last_p95: Optional[float] = None
+        self._latencies: List[float] = []
+        # permite reduzir já na primeira falha
+        self._requests_at_decrease = -initial_limit
+
+    @property
+    def limit(self) -> int:
+        return self.budget.capacity
+
+    @property
+    def in_flight(self) -> int:
+        return self.budget.in_use
+
+    @property
+    def queue_depth(self) -> int:
+        return self.budget.queue_depth
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable = None):
+        """
+        Reserva uma vaga (reentrante: não reserva de novo na mesma tarefa).
+
+        Uma tarefa que herdou uma vaga devolvida por `released()` (ex.: a tarefa
+        da requisição compartilhada pelo `RequestCoalescer`) reserva a própria
+        vaga, na mesma chave da herdada.
+        """
+        hold = _holding.get()
+        if hold is not None and hold.limiter is self:
+            if hold.held:
+                yield
+                return
+            if key is None:
+                key = hold.key
+        await self.budget.acquire(key)
+        hold = _Hold(self, key, asyncio.current_task())
+        token = _holding.set(hold)
+        try:
+            yield
+        finally:
+            _holding.reset(token)
+            if hold.held:
+                self.budget.release()
+
+    @asynccontextmanager
+    async def released(self):
+        """
+        Devolve a vaga da tarefa atual durante o bloco e a reserva de novo, na
+        mesma chave, ao sair dele. Tarefas filhas, que herdam a vaga da tarefa
+        que a reservou, não a devolvem.
+
+        Usado na espera entre tentativas (backoff, `Retry-After`) e enquanto a
+        tarefa aguarda uma requisição compartilhada: a vaga fica livre para outras
+        requisições enquanto a tarefa não usa a API.
+        """
+        hold = _holding.get()
+        if (
+            hold is None
+            or hold.limiter is not self
+            or hold.task is not asyncio.current_task()
+            or not hold.held
+        ):
+            yield
+            return
+        hold.held = False
+        self.budget.release()
+        try:
+            yield
+        finally:
+            # se a espera pela vaga for cancelada, `slot()` não a devolve
+            await self.budget.acquire(hold.key)
+            hold.held = True
+
+    def record(self, latency: float, failure: bool = False):
+        """
+        Registra o resultado de uma requisição.
+
+        Args:
+            latency (float): Duração da requisição, em segundos.
+            failure (bool): Timeout, erro de conexão, 429 ou 5xx.
+        """
+        self.stats.requests += 1
+        if failure:
+            self.stats.failures += 1
+            self._decrease("falhas")
+            return
+        self._latencies.append(latency)
+        if len(self._latencies) >= self.window:
+            self._evaluate()
+
+    def _evaluate(self):
+        p95 = percentile(self._latencies, 95)
+        self._latencies.clear()
+        self.last_p95 = p95
+        if self.baseline_p95 is None or p95 < self.baseline_p95:
+            self.baseline_p95 = p95
+        else:
+            # deriva lenta: acompanha mudanças permanentes da API
+            self.baseline_p95 = 0.95 * self.baseline_p95 + 0.05 * p95
+        if p95 <= self.baseline_p95 * self.tolerance:
+            self._set_limit(self.limit + 1)
+        else:
+            self._decrease("latência")
+
+    def _decrease(self, reason: str):
+        # no máximo uma redução por rodada (limite atual de requisições)
+        if self.stats.requests - self._requests_at_decrease < self.limit:
+            return
+        self._requests_at_decrease = self.stats.requests
+        self._latencies.clear()
+        self._set_limit(math.floor(self.limit * self.backoff), reason)
+
+    def _set_limit(self, value: int, reason: str = None):
+        if not self.adaptive:
+            return
+        value = min(max(value, self.min_limit), self.max_limit)
+        if value == self.limit:
+            return
+        if value > self.limit:
+            self.stats.increases += 1
+        else:
+            self.stats.decreases += 1
+            logger.info(f"Concorrência reduzida para {value} ({reason})")
+        self.budget.capacity = value
+        self.stats.peak_limit = max(self.stats.peak_limit, value)
+
+    def as_dict(self) -> dict:
+        """Métricas atuais: limite, requisições em andamento, fila e latência."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "p95_ms": None if self.last_p95 is None else round(self.last_p95 * 1000, 1),
+            **asdict(self.stats),
+        }
+
+    def summary(self) -> str:
+        metrics = self.as_dict()
+        return (
+            f"limite {metrics['limit']} (pico {metrics['peak_limit']}), "
+            f"fila {metrics['queue_depth']}, p95 {metrics['p95_ms']} ms, "
+            f"{metrics['requests']} requisições, {metrics['failures']} falhas, "
+            f"{metrics['increases']} aumentos, {metrics['decreases']} reduções"
+        )
+
+
+_api_limiter: Optional[AdaptiveLimiter] = None
+
+
+def get_api_limiter() -> AdaptiveLimiter:
+    """Limitador compartilhado pelos getters chamados fora do crawler."""
+    global _api_limiter
+    if _api_limiter is None:
+        from app.settings import configs
+
+        _api_limiter = create_limiter(configs)
+    return _api_limiter
+
+
+def create_limiter(configs, initial_limit: int = None) -> AdaptiveLimiter:
+    """Cria um limitador com os parâmetros de `configs`."""
+    return AdaptiveLimiter(
+        initial_limit or configs.MAX_PARALLEL_REQUESTS,
+        max_limit=configs.MAX_ADAPTIVE_REQUESTS,
+        adaptive=configs.ADAPTIVE_CONCURRENCY,
+    )
+
+
+def current_limiter() -> AdaptiveLimiter:
+    """Limitador da vaga em uso pela tarefa atual ou o compartilhado."""
+    hold = _holding.get()
+    return hold.limiter if hold is not None else get_api_limiter()
@@ -0,0 +1,164 @@
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, List, Optional, Pattern, Tuple
+
+# status HTTP transitórios: vale a pena repetir a requisição
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class HttpStatusError(Exception):
+    """Resposta HTTP com status inesperado (mantém o status para classificação)."""
+
+    def __init__(self, status: int, message: str = None):
+        super().__init__(message or f"Falha na requisição. Código de status: {status}")
+        self.status = status
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Converte o cabeçalho `Retry-After` em segundos de espera.
+
+    Aceita segundos ("120") ou data HTTP ("Wed, 21 Oct 2015 07:28:00 GMT").
+
+    Returns:
+        float | None: Segundos de espera (>= 0) ou None se ausente ou inválido.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class RetryBudget:
+    """
+    Limita a fração de retentativas em relação às requisições (token bucket).
+
+    Cada requisição deposita `ratio` fichas e cada retentativa consome uma; com o
+    saldo zerado as falhas deixam de ser repetidas, evitando que uma API instável
+    receba uma avalanche de retentativas. `min_retries` garante algumas
+    retentativas mesmo com pouco tráfego.
+
+    Args:
+        ratio (float): Retentativas permitidas por requisição. Padrão: 0.2 (20%).
+        min_retries (int): Saldo inicial e mínimo de retentativas. Padrão: 10.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.max_tokens = float(max(min_retries, 1) * 10)
+        self.tokens = float(min_retries)
+        self.exhausted = 0
+
+    def deposit(self):
+        self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.exhausted += 1
+        return False
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Política de retentativas de uma família de endpoints.
+
+    O intervalo entre tentativas segue backoff exponencial com "full jitter"
+    (sorteado entre 0 e `base_delay * 2 ** (tentativa - 1)`, limitado a
+    `max_delay`), o que dessincroniza as retentativas de requisições que falharam
+    juntas. Quando a API informa `Retry-After` (429/503), esse prazo é respeitado.
+
+    Args:
+        max_attempts (int): Número máximo de tentativas. Padrão: 3.
+        base_delay (float): Base do backoff, em segundos. Padrão: 0.5.
+        max_delay (float): Teto do backoff e do `Retry-After`. Padrão: 30.
+        retryable_status (frozenset): Status HTTP que são repetidos.
+        budget (RetryBudget, optional): Orçamento de retentativas compartilhado.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    retryable_status: FrozenSet[int] = RETRYABLE_STATUS
+    budget: Optional[RetryBudget] = field(default=None, compare=False)
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in self.retryable_status
+
+    def on_request(self):
+        """Registra uma tentativa no orçamento de retentativas."""
+        if self.budget is not None:
+            self.budget.deposit()
+
+    def can_retry(self, attempt: int) -> bool:
+        """Indica se a tentativa `attempt` (já falha) pode ser repetida."""
+        if attempt >= self.max_attempts:
+            return False
+        return self.budget is None or self.budget.withdraw()
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Espera antes da próxima tentativa.
+
+        Args:
+            attempt (int): Número da tentativa que falhou (a partir de 1).
+            retry_after (str, optional): Valor do cabeçalho `Retry-After`.
+
+        Returns:
+            float: Segundos de espera.
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+_policies: List[Tuple[Pattern, RetryPolicy]] = []
+_default_policy: Optional[RetryPolicy] = None
+
+
+def register_policy(url_pattern: str, policy: RetryPolicy):
+    """
+    Define a política de um endpoint ou família de endpoints.
+
+    Args:
+        url_pattern (str): Expressão regular buscada na URL (ex.: r"/auth/").
+        policy (RetryPolicy): Política aplicada às URLs que casarem.
+    """
+    _policies.insert(0, (re.compile(url_pattern), policy))
+
+
+def default_policy() -> RetryPolicy:
+    """Política padrão, criada a partir das configurações (`MAX_RETRIES`, ...)."""
+    global _default_policy
+    if _default_policy is None:
+        from app.settings import configs
+
+        _default_policy = RetryPolicy(
+            max_attempts=configs.MAX_RETRIES,
+            base_delay=configs.RETRY_BASE_DELAY,
+            max_delay=configs.RETRY_MAX_DELAY,
+            budget=RetryBudget(ratio=configs.RETRY_BUDGET_RATIO),
+        )
+    return _default_policy
+
+
+def policy_for(url: str) -> RetryPolicy:
+    """Política registrada para `url` ou a política padrão."""
+    for pattern, policy in _policies:
+        if pattern.search(url):
+            return policy
+    return default_policy()
@@ -0,0 +1,78 @@
+"""
+Benchmark da coleta completa contra a API CMA Web simulada.
+
+Sobe o servidor de `benchmarks.mock_cma_web` no próprio processo, aponta a
+configuração da coleta para ele e percorre toda a frota com o `CmaWebCrawler`
+(login, paginação, retentativas, limite adaptativo), informando o tempo, as
+requisições e a vazão. Falha (código de saída 1) se algum registro da frota não
+for coletado, de modo que também serve como teste de regressão.
+
+Uso:
+    PYTHONPATH=$(pwd) python -m benchmarks.crawl
+    PYTHONPATH=$(pwd) python -m benchmarks.crawl --gateways 2 --hardwares 5 \\
+        --sensors-modbus 10 --registers 50 --latency 0.01 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from app.collector.crawler import CmaWebCrawler
+from app.getters.gateway import fetch_all_gateways
+from app.settings import configs
+from app.utils.http_client import http_client
+
+from .mock_cma_web import add_fleet_arguments, server_from_args
+
+
+async def run(args: argparse.Namespace) -> bool:
+    server = server_from_args(args)
+    spec = server.fleet.spec
+    async with server:
+        configs.host = server.url
+        configs.username = configs.password = "mock"
+        configs.token_manager.invalidate()
+        configs.MAX_PAGE_SIZE = args.page_size
+        # a frota inteira é coletada, mesmo com DEBUG=true no .env
+        configs.DEBUG = False
+        crawler = CmaWebCrawler(
+            configs, max_parallel_requests=args.parallel, list_only=args.list_only
+        )
+        try:
+            start = time.perf_counter()
+            gateways = await fetch_all_gateways(configs.host, await configs.auth_token)
+            result = await crawler.crawl(gateways)
+            seconds = time.perf_counter() - start
+        finally:
+            await configs.token_manager.close()
+            await http_client.close()
+
+    collected = len(result.flat_data)
+    print(f"frota: {spec.describe()}")
+    print(f"tempo: {seconds:.2f} s")
+    print(f"registros coletados: {collected} ({collected / seconds:.0f}/s)")
+    print(f"servidor: {server.stats.summary()} ({server.stats.requests / seconds:.0f}/s)")
+    print(f"concorrência: {crawler.limiter.summary()}")
+    print(f"deduplicação: {crawler.coalescer.stats.summary()}")
+    if crawler.list_only:
+        print(crawler.detail_stats.summary())
+    if collected != spec.total_registers:
+        print(f"ERRO: esperados {spec.total_registers} registros", file=sys.stderr)
+        return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_fleet_arguments(parser)
+    parser.add_argument("--parallel", type=int, default=None, help="MAX_PARALLEL_REQUESTS")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--list-only", action="store_true")
+    args = parser.parse_args(argv)
+    if not asyncio.run(run(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark do achatamento gateway → hardware → sensor → registro.
+
+Compara o achatamento nível a nível (`combine_primary_with_secondary` aplicado no
+sensor, no hardware e no gateway, como a coleta fazia) com o achatamento em uma
+única passada (prefixo dos ancestrais fundido uma vez por sensor), sobre uma
+árvore sintética.
+
+Uso:
+    PYTHONPATH=$(pwd) python -m benchmarks.flatten
+    PYTHONPATH=$(pwd) python -m benchmarks.flatten --hardwares 10 --sensors 100 --registers 100
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from app.getters.gateway import parse_gateway_data
+from app.getters.hardware import parse_hardware_data
+from app.getters.register import parse_register_modbus_data
+from app.getters.sensors import parse_sensor_modbus_data
+from app.utils.data import combine_primary_with_secondary
+
+
+def build_tree(hardwares: int, sensors: int, registers: int) -> dict:
+    """Árvore sintética com os mesmos campos dos parsers da coleta."""
+    return {
+        "gateway": parse_gateway_data({"id": "GW"}),
+        "hardwares": [
+            {
+                "parsed": parse_hardware_data({"id": f"HW{h}"}),
+                "sensors": [
+                    {
+                        "parsed": parse_sensor_modbus_data({"id": f"S{h}.{s}"}),
+                        "registers": [
+                            parse_register_modbus_data({"id": f"R{h}.{s}.{r}"})
+                            for r in range(registers)
+                        ],
+                    }
+                    for s in range(sensors)
+                ],
+            }
+            for h in range(hardwares)
+        ],
+    }
+
+
+def flatten_per_level(tree: dict) -> list:
+    """Achatamento antigo: uma cópia de cada registro por nível da árvore."""
+    gateway_rows = []
+    for hardware in tree["hardwares"]:
+        hardware_rows = []
+        for sensor in hardware["sensors"]:
+            hardware_rows += combine_primary_with_secondary(
+                sensor["parsed"], sensor["registers"]
+            )
+        gateway_rows += combine_primary_with_secondary(hardware["parsed"], hardware_rows)
+    return combine_primary_with_secondary(tree["gateway"], gateway_rows)
+
+
+def flatten_single_pass(tree: dict) -> list:
+    """Achatamento em uma passada: um único dicionário por registro."""
+    rows = []
+    for hardware in tree["hardwares"]:
+        for sensor in hardware["sensors"]:
+            prefix = {**tree["gateway"], **hardware["parsed"], **sensor["parsed"]}
+            rows += [{**prefix, **register} for register in sensor["registers"]]
+    return rows
+
+
+def measure(flatten, tree: dict, repeat: int) -> dict:
+    """Melhor tempo de `repeat` execuções e pico de memória (tracemalloc)."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        rows = flatten(tree)
+        best = min(best, time.perf_counter() - start)
+        del rows
+
+    gc.collect()
+    tracemalloc.start()
+    rows = flatten(tree)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"rows": len(rows), "seconds": best, "peak_mb": peak / 2**20}
+
+
+def count_row_dicts(flatten, tree: dict) -> int:
+    """Dicionários de linha criados: um por registro e nível, ou um por registro."""
+    sensors = [sensor for hardware in tree["hardwares"] for sensor in hardware["sensors"]]
+    registers = sum(len(sensor["registers"]) for sensor in sensors)
+    if flatten is flatten_per_level:
+        return registers * 3
+    # + o prefixo (gateway + hardware + sensor) montado uma vez por sensor
+    return registers + len(sensors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hardwares", type=int, default=10)
+    parser.add_argument("--sensors", type=int, default=100, help="sensores por hardware")
+    parser.add_argument("--registers", type=int, default=100, help="registros por sensor")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    tree = build_tree(args.hardwares, args.sensors, args.registers)
+    assert flatten_per_level(tree) == flatten_single_pass(tree)
+
+    print(f"{'método':<14}{'registros':>10}{'dicts':>10}{'tempo (s)':>12}{'pico (MB)':>12}")
+    for name, flatten in (("por nível", flatten_per_level), ("uma passada", flatten_single_pass)):
+        stats = measure(flatten, tree, args.repeat)
+        print(
+            f"{name:<14}{stats['rows']:>10}{count_row_dicts(flatten, tree):>10}"
+            f"{stats['seconds']:>12.3f}{stats['peak_mb']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Frota sintética da API CMA Web (gateways × hardwares × sensores × registros).
+
+As entidades são geradas sob demanda a partir dos seus IDs, que codificam a
+posição na árvore (ex.: "RMB-0-1-2-42" é o registro 42 do sensor Modbus 2 do
+hardware 1 do gateway 0). Assim frotas de milhões de registros não ocupam
+memória: cada listagem ou detalhe é montado apenas quando pedido, sempre com o
+mesmo conteúdo.
+
+Os campos seguem o formato da API (ver as fixtures de `tests/conftest.py`) e
+cobrem todos os caminhos lidos pelos `parse_*` dos getters.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+CREATED_AT = "2025-01-06T12:00:00.000Z"
+UPDATED_AT = "2025-03-10T08:30:00.000Z"
+USER_ID = "5E1D7A2C-0000-4000-8000-000000000001"
+
+MANUFACTURER = {
+    "id": "6917C79D-D6D4-EF11-88FA-6045BDFE79DC",
+    "name": "Fabricante 01",
+    "active": True,
+}
+REGISTER_TYPE = {
+    "id": "DC39658D-D6D4-EF11-88FA-6045BDFE79DC",
+    "name": "Tipo 02",
+    "active": True,
+}
+SENSOR_TYPE = {
+    "id": "02D1D879-7EB2-EF11-88F8-6045BDFE79DC",
+    "name": "TEM01",
+    "active": True,
+}
+
+
+@dataclass(frozen=True)
+class FleetSpec:
+    """
+    Dimensões da frota.
+
+    Args:
+        gateways (int): Número de gateways. Padrão: 1.
+        hardwares (int): Hardwares por gateway. Padrão: 2.
+        sensors_modbus (int): Sensores Modbus por hardware. Padrão: 2.
+        sensors_dnp (int): Sensores DNP3 por hardware. Padrão: 1.
+        registers (int): Registros por sensor. Padrão: 10.
+    """
+
+    gateways: int = 1
+    hardwares: int = 2
+    sensors_modbus: int = 2
+    sensors_dnp: int = 1
+    registers: int = 10
+
+    @property
+    def total_sensors(self) -> int:
+        return self.gateways * self.hardwares * (self.sensors_modbus + self.sensors_dnp)
+
+    @property
+    def total_registers(self) -> int:
+        return self.total_sensors * self.registers
+
+    def describe(self) -> str:
+        return (
+            f"{self.gateways} gateways × {self.hardwares} hardwares × "
+            f"({self.sensors_modbus} Modbus + {self.sensors_dnp} DNP3) sensores × "
+            f"{self.registers} registros = {self.total_registers} registros"
+        )
+
+
+def _entity_id(prefix: str, *indexes: int) -> str:
+    return "-".join([prefix, *map(str, indexes)])
+
+
+class SyntheticFleet:
+    """
+    Gera as respostas da API CMA Web para uma `FleetSpec`.
+
+    Os métodos de listagem recebem o ID do pai e os de detalhe o ID da entidade;
+    IDs inexistentes retornam None (404 no servidor simulado).
+
+    Example:
+        >>> fleet = SyntheticFleet(FleetSpec(gateways=2, registers=100))
+        >>> fleet.registers_modbus("SMB-0-0-0")[:2]
+    """
+
+    # prefixo do ID -> (níveis do ID, limites de cada nível na FleetSpec)
+    LEVELS = {
+        "GW": ("gateways",),
+        "HW": ("gateways", "hardwares"),
+        "SMB": ("gateways", "hardwares", "sensors_modbus"),
+        "SDN": ("gateways", "hardwares", "sensors_dnp"),
+        "RMB": ("gateways", "hardwares", "sensors_modbus", "registers"),
+        "RDN": ("gateways", "hardwares", "sensors_dnp", "registers"),
+    }
+
+    def __init__(self, spec: FleetSpec):
+        self.spec = spec
+
+    def _indexes(self, prefix: str, entity_id: str) -> Optional[Tuple[int, ...]]:
+        """Posição na árvore codificada em `entity_id` ou None se não existir."""
+        parts = str(entity_id).split("-")
+        if parts[0] != prefix or len(parts) != len(self.LEVELS[prefix]) + 1:
+            return None
+        try:
+            indexes = tuple(int(part) for part in parts[1:])
+        except ValueError:
+            return None
+        limits = [getattr(self.spec, level) for level in self.LEVELS[prefix]]
+        if any(not 0 <= index < limit for index, limit in zip(indexes, limits)):
+            return None
+        return indexes
+
+    # gateways
+
+    def _gateway(self, g: int) -> Dict[str, Any]:
+        return {
+            "id": _entity_id("GW", g),
+            "name": f"Gateway {g:02d}",
+            "ip": f"100.201.{g // 250}.{g % 250 + 1}",
+            "active": True,
+            "substationId": _entity_id("SUB", g),
+            "substation": {
+                "id": _entity_id("SUB", g),
+                "name": f"Subestação {g:02d}",
+                "active": True,
+                "sapAbbreviation": f"S{g:02d}",
+            },
+            "createdAt": CREATED_AT,
+            "updatedAt": UPDATED_AT,
+            "userCreatedId": USER_ID,
+            "userUpdatedId": USER_ID,
+        }
+
+    def gateways(self) -> List[Dict[str, Any]]:
+        return [self._gateway(g) for g in range(self.spec.gateways)]
+
+    def gateway(self, gateway_id: str) -> Optional[Dict[str, Any]]:
+        indexes = self._indexes("GW", gateway_id)
+        return self._gateway(*indexes) if indexes else None
+
+    # hardwares
+
+    def _hardware(self, g: int, h: int) -> Dict[str, Any]:
+        gateway = self._gateway(g)
+        return {
+            "id": _entity_id("HW", g, h),
+            "name": f"Equipamento {g:02d}.{h:02d}",
+            "sapId": f"SAP{g:03d}{h:03d}",
+            "active": True,
+            "type": "TRANSFORMADOR",
+            "model": "TR-500",
+            "cmaGatewayId": gateway["id"],
+            "cmaGateway": {key: gateway[key] for key in ("id", "name", "ip", "active")},
+            "createdAt": CREATED_AT,
+            "updatedAt": UPDATED_AT,
+            "userCreatedId": USER_ID,
+            "userUpdatedId": USER_ID,
+        }
+
+    def hardwares(self, gateway_id: str) -> Optional[List[Dict[str, Any]]]:
+        indexes = self._indexes("GW", gateway_id)
+        if indexes is None:
+            return None
+        return [self._hardware(*indexes, h) for h in range(self.spec.hardwares)]
+
+    def hardware(self, hardware_id: str) -> Optional[Dict[str, Any]]:
+        indexes = self._indexes("HW", hardware_id)
+        return self._hardware(*indexes) if indexes else None
+
+    # sensores
+
+    def _sensor(self, prefix: str, g: int, h: int, s: int) -> Dict[str, Any]:
+        hardware = self._hardware(g, h)
+        sensor = {
+            "id": _entity_id(prefix, g, h, s),
+            "name": f"Sensor {prefix} {g}.{h}.{s}",
+            "description": "Sensor sintético",
+            "model": "xps1000",
+            "ip": f"192.168.{h % 250}.{s % 250 + 1}",
+            "port": 502 if prefix == "SMB" else 20000,
+            "type": "SENSOR",
+            "attempts": 2,
+            "timeLimit": 500,
+            "actualizationPeriod": "MINUTES",
+            "active": True,
+            "manufacturerId": MANUFACTURER["id"],
+            "manufacturer": dict(MANUFACTURER),
+            "hardwareId": hardware["id"],
+            "hardware": {
+                key: hardware[key] for key in ("id", "name", "sapId", "active")
+            },
+            "tags": [{"name": "fase", "value": "A"}],
+            "createdAt": CREATED_AT,
+            "updatedAt": UPDATED_AT,
+            "userCreatedId": USER_ID,
+            "userUpdatedId": USER_ID,
+        }
+        if prefix == "SMB":
+            sensor.update(
+                actualizationTime=5,
+                maxRegisterRead=120,
+                maxRegisterWrite=120,
+                maxRegisterBitsRead=2000,
+            )
+        else:
+            sensor.update(
+                pollRbePeriod=5,
+                pollStaticPeriod=30,
+                addressSource=1,
+                addressSlave=s + 1,
+                cma=hardware["cmaGateway"],
+            )
+        return sensor
+
+    def sensors_modbus(
+        self, hardware_id: str, start: int = 0, stop: int = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Sensores Modbus `start:stop` do hardware (uma página da listagem)."""
+        indexes = self._indexes("HW", hardware_id)
+        if indexes is None:
+            return None
+        sensors = range(self.spec.sensors_modbus)[start:stop]
+        return [self._sensor("SMB", *indexes, s) for s in sensors]
+
+    def sensor_modbus(self, sensor_id: str) -> Optional[Dict[str, Any]]:
+        indexes = self._indexes("SMB", sensor_id)
+        return self._sensor("SMB", *indexes) if indexes else None
+
+    def sensors_dnp(
+        self, hardware_id: str, start: int = 0, stop: int = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Sensores DNP3 `start:stop` do hardware (uma página da listagem)."""
+        indexes = self._indexes("HW", hardware_id)
+        if indexes is None:
+            return None
+        sensors = range(self.spec.sensors_dnp)[start:stop]
+        return [self._sensor("SDN", *indexes, s) for s in sensors]
+
+    def sensor_dnp(self, sensor_id: str) -> Optional[Dict[str, Any]]:
+        indexes = self._indexes("SDN", sensor_id)
+        return self._sensor("SDN", *indexes) if indexes else None
+
+    # registros
+
+    def _register(self, prefix: str, g: int, h: int, s: int, r: int) -> Dict[str, Any]:
+        sensor_prefix = "SMB" if prefix == "RMB" else "SDN"
+        sensor = self._sensor(sensor_prefix, g, h, s)
+        register = {
+            "id": _entity_id(prefix, g, h, s, r),
+            "name": f"Registrador {r}",
+            "description": "Descrição do registrador",
+            "active": True,
+            "registerTypeId": REGISTER_TYPE["id"],
+            "registerType": dict(REGISTER_TYPE),
+            "sensorTypeId": SENSOR_TYPE["id"],
+            "sensorType": dict(SENSOR_TYPE),
+            "tags": [{"name": "fase", "value": "ABC"[r % 3]}],
+            "createdAt": CREATED_AT,
+            "updatedAt": UPDATED_AT,
+            "userCreatedId": USER_ID,
+            "userUpdatedId": USER_ID,
+        }
+        # o registro traz uma cópia resumida do sensor, sem as entidades aninhadas
+        summary = {
+            key: value
+            for key, value in sensor.items()
+            if key not in ("hardware", "cma", "tags", "hardwareId", "manufacturerId")
+        }
+        if prefix == "RMB":
+            register.update(
+                sensorModbusId=sensor["id"],
+                sensorModbus=summary,
+                addressSlave=s + 1,
+                addressRegister=1000 + r,
+                registerModbusType="HOLDING_REGISTER",
+                registerDataFormat="TWO_BYTE_INT_UNSIGNED",
+                bit=r % 16,
+                multiplier=1,
+                additive=0,
+                phase="ABC"[r % 3],
+                circuitBreakerManeuverType="ABERTURA",
+                bushingSide="H1",
+            )
+        else:
+            summary.pop("manufacturer")
+            register.update(
+                sensorDnpId=sensor["id"],
+                sensorDnp=summary,
+                manufacturer=dict(MANUFACTURER),
+                index=r,
+                timeOn=0,
+                timeOff=0,
+                registerDataType=0,
+                registerControlCommand=3,
+            )
+        return register
+
+    def registers_modbus(
+        self, sensor_id: str, start: int = 0, stop: int = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Registros `start:stop` do sensor Modbus (uma página da listagem)."""
+        indexes = self._indexes("SMB", sensor_id)
+        if indexes is None:
+            return None
+        rows = range(self.spec.registers)[start:stop]
+        return [self._register("RMB", *indexes, r) for r in rows]
+
+    def register_modbus(self, register_id: str) -> Optional[Dict[str, Any]]:
+        indexes = self._indexes("RMB", register_id)
+        return self._register("RMB", *indexes) if indexes else None
+
+    def registers_dnp(
+        self, sensor_id: str, start: int = 0, stop: int = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Registros `start:stop` do sensor DNP3 (uma página da listagem)."""
+        indexes = self._indexes("SDN", sensor_id)
+        if indexes is None:
+            return None
+        rows = range(self.spec.registers)[start:stop]
+        return [self._register("RDN", *indexes, r) for r in rows]
+
+    def register_dnp(self, register_id: str) -> Optional[Dict[str, Any]]:
+        indexes = self._indexes("RDN", register_id)
+        return self._register("RDN", *indexes) if indexes else None
@@ -0,0 +1,323 @@
+"""
+Servidor local que simula a API CMA Web sobre uma frota sintética.
+
+Implementa os endpoints usados pela coleta (`/auth/token`, `/cma-gateways`,
+`/hardwares`, `/sensors-modbus`, `/sensors-dnp`, `/registers-modbus`,
+`/registers-dnp`), com paginação no formato Spring, autenticação Bearer com
+expiração, `ETag`/304 nos detalhes e injeção de latência, erros e throttling
+(429 com `Retry-After`). Permite medir e testar o desempenho da coleta sem
+acesso à API real.
+
+Uso:
+    PYTHONPATH=$(pwd) python -m benchmarks.mock_cma_web --gateways 2 --registers 100
+    PYTHONPATH=$(pwd) python -m benchmarks.mock_cma_web --latency 0.02 --error-rate 0.01
+
+Depois aponte `GWTDADOS_HOST` para o endereço exibido (ex.: http://127.0.0.1:8080).
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import secrets
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from aiohttp import web
+
+from .fleet import FleetSpec, SyntheticFleet
+
+
+@dataclass
+class MockStats:
+    """Requisições atendidas pelo servidor simulado."""
+
+    requests: int = 0
+    logins: int = 0
+    unauthorized: int = 0
+    injected_errors: int = 0
+    throttled: int = 0
+    not_modified: int = 0
+    by_route: Counter = field(default_factory=Counter)
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requisições, {self.logins} logins, "
+            f"{self.injected_errors} erros injetados, {self.throttled} throttled (429), "
+            f"{self.not_modified} respostas 304, {self.unauthorized} não autorizadas (401)"
+        )
+
+
+def _b64(data: dict) -> str:
+    raw = json.dumps(data).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+class MockCmaWeb:
+    """
+    API CMA Web simulada (aiohttp) sobre uma `SyntheticFleet`.
+
+    Args:
+        fleet (SyntheticFleet): Frota servida.
+        latency (float): Atraso de cada resposta, em segundos. Padrão: 0.
+        jitter (float): Variação aleatória somada ao atraso (0 a `jitter`). Padrão: 0.
+        error_rate (float): Fração das requisições respondidas com `error_status`
+            (exceto o login).
+        error_status (int): Status dos erros injetados. Padrão: 503.
+        throttle_rate (float): Fração das requisições respondidas com 429.
+        retry_after (float): Valor do `Retry-After` dos 429, em segundos. Padrão: 1.
+        token_ttl (float): Validade dos tokens emitidos, em segundos. Padrão: 3600.
+        seed (int): Semente da latência e dos erros injetados. Padrão: 0.
+
+    Example:
+        >>> async with MockCmaWeb(SyntheticFleet(FleetSpec())) as server:
+        ...     gateways = await fetch_all_gateways(server.url, server.issue_token())
+    """
+
+    def __init__(
+        self,
+        fleet: SyntheticFleet,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        token_ttl: float = 3600.0,
+        seed: int = 0,
+    ):
+        self.fleet = fleet
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.token_ttl = token_ttl
+        self.random = random.Random(seed)
+        self.stats = MockStats()
+        self.url: Optional[str] = None
+        self._tokens = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    # autenticação
+
+    def issue_token(self) -> str:
+        """Emite um token (JWT sem assinatura válida, com `exp`) aceito pelo servidor."""
+        expires_at = time.time() + self.token_ttl
+        token = ".".join(
+            [
+                _b64({"alg": "none", "typ": "JWT"}),
+                _b64({"sub": "mock", "exp": int(expires_at)}),
+                secrets.token_urlsafe(8),
+            ]
+        )
+        self._tokens[token] = expires_at
+        return token
+
+    def _authorized(self, request: web.Request) -> bool:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        expires_at = self._tokens.get(token)
+        return scheme == "Bearer" and expires_at is not None and time.time() < expires_at
+
+    # aplicação
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        fleet = self.fleet
+        app.router.add_post("/auth/token", self._login)
+        app.router.add_get("/cma-gateways/all", self._list(lambda q: fleet.gateways()))
+        app.router.add_get("/cma-gateways/{id}", self._detail(fleet.gateway))
+        app.router.add_get(
+            "/hardwares/all", self._list(lambda q: fleet.hardwares(q.get("cmaGatewayId")))
+        )
+        app.router.add_get("/hardwares/{id}", self._detail(fleet.hardware))
+        listings = (
+            ("/sensors-modbus", fleet.sensors_modbus, "hardwareId", "sensors_modbus"),
+            ("/sensors-dnp", fleet.sensors_dnp, "hardwareId", "sensors_dnp"),
+            ("/registers-modbus", fleet.registers_modbus, "sensorModbusId", "registers"),
+            ("/registers-dnp", fleet.registers_dnp, "sensorDnpId", "registers"),
+        )
+        for path, build, parent, total in listings:
+            app.router.add_get(path, self._paged(build, parent, getattr(fleet.spec, total)))
+        app.router.add_get("/sensors-modbus/{id}", self._detail(fleet.sensor_modbus))
+        app.router.add_get("/sensors-dnp/{id}", self._detail(fleet.sensor_dnp))
+        app.router.add_get("/registers-modbus/{id}", self._detail(fleet.register_modbus))
+        app.router.add_get("/registers-dnp/{id}", self._detail(fleet.register_dnp))
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Callable):
+        self.stats.requests += 1
+        route = request.match_info.route.resource
+        self.stats.by_route[route.canonical if route is not None else request.path] += 1
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if request.path == "/auth/token":
+            # o login não tem retentativas: as falhas são injetadas só na coleta
+            return await handler(request)
+        draw = self.random.random()
+        if draw < self.error_rate:
+            self.stats.injected_errors += 1
+            return web.json_response({"message": "erro injetado"}, status=self.error_status)
+        if draw < self.error_rate + self.throttle_rate:
+            self.stats.throttled += 1
+            return web.json_response(
+                {"message": "muitas requisições"},
+                status=429,
+                headers={"Retry-After": f"{self.retry_after:g}"},
+            )
+        if not self._authorized(request):
+            self.stats.unauthorized += 1
+            return web.json_response({"message": "Unauthorized"}, status=401)
+        return await handler(request)
+
+    async def _login(self, request: web.Request) -> web.Response:
+        self.stats.logins += 1
+        return web.json_response({"access_token": self.issue_token()}, status=201)
+
+    @staticmethod
+    def _list(build: Callable[[Any], Optional[list]]) -> Callable:
+        """Listagem completa (sem paginação), como `/cma-gateways/all`."""
+
+        async def handler(request: web.Request) -> web.Response:
+            items = build(request.query)
+            if items is None:
+                raise web.HTTPNotFound()
+            return web.json_response(items)
+
+        return handler
+
+    @staticmethod
+    def _paged(build: Callable[[str, int, int], Optional[list]], parent: str, total: int):
+        """Listagem paginada (formato Spring) dos filhos do pai `parent` da query."""
+
+        async def handler(request: web.Request) -> web.Response:
+            page = int(request.query.get("page", 0))
+            size = int(request.query.get("size", 10))
+            content = build(request.query.get(parent), page * size, (page + 1) * size)
+            if content is None:
+                raise web.HTTPNotFound()
+            total_pages = max(1, -(-total // size))
+            return web.json_response(
+                {
+                    "content": content,
+                    "number": page,
+                    "size": size,
+                    "totalElements": total,
+                    "totalPages": total_pages,
+                    "last": page + 1 >= total_pages,
+                }
+            )
+
+        return handler
+
+    def _detail(self, build: Callable[[str], Optional[dict]]) -> Callable:
+        """Detalhe de uma entidade, com `ETag` e resposta 304 para `If-None-Match`."""
+
+        async def handler(request: web.Request) -> web.Response:
+            entity = build(request.match_info["id"])
+            if entity is None:
+                raise web.HTTPNotFound()
+            body = json.dumps(entity)
+            etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+            if request.headers.get("If-None-Match") == etag:
+                self.stats.not_modified += 1
+                return web.Response(status=304, headers={"ETag": etag})
+            return web.Response(
+                text=body, content_type="application/json", headers={"ETag": etag}
+            )
+
+        return handler
+
+    # ciclo de vida
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Inicia o servidor (porta livre quando `port=0`) e retorna a URL base."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+def add_fleet_arguments(parser: argparse.ArgumentParser):
+    """Argumentos de linha de comando das dimensões da frota e das falhas injetadas."""
+    parser.add_argument("--gateways", type=int, default=1)
+    parser.add_argument("--hardwares", type=int, default=2, help="hardwares por gateway")
+    parser.add_argument("--sensors-modbus", type=int, default=2, help="por hardware")
+    parser.add_argument("--sensors-dnp", type=int, default=1, help="por hardware")
+    parser.add_argument("--registers", type=int, default=10, help="registros por sensor")
+    parser.add_argument("--latency", type=float, default=0.0, help="segundos por resposta")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=float, default=3600.0)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def server_from_args(args: argparse.Namespace) -> MockCmaWeb:
+    spec = FleetSpec(
+        gateways=args.gateways,
+        hardwares=args.hardwares,
+        sensors_modbus=args.sensors_modbus,
+        sensors_dnp=args.sensors_dnp,
+        registers=args.registers,
+    )
+    return MockCmaWeb(
+        SyntheticFleet(spec),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        throttle_rate=args.throttle_rate,
+        token_ttl=args.token_ttl,
+        seed=args.seed,
+    )
+
+
+async def serve(args: argparse.Namespace):
+    server = server_from_args(args)
+    url = await server.start(args.host, args.port)
+    print(f"API CMA Web simulada em {url}: {server.fleet.spec.describe()}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        print(server.stats.summary())
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_fleet_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark dos parsers de registros da API (`parse_*` dos getters).
+
+Compara, sobre páginas sintéticas de registros Modbus:
+    - o estilo antigo, escrito à mão: cada campo percorre o JSON a partir da raiz
+      com `.get(chave, {})` encadeados (reproduzido a partir do mesmo esquema);
+    - o parser compilado do esquema (`compile_parser`), registro a registro;
+    - a variante em lote (`parser.batch`), que gera as colunas da página.
+
+Os tempos incluem a montagem do `pd.DataFrame`, como no carregamento do reconcile.
+
+Uso:
+    PYTHONPATH=$(pwd) python -m benchmarks.parsers
+    PYTHONPATH=$(pwd) python -m benchmarks.parsers --records 200000
+"""
+
+import argparse
+import gc
+import random
+import time
+
+import pandas as pd
+
+from app.getters.register import REGISTER_MODBUS_FIELDS, parse_register_modbus_data
+
+
+def legacy_parser(fields):
+    """Parser no estilo antigo: `data.get("a", {}).get("b", None)` por campo."""
+    lines = []
+    namespace = {}
+    for field in fields:
+        keys = field.keys
+        expression = "data" + "".join(f".get({key!r}, {{}})" for key in keys[:-1])
+        name = f"_d{len(namespace)}"
+        namespace[name] = field.default
+        default = "{}" if field.default == {} else name
+        expression += f".get({keys[-1]!r}, {default})"
+        if field.transform is not None:
+            transform = f"_t{len(namespace)}"
+            namespace[transform] = field.transform
+            expression = f"{transform}({expression})"
+        lines.append(f"        {field.column!r}: {expression},")
+    source = "def parse(data):\n    return {\n" + "\n".join(lines) + "\n    }\n"
+    exec(compile(source, "<legacy parser>", "exec"), namespace)
+    return namespace["parse"]
+
+
+def build_records(count: int, seed: int = 0) -> list:
+    """Registros sintéticos com todos os níveis do esquema preenchidos."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        record = {}
+        for field in REGISTER_MODBUS_FIELDS:
+            node = record
+            for key in field.keys[:-1]:
+                node = node.setdefault(key, {})
+            if isinstance(field.default, dict):
+                node[field.keys[-1]] = {"bit": rng.randint(0, 15)}
+            else:
+                node[field.keys[-1]] = f"{field.column}-{i}"
+        records.append(record)
+    return records
+
+
+def measure(convert, records: list, repeat: int) -> float:
+    """Melhor tempo de `repeat` execuções."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        convert(records)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    records = build_records(args.records)
+    legacy = legacy_parser(REGISTER_MODBUS_FIELDS)
+    compiled = parse_register_modbus_data
+    assert [legacy(r) for r in records[:100]] == [compiled(r) for r in records[:100]]
+
+    methods = (
+        ("antigo", lambda items: [legacy(r) for r in items]),
+        ("compilado", lambda items: [compiled(r) for r in items]),
+        ("lote", compiled.batch),
+    )
+    print(f"{'método':<12}{'registros':>10}{'parse (s)':>12}{'+ DataFrame (s)':>17}")
+    for name, convert in methods:
+        parse_seconds = measure(convert, records, args.repeat)
+        frame_seconds = measure(
+            lambda items: pd.DataFrame(convert(items)), records, args.repeat
+        )
+        print(f"{name:<12}{len(records):>10}{parse_seconds:>12.3f}{frame_seconds:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
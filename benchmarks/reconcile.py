@@ -0,0 +1,204 @@
+"""
+Benchmark da análise de alterações da conciliação (`DP_MODBUS_IP`).
+
+Popula um banco SQLite temporário com N datapoints e compara, para uma entrada
+com uma fração de linhas novas, alteradas e removidas:
+    - o método antigo: `SELECT *`, conversão de tipos coluna a coluna e `merge`
+      externo por todas as colunas (reproduzido em `legacy_analyze`);
+    - o diff por hash (`row_hash.py`), lendo a tabela para calcular os hashes;
+    - o diff por hash com a tabela auxiliar de hashes (`RowHashStore`), que lê
+      do banco só os pares (chave, hash).
+
+Em seguida mede a gravação das atualizações de todos os N datapoints: o laço
+antigo (`iterrows` + um `UPDATE` por linha, com conversões célula a célula) e o
+caminho atual (tipos convertidos uma vez por coluna e um `executemany`) e a
+remoção de todos eles: `DELETE ... IN ("a","b",...)` montado como texto (antigo)
+x `DELETE ... IN (?, ...)` parametrizado em lotes, por `executemany`.
+
+Uso:
+    PYTHONPATH=$(pwd) python -m benchmarks.reconcile
+    PYTHONPATH=$(pwd) python -m benchmarks.reconcile --rows 200000 --changed 0.05
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from app.reconcile2.core.db_connection import DatabaseConnection
+from app.reconcile2.core.row_hash import RowHashStore
+from app.reconcile2.domain.modbus_sync import DpModbusDataSynchronizer
+from app.reconcile2.main import create_modbus_schema
+
+
+def build_datapoints(count: int, seed: int = 0) -> pd.DataFrame:
+    """Datapoints sintéticos com as colunas de `DP_MODBUS_IP`."""
+    rng = random.Random(seed)
+    return pd.DataFrame(
+        {
+            "xid_sensor": [f"RMB-{i}" for i in range(count)],
+            "xid_equip": [f"SMB-{i // 50}" for i in range(count)],
+            "range": ["HOLDING_REGISTER"] * count,
+            "modbusDataType": ["TWO_BYTE_INT_UNSIGNED"] * count,
+            "additive": [0] * count,
+            "offset": [rng.randint(0, 5000) for _ in range(count)],
+            "bit": [rng.randint(0, 15) for _ in range(count)],
+            "multiplier": [rng.choice([1.0, 0.1, 0.01]) for _ in range(count)],
+            "slaveId": [rng.randint(1, 10) for _ in range(count)],
+            "enabled": [True] * count,
+            "nome": [f"Registrador {i}" for i in range(count)],
+            "tipo": ["Tipo 02"] * count,
+            "classificacao": ["TEM01"] * count,
+        }
+    )
+
+
+def mutate(df: pd.DataFrame, fraction: float, seed: int = 1) -> pd.DataFrame:
+    """Altera, remove e acrescenta `fraction` das linhas (cada)."""
+    rng = random.Random(seed)
+    count = int(len(df) * fraction)
+    df = df.copy()
+    changed = rng.sample(range(len(df)), 2 * count)
+    df.loc[changed[:count], "offset"] += 1
+    df = df.drop(index=changed[count:])
+    extra = build_datapoints(count, seed).assign(
+        xid_sensor=[f"RMB-novo-{i}" for i in range(count)]
+    )
+    return pd.concat([df, extra], ignore_index=True)
+
+
+def legacy_analyze(df: pd.DataFrame, existing: pd.DataFrame, key: str) -> dict:
+    """Análise antiga: conversão de tipos e `merge(indicator=True)` por todas as colunas."""
+    df = df[existing.columns]
+    new = df[~df[key].isin(existing[key])]
+    common = df[df[key].isin(existing[key])]
+    remove = set(existing[key]) - set(df[key])
+    for column in common.columns:
+        if common[column].dtype != existing[column].dtype:
+            try:
+                existing[column] = existing[column].astype(common[column].dtype)
+            except ValueError:
+                common[column] = common[column].astype(str)
+                existing[column] = existing[column].astype(str)
+    merged = existing.merge(common, indicator=True, how="outer")
+    update = merged[merged["_merge"] == "right_only"].drop("_merge", axis=1)
+    return {"new": new, "update": update, "remove": remove}
+
+
+def legacy_update(db: DatabaseConnection, table_name: str, records: pd.DataFrame):
+    """Atualização antiga de `DpModbusDataSynchronizer`: um UPDATE por linha."""
+    for _, row in records.iterrows():
+        update_query = f"""
+            UPDATE {table_name} SET
+                xid_equip = ?, range = ?, modbusDataType = ?, additive = ?,
+                offset = ?, bit = ?, multiplier = ?, slaveId = ?, enabled = ?,
+                nome = ?, tipo = ?, classificacao = ?
+            WHERE xid_sensor = ?
+        """
+        values = (
+            str(row["xid_equip"]),
+            str(row["range"]),
+            str(row["modbusDataType"]),
+            int(row["additive"]) if pd.notnull(row["additive"]) else None,
+            int(row["offset"]) if pd.notnull(row["offset"]) else None,
+            int(row["bit"]) if pd.notnull(row["bit"]) else None,
+            float(row["multiplier"]) if pd.notnull(row["multiplier"]) else None,
+            int(row["slaveId"]) if pd.notnull(row["slaveId"]) else None,
+            bool(row["enabled"]),
+            str(row["nome"]),
+            str(row["tipo"]),
+            str(row["classificacao"]),
+            str(row["xid_sensor"]),
+        )
+        db.execute(update_query, values)
+
+
+def legacy_remove(db: DatabaseConnection, table_name: str, key: str, ids: set):
+    """Remoção antiga: todas as chaves concatenadas no texto do DELETE."""
+    query = f"DELETE FROM {table_name} WHERE {key} IN (\"{'","'.join(map(str, ids))}\")"
+    db.execute(query)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--changed", type=float, default=0.01, help="fração alterada")
+    args = parser.parse_args(argv)
+
+    stored = build_datapoints(args.rows)
+    incoming = mutate(stored, args.changed)
+    schema = create_modbus_schema()
+    sync = DpModbusDataSynchronizer()
+    key = sync.primary_key
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseConnection(os.path.join(tmp, "middleware.db")) as db:
+            schema.initialize(db)
+            stored.to_sql(
+                schema.table_name, db.connection, if_exists="append", index=False
+            )
+
+            def legacy():
+                existing = sync._get_existing_data(db)
+                return legacy_analyze(incoming.copy(), existing, key)
+
+            def hashed(store):
+                sync.hash_store = store
+                return sync._analyze_changes(incoming.copy(), db)
+
+            store = RowHashStore()
+            hashed(store)  # primeira execução: calcula e persiste os hashes
+            methods = (
+                ("merge (antigo)", legacy),
+                ("hash", lambda: hashed(None)),
+                ("hash + tabela auxiliar", lambda: hashed(store)),
+            )
+            print(
+                f"{'método':<24}{'linhas':>9}{'tempo (s)':>11}{'novos':>8}"
+                f"{'alterados':>11}{'removidos':>11}"
+            )
+            for name, analyze in methods:
+                start = time.perf_counter()
+                changes = analyze()
+                seconds = time.perf_counter() - start
+                print(
+                    f"{name:<24}{len(incoming):>9}{seconds:>11.3f}"
+                    f"{len(changes['new']):>8}{len(changes['update']):>11}"
+                    f"{len(changes['remove']):>11}"
+                )
+
+            updates = stored.assign(offset=stored["offset"] + 1)
+            table = schema.table_name
+            methods = (
+                (
+                    "UPDATE por linha (antigo)",
+                    lambda: legacy_update(db, table, updates),
+                ),
+                ("executemany", lambda: sync._update_records(updates, db)),
+            )
+            print(f"\n{'atualização':<28}{'linhas':>9}{'tempo (s)':>11}")
+            for name, update in methods:
+                start = time.perf_counter()
+                update()
+                seconds = time.perf_counter() - start
+                print(f"{name:<28}{len(updates):>9}{seconds:>11.3f}")
+
+            ids = set(stored[key])
+            methods = (
+                ("IN montado como texto", lambda: legacy_remove(db, table, key, ids)),
+                ("IN (?, ...) em lotes", lambda: sync._remove_records(ids, db)),
+            )
+            print(f"\n{'remoção':<28}{'linhas':>9}{'tempo (s)':>11}")
+            for name, remove in methods:
+                sync._insert_records(stored, db)
+                start = time.perf_counter()
+                remove()
+                seconds = time.perf_counter() - start
+                print(f"{name:<28}{len(ids):>9}{seconds:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
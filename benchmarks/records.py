@@ -0,0 +1,150 @@
+"""
+Benchmark da representação em memória dos registros coletados.
+
+Simula a coleta de uma frota sintética (gateways × hardwares × sensores ×
+registros Modbus) e compara o pico de memória (RSS) de:
+    - dicionários: um dict parseado por registro (`registers_modbus`) e outro
+      achatado com gateway, hardware e sensor (`flat_modbus`), como a coleta fazia;
+    - compacta: tuplas em `RecordBatch` com textos repetidos compartilhados e o
+      prefixo dos ancestrais uma única vez por sensor (`RecordList`).
+
+Cada representação roda em um processo separado, para que o pico de RSS de uma
+não contamine a outra.
+
+Uso:
+    PYTHONPATH=$(pwd) python -m benchmarks.records
+    PYTHONPATH=$(pwd) python -m benchmarks.records --gateways 4 --registers 200
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from app.collector.records import RecordBatch, RecordList
+from app.getters.gateway import parse_gateway_data
+from app.getters.hardware import parse_hardware_data
+from app.getters.register import REGISTER_MODBUS_FIELDS, parse_register_modbus_data
+from app.getters.sensors import parse_sensor_modbus_data
+
+# níveis do registro da API que descrevem o sensor, o tipo de registro etc. e se
+# repetem em todos os registros de um mesmo sensor
+UNIQUE_KEYS = {"id", "createdAt", "updatedAt", "name", "address", "description"}
+
+
+def raw_register(sensor: str, index: int) -> dict:
+    """Registro como a API o retorna: textos novos a cada registro (decodificação JSON)."""
+    record = {}
+    for field in REGISTER_MODBUS_FIELDS:
+        keys = field.keys
+        node = record
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+        if len(keys) == 1 and keys[0] in UNIQUE_KEYS:
+            node[keys[-1]] = f"{sensor}.{index}.{keys[-1]}"
+        elif field.transform is not None:
+            node[keys[-1]] = [{"name": "fase", "value": f"{index % 3}"}]
+        else:
+            node[keys[-1]] = f"{sensor}:{'.'.join(keys)}"
+    return record
+
+
+def iter_fleet(gateways: int, hardwares: int, sensors: int):
+    """Ancestrais (gateway, hardware e sensor parseados) de cada sensor da frota."""
+    for g in range(gateways):
+        gateway = parse_gateway_data({"id": f"GW{g}", "name": f"Gateway {g}"})
+        for h in range(hardwares):
+            hardware = parse_hardware_data({"id": f"HW{g}.{h}", "name": f"HW {h}"})
+            for s in range(sensors):
+                sensor_id = f"S{g}.{h}.{s}"
+                sensor = parse_sensor_modbus_data({"id": sensor_id, "name": sensor_id})
+                yield sensor_id, [gateway, hardware, sensor]
+
+
+def merge_parents(parents: list) -> dict:
+    """Prefixo dos ancestrais; em chaves repetidas prevalece o mais próximo."""
+    prefix = {}
+    for parent in parents:
+        prefix.update(parent)
+    return prefix
+
+
+def collect_dicts(args) -> int:
+    registers_modbus, flat_modbus = [], []
+    for sensor_id, parents in iter_fleet(args.gateways, args.hardwares, args.sensors):
+        registers = [
+            parse_register_modbus_data(raw_register(sensor_id, r))
+            for r in range(args.registers)
+        ]
+        prefix = merge_parents(parents)
+        registers_modbus += registers
+        flat_modbus += [{**prefix, **register} for register in registers]
+    return len(flat_modbus)
+
+
+def collect_compact(args) -> int:
+    registers_modbus, flat_modbus = RecordList(), RecordList()
+    for sensor_id, parents in iter_fleet(args.gateways, args.hardwares, args.sensors):
+        registers = RecordBatch.compact(
+            parse_register_modbus_data.columns,
+            [
+                parse_register_modbus_data.row(raw_register(sensor_id, r))
+                for r in range(args.registers)
+            ],
+        )
+        registers_modbus += registers
+        flat_modbus += registers.with_prefix(merge_parents(parents))
+    return len(flat_modbus)
+
+
+METHODS = {"dicionários": collect_dicts, "compacta": collect_compact}
+
+
+def run_method(name: str, args) -> dict:
+    """Coleta no processo atual e retorna registros, tempo e pico de RSS."""
+    start = time.perf_counter()
+    rows = METHODS[name](args)
+    seconds = time.perf_counter() - start
+    # ru_maxrss em KiB no Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"rows": rows, "seconds": seconds, "peak_mb": peak}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--gateways", type=int, default=2)
+    parser.add_argument("--hardwares", type=int, default=10, help="hardwares por gateway")
+    parser.add_argument("--sensors", type=int, default=50, help="sensores por hardware")
+    parser.add_argument("--registers", type=int, default=100, help="registros por sensor")
+    parser.add_argument("--only", choices=METHODS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.only:
+        print(json.dumps(run_method(args.only, args)))
+        return
+
+    sizes = [
+        f"--gateways={args.gateways}",
+        f"--hardwares={args.hardwares}",
+        f"--sensors={args.sensors}",
+        f"--registers={args.registers}",
+    ]
+    print(f"{'representação':<16}{'registros':>10}{'tempo (s)':>12}{'pico RSS (MB)':>16}")
+    for name in METHODS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.records", f"--only={name}", *sizes],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        stats = json.loads(output)
+        print(
+            f"{name:<16}{stats['rows']:>10}{stats['seconds']:>12.2f}"
+            f"{stats['peak_mb']:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import pytest
 import pytest_asyncio
 
 from app.login import get_auth_token
+from app.utils.circuit_breaker import reset_breakers
 
 gateways = [{'id': 'DA5F3154-FBEE-EF11-88FB-6045BDFE79DC', 'name': 'Gateway 01', 'ip': '100.201.0.5', 'active': True, 'substation': {'id': '833440DD-F2EE-EF11-88FB-6045BDFE79DC', 'name': 'Taubaté', 'active': True, 'sapAbbreviation': 'TAU'}}, {'id': '748E9B67-80EF-EF11-88FB-6045BDFE79DC', 'name': 'Gateway 2', 'ip': '100.200.0.10', 'active': True, 'substation': {'id': '853440DD-F2EE-EF11-88FB-6045BDFE79DC', 'name': 'Manguaguá', 'active': True, 'sapAbbreviation': 'MGG'}}, {'id': 'FDF15BCA-B9EF-EF11-88FB-6045BDFE79DC', 'name': 'Gateway 3', 'ip': '192.152.45.26', 'active': True, 'substation': {'id': '843440DD-F2EE-EF11-88FB-6045BDFE79DC', 'name': 'São Carlos', 'active': True, 'sapAbbreviation': 'SCL'}}]
 
@@ -587,3 +588,11 @@ async def auth_token():
         return await get_auth_token(host, username, password)
     except Exception as e:
         pytest.fail(f"Erro ao obter token: {e}")
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Isola os disjuntores (estado global por serviço) entre os testes."""
+    reset_breakers()
+    yield
+    reset_breakers()
@@ -0,0 +1,152 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.reconcile2.core.bulk_writer import (
+    coerce_columns,
+    delete_keys,
+    fetch_keys,
+    sql_rows,
+    upsert_dataframe,
+)
+from app.reconcile2.core.db_connection import DatabaseConnection
+from app.reconcile2.domain.modbus_sync import DpModbusDataSynchronizer
+from app.reconcile2.domain.tags_sync import DpTagsDataSynchronizer
+from app.reconcile2.main import create_dp_tags_schema, create_modbus_schema
+
+TAGS = pd.DataFrame(
+    {
+        "id": ["1", "2", "3"],
+        "xid_sensor": ["S1", "S1", "S2"],
+        "nome": ["a", "b", "c"],
+        "valor": ["x", "y", "z"],
+    }
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    with DatabaseConnection(str(tmp_path / "middleware.db")) as db:
+        create_dp_tags_schema().initialize(db)
+        db.execute('CREATE INDEX "ix_DP_TAGS_nome" ON "DP_TAGS" (nome)')
+        yield db
+
+
+def _table(db):
+    return db.fetch_dataframe("SELECT * FROM DP_TAGS ORDER BY id")
+
+
+def test_sql_rows_converts_to_native_types():
+    df = pd.DataFrame({"i": [1, 2], "f": [1.5, np.nan], "b": [True, False]})
+    rows = list(sql_rows(df))
+    assert rows == [(1, 1.5, True), (2, None, False)]
+    assert type(rows[0][0]) is int
+
+
+def test_upsert_inserts_and_updates_in_place(db):
+    assert upsert_dataframe(db, "DP_TAGS", TAGS, "id", chunk_size=2) == 3
+    changed = TAGS.iloc[[1]].assign(valor="novo")
+    upsert_dataframe(db, "DP_TAGS", changed, "id")
+
+    table = _table(db)
+    assert table["valor"].tolist() == ["x", "novo", "z"]
+    # esquema, chave primária e índices preservados
+    db.execute("SELECT name FROM sqlite_master WHERE tbl_name = 'DP_TAGS'")
+    assert "ix_DP_TAGS_nome" in {row[0] for row in db.cursor.fetchall()}
+    with pytest.raises(sqlite3.IntegrityError):
+        db.execute("INSERT INTO DP_TAGS (id) VALUES ('1')")
+
+
+def test_upsert_is_atomic(db):
+    upsert_dataframe(db, "DP_TAGS", TAGS, "id")
+    broken = TAGS.assign(valor="w")
+    broken.loc[2, "id"] = None  # viola o NOT NULL da chave no último lote
+    with pytest.raises(sqlite3.IntegrityError):
+        upsert_dataframe(db, "DP_TAGS", broken, "id", chunk_size=1)
+    assert _table(db)["valor"].tolist() == ["x", "y", "z"]
+
+
+def test_upsert_on_table_without_primary_key(tmp_path):
+    with DatabaseConnection(str(tmp_path / "legado.db")) as db:
+        # tabela recriada pelo antigo to_sql(if_exists="replace"), sem PK
+        TAGS.to_sql("DP_TAGS", db.connection, index=False)
+        upsert_dataframe(db, "DP_TAGS", TAGS.iloc[[0]].assign(valor="novo"), "id")
+        assert _table(db)["valor"].tolist() == ["novo", "y", "z"]
+
+
+def test_tags_synchronizer_updates_without_replacing_table(db):
+    sync = DpTagsDataSynchronizer()
+    sync.synchronize(TAGS.copy(), db)
+    sync.synchronize(TAGS.assign(valor=["x", "y", "novo"]), db)
+    assert _table(db)["valor"].tolist() == ["x", "y", "novo"]
+
+
+def test_coerce_columns_converts_whole_columns():
+    df = pd.DataFrame(
+        {
+            "s": ["a", None, 3],
+            "i": [1.7, None, "2"],
+            "f": ["1.5", None, 2],
+            "b": [1, None, 0],
+        }
+    )
+    typed = coerce_columns(df, {"i": int, "s": str, "f": float, "b": bool})
+    assert list(typed.columns) == ["i", "s", "f", "b"]
+    rows = list(sql_rows(typed))
+    assert rows == [
+        (1, "a", 1.5, True),
+        (None, None, None, False),
+        (2, "3", 2.0, False),
+    ]
+    assert type(rows[0][0]) is int
+
+
+def test_dp_modbus_updates_with_executemany(tmp_path):
+    stored = pd.DataFrame(
+        {
+            "xid_sensor": ["R1", "R2"],
+            "xid_equip": ["S1", "S1"],
+            "offset": [1, 2],
+            "multiplier": [1.0, 1.0],
+            "enabled": [True, True],
+        }
+    )
+    with DatabaseConnection(str(tmp_path / "middleware.db")) as db:
+        create_modbus_schema().initialize(db)
+        stored.to_sql("DP_MODBUS_IP", db.connection, if_exists="append", index=False)
+        sync = DpModbusDataSynchronizer()
+        columns = list(sync.UPDATE_TYPES)
+        updates = pd.DataFrame(
+            [
+                {"xid_sensor": "R2", "xid_equip": "S2", "offset": "7", "enabled": None},
+                {"xid_sensor": "R9", "xid_equip": "S9"},  # inexistente: ignorado
+            ]
+        ).reindex(columns=columns)
+        sync._update_records(updates, db)
+        table = db.fetch_dataframe("SELECT * FROM DP_MODBUS_IP ORDER BY xid_sensor")
+
+    assert table["xid_sensor"].tolist() == ["R1", "R2"]
+    r2 = table.iloc[1]
+    assert (r2["xid_equip"], r2["offset"], r2["enabled"]) == ("S2", 7, 0)
+    assert pd.isna(r2["multiplier"]) and r2["nome"] is None
+
+
+def test_delete_keys_in_bounded_chunks(db):
+    many = pd.DataFrame({"id": [str(i) for i in range(40000)], "nome": "n"})
+    upsert_dataframe(db, "DP_TAGS", many, "id")
+    # mais chaves que o limite de variáveis do SQLite, com aspas e chaves inexistentes
+    stale = {str(i) for i in range(0, 40000, 2)} | {'x") OR ("1"="1', "nao-existe"}
+    assert delete_keys(db, "DP_TAGS", "id", stale) == 20000
+    assert len(_table(db)) == 20000
+    rows = fetch_keys(db, "DP_TAGS", "id", ["1", "2", "3"], chunk_size=2)
+    assert rows["id"].tolist() == ["1", "3"]
+    assert list(fetch_keys(db, "DP_TAGS", "id", [])) == list(TAGS)
+
+
+def test_tags_synchronizer_removes_stale_tags(db):
+    sync = DpTagsDataSynchronizer()
+    sync.synchronize(TAGS.copy(), db)
+    sync.synchronize(TAGS.iloc[[1]].copy(), db)
+    assert _table(db)["id"].tolist() == ["2"]
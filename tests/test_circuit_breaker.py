@@ -0,0 +1,173 @@
+import asyncio
+
+import pycurl
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app import scadalts
+from app.utils import circuit_breaker
+from app.utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    breaker_for,
+    get_breaker,
+)
+from app.utils.http_utils import fetch_with_retry
+from app.utils.retry import RetryPolicy
+
+
+def test_opens_after_consecutive_failures_and_recovers():
+    events = []
+    circuit_breaker.add_listener(lambda *event: events.append(event))
+    try:
+        breaker = CircuitBreaker("api", failure_threshold=3, recovery_timeout=0)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        # falhas intercaladas com sucesso não abrem o circuito
+        assert breaker.state == CLOSED
+
+        breaker.record_failure()
+        # recovery_timeout=0: a próxima consulta já passa a semiaberto
+        assert breaker.state == HALF_OPEN
+        assert events == [("api", CLOSED, OPEN), ("api", OPEN, HALF_OPEN)]
+
+        # semiaberto: uma única chamada de teste
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert events[-1] == ("api", HALF_OPEN, CLOSED)
+    finally:
+        circuit_breaker._listeners.clear()
+
+
+def test_open_circuit_rejects_until_recovery_timeout():
+    breaker = CircuitBreaker("api", failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call()
+    assert isinstance(error.value, ConnectionError)
+    assert 0 < error.value.retry_in <= 60
+    assert breaker.rejected == 1
+
+
+def test_failed_trial_call_reopens_circuit():
+    breaker = CircuitBreaker("api", failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.recovery_timeout = 60
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_fetch_with_retry_short_circuits_unhealthy_service():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        return web.json_response({}, status=503)
+
+    app = web.Application()
+    app.router.add_get("/items", handler)
+    server = TestServer(app)
+    await server.start_server()
+    url = str(server.make_url("/items"))
+    breaker = breaker_for(url)
+    breaker.failure_threshold = 2
+    policy = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+    try:
+        with pytest.raises(CircuitOpenError):
+            await fetch_with_retry(url=url, headers={}, retry_policy=policy)
+        with pytest.raises(CircuitOpenError):
+            await fetch_with_retry(url=url, headers={}, retry_policy=policy)
+    finally:
+        await server.close()
+
+    # a terceira tentativa e a segunda chamada não chegam ao serviço
+    assert len(calls) == 2
+    assert breaker.rejected == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_request_releases_half_open_slot():
+    started = asyncio.Event()
+
+    async def handler(request):
+        started.set()
+        await asyncio.sleep(10)
+
+    app = web.Application()
+    app.router.add_get("/items", handler)
+    server = TestServer(app)
+    await server.start_server()
+    url = str(server.make_url("/items"))
+    breaker = breaker_for(url)
+    breaker.failure_threshold = 1
+    breaker.recovery_timeout = 0
+    breaker.record_failure()
+    try:
+        task = asyncio.create_task(fetch_with_retry(url=url, headers={}))
+        await asyncio.wait_for(started.wait(), timeout=1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    finally:
+        await server.close()
+
+    breaker.recovery_timeout = 60
+    assert breaker.before_call() is not None  # teste do semiaberto liberado
+
+
+class FailingCurl:
+    def __init__(self):
+        self.performed = 0
+
+    def perform(self):
+        self.performed += 1
+        raise pycurl.error(7, "Failed to connect")
+
+
+def test_scadalts_calls_share_breaker():
+    breaker = get_breaker(scadalts.SCADALTS_BREAKER)
+    breaker.failure_threshold = 2
+    curl = FailingCurl()
+    for _ in range(2):
+        with pytest.raises(pycurl.error):
+            scadalts._perform(curl)
+
+    with pytest.raises(CircuitOpenError):
+        scadalts._perform(curl)
+    assert curl.performed == 2
+
+
+class InterruptedCurl:
+    def perform(self):
+        raise KeyboardInterrupt
+
+
+def test_interrupted_trial_call_releases_half_open_slot():
+    breaker = get_breaker(scadalts.SCADALTS_BREAKER)
+    breaker.failure_threshold = 1
+    breaker.recovery_timeout = 0
+    with pytest.raises(pycurl.error):
+        scadalts._perform(FailingCurl())
+    assert breaker.state == HALF_OPEN
+
+    with pytest.raises(KeyboardInterrupt):
+        scadalts._perform(InterruptedCurl())
+    # a vaga de teste foi devolvida: a próxima chamada ainda pode testar o serviço
+    breaker.recovery_timeout = 60
+    trial = breaker.before_call()
+    assert trial is not None and breaker.state == HALF_OPEN
+    # devolução depois de um resultado registrado não tem efeito
+    breaker.record_success()
+    breaker.release_trial(trial)
+    assert breaker.state == CLOSED
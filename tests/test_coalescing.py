@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from aioresponses import aioresponses
+
+from app.collector.crawler import CmaWebCrawler
+from app.utils.coalescing import RequestCoalescer, current_coalescer
+from tests.test_collector import HOST, FakeApi, FakeConfigs
+
+
+class CountingFetch:
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def test_key_ignores_param_order():
+    key = RequestCoalescer.key
+    assert key("GET", "u", {"a": 1, "b": 2}) == key("GET", "u", {"b": 2, "a": 1})
+    assert key("GET", "u") != key("GET", "u", {"a": 1})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_fetch():
+    coalescer = RequestCoalescer()
+    fetch = CountingFetch({"id": "HW1"})
+
+    results = await asyncio.gather(*(coalescer.run("k", fetch) for _ in range(5)))
+
+    assert fetch.calls == 1
+    assert all(result is results[0] for result in results)
+    assert coalescer.stats.coalesced == 4
+    # sem memorização: a próxima chamada vai à API de novo
+    await coalescer.run("k", fetch)
+    assert fetch.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_memoized_response_is_reused_for_the_run():
+    coalescer = RequestCoalescer()
+    fetch = CountingFetch({"id": "GW1"})
+    await coalescer.run("k", fetch, memoize=True)
+    await coalescer.run("k", fetch, memoize=True)
+    assert fetch.calls == 1
+    assert coalescer.stats.memo_hits == 1
+    assert coalescer.stats.deduplicated == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_memoized():
+    coalescer = RequestCoalescer()
+    fetch = CountingFetch(error=ValueError("falhou"))
+    results = await asyncio.gather(
+        *(coalescer.run("k", fetch, memoize=True) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert fetch.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+    fetch.error = None
+    assert await coalescer.run("k", fetch, memoize=True) is None
+    assert fetch.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_others():
+    coalescer = RequestCoalescer()
+    fetch = CountingFetch("ok")
+    first = asyncio.create_task(coalescer.run("k", fetch))
+    second = asyncio.create_task(coalescer.run("k", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "ok"
+    assert fetch.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_crawler_deduplicates_repeated_gateway():
+    api = FakeApi(latency=0.01)
+    crawler = CmaWebCrawler(FakeConfigs())
+    gateway = {"id": "GW1", "name": "Gateway 01"}
+    with aioresponses() as m:
+        api.mock(m)
+        result = await crawler.crawl([gateway, gateway])
+
+    assert current_coalescer() is None
+    # o mesmo gateway duas vezes: detalhes de referência buscados uma única vez
+    for path in ("/cma-gateways/GW1", "/hardwares/HW1", "/sensors-modbus/MB1"):
+        assert api.calls.count(f"{HOST}{path}") == 1
+    assert crawler.coalescer.stats.deduplicated > 0
+    assert len(result.flat_data) == 16
@@ -0,0 +1,354 @@
+import asyncio
+import re
+import sqlite3
+
+import pytest
+from aioresponses import CallbackResult, aioresponses
+
+from app.collect_cma_web import select_gateways
+from app.collector.checkpoint import CheckpointJournal
+from app.collector.crawler import CmaWebCrawler, CollectionResult
+from app.utils.fair_budget import FairBudget
+from app.collector.field_requirements import has_paths, required_paths
+from app.collector.watermarks import WatermarkStore
+from app.getters.hardware import parse_hardware_data
+
+HOST = "http://cma.test"
+
+
+class FakeConfigs:
+    host = HOST
+    DEBUG = False
+    MAX_PAGE_SIZE = 9999
+    PAGE_PREFETCH = 2
+    MAX_PARALLEL_REQUESTS = 3
+    MAX_ADAPTIVE_REQUESTS = 12
+    ADAPTIVE_CONCURRENCY = False
+    LIST_ONLY = False
+
+    @property
+    async def auth_token(self):
+        return "token"
+
+
+def _page(content, page=0, size=None):
+    size = int(size or 10)
+    page = int(page or 0)
+    total_pages = max(1, -(-len(content) // size))
+    return {
+        "content": content[page * size : (page + 1) * size],
+        "totalPages": total_pages,
+        "last": page + 1 >= total_pages,
+        "number": page,
+    }
+
+
+class FakeApi:
+    """API CMA Web em memória: 1 gateway, 2 hardwares, 1 sensor modbus e 1 dnp3 por hardware."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = []
+        self.failing = set()
+        self.entities = {"/cma-gateways/GW1": {"id": "GW1", "name": "Gateway 01"}}
+        self.lists = {"/hardwares/all": [{"id": f"HW{h}", "name": f"HW {h}"} for h in (1, 2)]}
+        for h in (1, 2):
+            self.entities[f"/hardwares/HW{h}"] = {"id": f"HW{h}", "name": f"HW {h}"}
+            for kind, path in (("MB", "sensors-modbus"), ("DNP", "sensors-dnp")):
+                sensor = {"id": f"{kind}{h}", "name": f"{kind} {h}"}
+                self.entities[f"/{path}/{kind}{h}"] = sensor
+                self.lists[(f"/{path}", f"HW{h}")] = [sensor]
+            for kind, path in (("MB", "registers-modbus"), ("DNP", "registers-dnp")):
+                registers = [{"id": f"R{kind}{h}{r}", "name": f"reg {r}"} for r in (1, 2)]
+                self.lists[(f"/{path}", f"{kind}{h}")] = registers
+                for register in registers:
+                    self.entities[f"/{path}/{register['id']}"] = register
+
+    async def callback(self, url, **kwargs):
+        index = len(self.calls)
+        self.calls.append(str(url))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            path = url.path
+            params = kwargs.get("params") or {}
+            if path in self.failing:
+                return CallbackResult(status=500)
+            if path == "/hardwares/all":
+                return CallbackResult(payload=self.lists[path])
+            parent = (
+                params.get("hardwareId")
+                or params.get("sensorModbusId")
+                or params.get("sensorDnpId")
+            )
+            if parent:
+                self.calls[index] = (path, parent, params.get("page"))
+                return CallbackResult(
+                    payload=_page(
+                        self.lists[(path, parent)], params.get("page"), params.get("size")
+                    )
+                )
+            return CallbackResult(payload=self.entities[path])
+        finally:
+            self.in_flight -= 1
+
+    def mock(self, m):
+        m.get(re.compile(rf"^{re.escape(HOST)}/.*$"), callback=self.callback, repeat=True)
+
+
+@pytest.mark.asyncio
+async def test_crawler_collects_whole_tree():
+    api = FakeApi()
+    crawler = CmaWebCrawler(FakeConfigs())
+    with aioresponses() as m:
+        api.mock(m)
+        result = await crawler.crawl([{"id": "GW1", "name": "Gateway 01"}])
+
+    assert len(result.gateways) == 1
+    assert [hw["id"] for hw in result.hardwares] == ["HW1", "HW2"]
+    assert len(result.flat_modbus) == 4
+    assert len(result.flat_dnp3) == 4
+    modbus_row = result.flat_modbus[0]
+    assert modbus_row["id_gtw"] == "GW1"
+    assert modbus_row["id_hdw"] == "HW1"
+    assert modbus_row["id_sen"] == "MB1"
+    assert modbus_row["id_reg_mod"] == "RMB11"
+    # registros DNP3 combinados com o próprio sensor DNP3
+    dnp_row = result.flat_dnp3[0]
+    assert dnp_row["id_sen_dnp3"] == "DNP1"
+    assert dnp_row["id_reg_dnp3"] == "RDNP11"
+    assert result.flat_data == result.flat_modbus + result.flat_dnp3
+
+
+@pytest.mark.asyncio
+async def test_crawler_reads_every_page():
+    configs = FakeConfigs()
+    configs.MAX_PAGE_SIZE = 1
+    api = FakeApi()
+    with aioresponses() as m:
+        api.mock(m)
+        result = await CmaWebCrawler(configs).crawl([{"id": "GW1", "name": "Gateway 01"}])
+
+    assert [r["id_reg_mod"] for r in result.registers_modbus] == ["RMB11", "RMB12", "RMB21", "RMB22"]
+    assert ("/registers-modbus", "MB1", 1) in api.calls
+
+
+@pytest.mark.asyncio
+async def test_crawler_respects_global_budget():
+    api = FakeApi(latency=0.01)
+    crawler = CmaWebCrawler(FakeConfigs(), max_parallel_requests=3)
+    with aioresponses() as m:
+        api.mock(m)
+        await crawler.crawl([{"id": "GW1", "name": "Gateway 01"}])
+
+    assert api.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_crawler_debug_limits_each_level():
+    configs = FakeConfigs()
+    configs.DEBUG = True
+    api = FakeApi()
+    with aioresponses() as m:
+        api.mock(m)
+        result = await CmaWebCrawler(configs).crawl([{"id": "GW1", "name": "Gateway 01"}])
+
+    assert [hw["id"] for hw in result.hardwares] == ["HW1"]
+    assert len(result.sensors_modbus) == 1
+    assert len(result.sensors_dnp3) == 1
+
+
+@pytest.mark.asyncio
+async def test_fair_budget_round_robin_between_keys():
+    budget = FairBudget(1)
+    order = []
+
+    async def worker(key):
+        async with budget.slot(key):
+            order.append(key)
+            await asyncio.sleep(0)
+
+    # gateway grande enfileira muitas requisições antes do pequeno
+    tasks = [asyncio.create_task(worker("big")) for _ in range(10)]
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(worker("small")) for _ in range(2)]
+    await asyncio.gather(*tasks)
+
+    # sem rodízio o gateway pequeno só seria atendido após as 10 requisições do grande
+    assert order.index("small") <= 3
+    assert order[:6].count("small") == 2
+    assert budget.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_fair_budget_cancelled_waiter_frees_queue():
+    budget = FairBudget(1)
+    await budget.acquire("a")
+    waiter = asyncio.create_task(budget.acquire("b"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    budget.release()
+    await asyncio.wait_for(budget.acquire("c"), timeout=1)
+    assert budget.in_use == 1
+
+
+def test_select_gateways_by_glob():
+    gateways = [{"id": "1", "name": "Gateway 01"}, {"id": "2", "name": "Gateway 2"}, {"id": "3", "name": "Outro"}]
+    assert [gw["id"] for gw in select_gateways(gateways, ["Gateway*"])] == ["1", "2"]
+    assert [gw["id"] for gw in select_gateways(gateways, ["Outro", "Gateway 2"])] == ["2", "3"]
+    assert len(select_gateways(gateways, None)) == 3
+
+
+@pytest.mark.asyncio
+async def test_crawl_each_yields_one_result_per_gateway():
+    api = FakeApi()
+    api.entities["/cma-gateways/GW2"] = {"id": "GW2", "name": "Gateway 02"}
+    crawler = CmaWebCrawler(FakeConfigs())
+    gateways = [{"id": "GW1", "name": "Gateway 01"}, {"id": "GW2", "name": "Gateway 02"}]
+    with aioresponses() as m:
+        api.mock(m)
+        results = [result async for result in crawler.crawl_each(gateways)]
+
+    assert sorted(result.gateways[0]["id"] for result in results) == ["GW1", "GW2"]
+    assert all(len(result.gateways) == 1 for result in results)
+
+
+def _full_item(paths, **values):
+    """Monta um item contendo todos os caminhos exigidos por um parser."""
+    item = {}
+    for path in paths:
+        current = item
+        for key in path[:-1]:
+            current = current.setdefault(key, {})
+        current[path[-1]] = values.get(path[-1], f"{'.'.join(path)}-value")
+    return item
+
+
+def test_required_paths_and_has_paths():
+    paths = required_paths(parse_hardware_data)
+    assert ("cmaGateway", "ip") in paths
+    assert ("cmaGateway",) not in paths
+    assert has_paths(_full_item(paths), paths)
+    assert not has_paths({"id": "HW1", "name": "HW 1"}, paths)
+    item = _full_item(paths)
+    item["cmaGateway"] = None
+    assert has_paths(item, paths)
+
+
+@pytest.mark.asyncio
+async def test_crawler_list_only_skips_sufficient_details():
+    api = FakeApi()
+    paths = CmaWebCrawler.REQUIRED_PATHS["register_modbus"]
+    full_registers = [_full_item(paths, id=f"RMB1{r}") for r in (1, 2)]
+    api.lists[("/registers-modbus", "MB1")] = full_registers
+    crawler = CmaWebCrawler(FakeConfigs(), list_only=True)
+    with aioresponses() as m:
+        api.mock(m)
+        result = await crawler.crawl([{"id": "GW1", "name": "Gateway 01"}])
+
+    assert not any("/registers-modbus/RMB1" in str(call) for call in api.calls)
+    assert any("/registers-modbus/RMB21" in str(call) for call in api.calls)
+    assert crawler.detail_stats.avoided["register_modbus"] == 2
+    assert crawler.detail_stats.fetched["register_modbus"] == 2
+    assert [r["id_reg_mod"] for r in result.registers_modbus][:2] == ["RMB11", "RMB12"]
+
+
+def _detail_calls(api):
+    return [call for call in api.calls if isinstance(call, str) and "?" not in call]
+
+
+@pytest.mark.asyncio
+async def test_crawler_incremental_refetches_only_changed(tmp_path):
+    api = FakeApi()
+    # mesmos objetos nas listagens e nos detalhes: updatedAt aparece em ambos
+    for entity in api.entities.values():
+        entity["updatedAt"] = "2024-01-01T00:00:00"
+    for hardware in api.lists["/hardwares/all"]:
+        hardware["updatedAt"] = "2024-01-01T00:00:00"
+    gateways = [dict(api.entities["/cma-gateways/GW1"])]
+    db_path = str(tmp_path / "watermarks.db")
+
+    async def run():
+        api.calls.clear()
+        with WatermarkStore(db_path) as store, aioresponses() as m:
+            api.mock(m)
+            crawler = CmaWebCrawler(FakeConfigs(), watermarks=store)
+            return await crawler.crawl(gateways), crawler
+
+    first, _ = await run()
+    assert len(_detail_calls(api)) == 15
+
+    second, crawler = await run()
+    assert _detail_calls(api) == []
+    assert crawler.detail_stats.total_avoided == 15
+    assert second.flat_data == first.flat_data
+
+    api.entities["/registers-modbus/RMB21"].update(
+        updatedAt="2024-02-01T00:00:00", name="reg alterado"
+    )
+    third, _ = await run()
+    assert _detail_calls(api) == [f"{HOST}/registers-modbus/RMB21"]
+    changed = [r for r in third.registers_modbus if r["id_reg_mod"] == "RMB21"]
+    assert changed[0]["name_reg_mod"] == "reg alterado"
+    assert len(third.flat_data) == len(first.flat_data)
+
+
+@pytest.mark.asyncio
+async def test_crawler_resumes_from_checkpoint(tmp_path):
+    gateways = [{"id": "GW1", "name": "Gateway 01"}]
+    api = FakeApi()
+    with aioresponses() as m:
+        api.mock(m)
+        expected = await CmaWebCrawler(FakeConfigs()).crawl(gateways)
+
+    api.calls.clear()
+    api.failing.add("/registers-dnp/RDNP22")
+    journal = CheckpointJournal(str(tmp_path / "checkpoint.db"))
+    with aioresponses() as m:
+        api.mock(m)
+        with pytest.raises(Exception):
+            await CmaWebCrawler(FakeConfigs(), journal=journal).crawl(gateways)
+        # deixa as subárvores irmãs em andamento terminarem
+        await asyncio.sleep(0.05)
+    # confirma o lote pendente, como o `close()` de uma execução interrompida
+    journal.commit()
+    marker = journal.load_marker("hardware", "HW1")
+    assert marker["hardware"]["id"] == "HW1"
+    # o marcador só lista os sensores; os registros ficam nos sensores do diário
+    assert all(kind.startswith("sensor_") for kind, _ in marker["sensors"])
+    assert "flat_modbus" not in marker
+    assert journal.load_marker("hardware", "HW2") is None
+
+    api.calls.clear()
+    api.failing.clear()
+    with aioresponses() as m:
+        api.mock(m)
+        result = await CmaWebCrawler(FakeConfigs(), journal=journal).crawl(gateways)
+
+    assert result.flat_data == expected.flat_data
+    assert not any("HW1" in str(call) or "MB1" in str(call) for call in api.calls)
+    assert f"{HOST}/registers-dnp/RDNP22" in api.calls
+    journal.close()
+
+
+def test_checkpoint_journal_commits_in_batches(tmp_path):
+    path = str(tmp_path / "checkpoint.db")
+    journal = CheckpointJournal(path, commit_every=2)
+    assert journal.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def committed():
+        with sqlite3.connect(path) as reader:
+            return reader.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+    journal.save("sensor_modbus", "MB1", CollectionResult())
+    assert committed() == 0
+    journal.save("sensor_modbus", "MB2", CollectionResult())
+    assert committed() == 2
+    journal.save_marker("hardware", "HW1", {"hardware": {}, "sensors": []})
+    journal.close()
+    assert committed() == 3
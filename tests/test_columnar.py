@@ -0,0 +1,113 @@
+import json
+import os
+
+import pytest
+
+from app.reconcile2.core.data_loader import (
+    JsonDataLoader,
+    ParquetDataLoader,
+    create_snapshot_loader,
+)
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from app.utils.columnar import ParquetSnapshotWriter, read_parquet, write_parquet
+
+RECORDS = [
+    {"id_sen": "MB1", "id_reg_mod": "R1", "multiplier": 1.5, "sen_mod_tags": "[]"},
+    {"id_sen": "MB1", "id_reg_mod": "R2", "multiplier": None, "sen_mod_tags": "[]"},
+    {"id_sen": "DNP1", "id_reg_dnp3": "D1", "tags": {"a": 1}},
+]
+
+
+def test_parquet_roundtrip_with_projection(tmp_path):
+    path = str(tmp_path / "data.parquet")
+    write_parquet(RECORDS, path)
+
+    df = read_parquet(path, columns=["id_reg_mod", "id_sen", "nao_existe"])
+    assert list(df.columns) == ["id_reg_mod", "id_sen"]
+    assert df["id_reg_mod"].tolist()[:2] == ["R1", "R2"]
+
+    full = read_parquet(path)
+    assert set(full.columns) == set().union(*RECORDS)
+    assert full["tags"].iloc[2] == {"a": 1}
+
+
+def test_snapshot_writer_unifies_batches(tmp_path):
+    path = str(tmp_path / "data.parquet")
+    writer = ParquetSnapshotWriter(path, batch_size=1)
+    writer.write_many(RECORDS)
+    writer.close()
+
+    df = read_parquet(path)
+    assert writer.count == len(df) == 3
+    assert df["id_reg_dnp3"].tolist()[2] == "D1"
+
+
+def test_snapshot_loader_prefers_fresh_parquet(tmp_path):
+    with open(tmp_path / "data.json", "w") as f:
+        json.dump(RECORDS, f)
+    assert isinstance(create_snapshot_loader(str(tmp_path)), JsonDataLoader)
+
+    write_parquet(RECORDS, str(tmp_path / "data.parquet"))
+    loader = create_snapshot_loader(str(tmp_path))
+    assert isinstance(loader, ParquetDataLoader)
+    assert list(loader.load(columns=["id_sen"]).columns) == ["id_sen"]
+
+    # data.json mais novo que o parquet (coleta sem --parquet): volta ao JSON
+    stat = os.stat(tmp_path / "data.parquet")
+    os.utime(tmp_path / "data.json", (stat.st_atime, stat.st_mtime + 10))
+    assert isinstance(create_snapshot_loader(str(tmp_path)), JsonDataLoader)
+
+
+def test_json_loader_projection_returns_independent_copies(tmp_path):
+    with open(tmp_path / "data.json", "w") as f:
+        json.dump(RECORDS, f)
+    loader = JsonDataLoader(str(tmp_path / "data.json"))
+
+    df = loader.load(columns=["id_sen", "id_reg_mod"])
+    df["id_sen"] = "alterado"
+    assert list(df.columns) == ["id_sen", "id_reg_mod"]
+    assert loader.load(columns=["id_sen"])["id_sen"].tolist() == ["MB1", "MB1", "DNP1"]
+    assert len(loader.load().columns) == 6
+
+
+def test_snapshot_writer_promotes_types_across_batches(tmp_path):
+    path = str(tmp_path / "data.parquet")
+    records = [{"id_reg_mod": "R1", "multiplier_reg_mod": 1, "bit_reg_mod": 1}] * 3
+    records += [{"id_reg_mod": "R2", "multiplier_reg_mod": 0.1, "bit_reg_mod": "x"}]
+    writer = ParquetSnapshotWriter(path, batch_size=3)
+    writer.write_many(records)
+    writer.close()
+
+    df = read_parquet(path)
+    assert df["multiplier_reg_mod"].tolist() == [1.0, 1.0, 1.0, 0.1]
+    # tipos incompatíveis entre lotes são gravados como texto
+    assert df["bit_reg_mod"].tolist() == ["1", "1", "1", "x"]
+
+
+def test_nested_fields_match_json_loader(tmp_path):
+    records = [
+        {"id_sen": "MB1", "tags": [{"name": "local", "value": "sala"}], "extra": None},
+        {"id_sen": "MB2", "tags": None, "extra": {"a": [1, 2]}},
+    ]
+    with open(tmp_path / "data.json", "w") as f:
+        json.dump(records, f)
+    write_parquet(records, str(tmp_path / "data.parquet"))
+
+    from_json = JsonDataLoader(str(tmp_path / "data.json")).load()
+    from_parquet = ParquetDataLoader(str(tmp_path / "data.parquet")).load()
+    assert from_parquet.to_dict("records") == from_json.to_dict("records")
+
+
+def test_snapshot_writer_keeps_one_batch_in_memory(tmp_path):
+    path = str(tmp_path / "data.parquet")
+    writer = ParquetSnapshotWriter(path, batch_size=2)
+    writer.write_many({"id_reg_mod": f"R{i}", "offset": i} for i in range(5))
+    assert len(writer._batch) == 1  # os lotes completos já estão em disco
+    writer.close()
+
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    assert read_parquet(path)["offset"].tolist() == [0, 1, 2, 3, 4]
+    # os arquivos temporários dos lotes são removidos
+    assert os.listdir(tmp_path) == ["data.parquet"]
@@ -0,0 +1,99 @@
+import json
+import sqlite3
+
+import pytest
+
+from app.reconcile2 import main
+from app.reconcile2.core.db_connection import RECONCILE_PRAGMAS, DatabaseConnection
+from app.reconcile2.domain import equipment_sync, modbus_sync
+from app.reconcile2.main import create_dp_tags_schema, reconcile_step
+
+
+def _count(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM DP_TAGS").fetchone()[0]
+
+
+def _session(path):
+    return DatabaseConnection(path, pragmas=RECONCILE_PRAGMAS, single_transaction=True)
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "middleware.db")
+    with DatabaseConnection(path) as db:
+        create_dp_tags_schema().initialize(db)
+    return path
+
+
+def test_session_applies_pragmas_and_reports_syncs(path):
+    with _session(path) as db:
+        assert db.journal_mode == "wal"
+        db.execute("PRAGMA synchronous")
+        assert db.cursor.fetchone()[0] == 1  # NORMAL
+        db.execute("PRAGMA temp_store")
+        assert db.cursor.fetchone()[0] == 2  # MEMORY
+        with reconcile_step(db, "dp_tags"):
+            db.execute("INSERT INTO DP_TAGS (id) VALUES ('1')")
+        # ainda não confirmado: outro leitor não vê a linha
+        assert _count(path) == 0
+    assert _count(path) == 1
+    assert (db.stats.commits, db.stats.checkpoints) == (1, 1)
+    assert "1 commits" in db.stats.summary()
+
+
+def test_failed_step_rolls_back_only_itself(path):
+    with _session(path) as db:
+        db.execute("INSERT INTO DP_TAGS (id) VALUES ('1')")
+        with pytest.raises(ValueError):
+            with reconcile_step(db, "dp_tags"):
+                db.execute("INSERT INTO DP_TAGS (id) VALUES ('2')")
+                raise ValueError("falha na etapa")
+    assert _count(path) == 1
+
+
+def test_session_is_atomic(path):
+    with pytest.raises(ValueError):
+        with _session(path) as db:
+            with reconcile_step(db, "gateways"):
+                db.execute("INSERT INTO DP_TAGS (id) VALUES ('1')")
+            raise ValueError("falha depois da primeira etapa")
+    assert _count(path) == 0
+
+
+def test_reconcile_skips_dnp3_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "sync_gateways", lambda db: None)
+    monkeypatch.setattr(main, "auth_ScadaLTS", lambda: None)
+    sent = []
+    for module in (equipment_sync, modbus_sync):
+        monkeypatch.setattr(
+            module, "send_to_scada", lambda df, import_function: sent.append(len(df))
+        )
+    columns = main.dp_modbus_columns() + main.eqp_modbus_columns()
+    modbus = dict.fromkeys(columns, 1)
+    modbus.update(
+        id_sen="SMB-1",
+        id_reg_mod="RMB-1",
+        multiplier_reg_mod=0.1,
+        sen_mod_tags=json.dumps([{"id": "T1", "name": "local", "value": "sala"}]),
+    )
+    # registrador DNP3 associado ao próprio sensor: sem as colunas Modbus
+    dnp3 = {"id_sen_dnp3": "SDNP-1", "id_reg_dnp3": "RDNP-1", "name_gtw": "GW"}
+    with open(tmp_path / "data.json", "w") as f:
+        json.dump([modbus, dnp3], f)
+
+    path = str(tmp_path / "middleware.db")
+    main.reconcile(path, str(tmp_path))
+    with sqlite3.connect(path) as conn:
+        tables = ("EQP_MODBUS_IP", "DP_MODBUS_IP", "EQP_TAGS", "DP_TAGS")
+        keys = {
+            table: [row[0] for row in conn.execute(f"SELECT * FROM {table}")]
+            for table in tables
+        }
+    assert keys == {
+        "EQP_MODBUS_IP": ["SMB-1"],
+        "DP_MODBUS_IP": ["RMB-1"],
+        "EQP_TAGS": ["T1"],
+        "DP_TAGS": ["T1"],
+    }
+    assert sent == [1, 1]
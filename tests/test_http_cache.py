@@ -0,0 +1,81 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.utils.http_cache import HttpCache, set_http_cache
+from app.utils.http_utils import fetch_with_retry
+
+
+def test_key_is_canonical():
+    assert HttpCache.key("http://api/x") == "http://api/x"
+    assert HttpCache.key("http://api/x", {"b": 2, "a": 1}) == HttpCache.key(
+        "http://api/x", {"a": 1, "b": 2}
+    )
+
+
+def test_store_lookup_and_eviction(tmp_path):
+    with HttpCache(str(tmp_path / "cache.db"), max_entries=2) as cache:
+        for index in range(3):
+            cache.store(f"k{index}", {"id": index}, etag=f'"v{index}"')
+        cached = cache.lookup("k0")
+        assert cached.body == {"id": 0}
+        assert cached.conditional_headers() == {"If-None-Match": '"v0"'}
+        assert cached.is_fresh(60) and not cached.is_fresh(0)
+
+        # k0 foi usada por último: k1 é a menos usada recentemente
+        assert cache.evict() == 1
+        assert cache.lookup("k1") is None
+        assert len(cache) == 2
+
+    # persistente entre execuções
+    with HttpCache(str(tmp_path / "cache.db")) as cache:
+        assert cache.lookup("k2").body == {"id": 2}
+
+
+def test_entries_survive_interrupted_run(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = HttpCache(path)
+    cache.store("k0", {"id": 0}, etag='"v0"')
+    cache.store("k1", {"id": 1})
+    cache.revalidate("k0")
+    # coleta interrompida: a conexão nunca é fechada
+    with HttpCache(path) as other:
+        assert other.lookup("k0").etag == '"v0"'
+        assert len(other) == 2
+    cache.conn.close()
+
+
+@pytest.mark.asyncio
+async def test_cacheable_requests_use_conditional_get(tmp_path):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({"id": "GW1"}, headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/cma-gateways/GW1", handler)
+    server = TestServer(app)
+    await server.start_server()
+    url = str(server.make_url("/cma-gateways/GW1"))
+    cache = HttpCache(str(tmp_path / "cache.db"), ttl=60)
+    set_http_cache(cache)
+    try:
+        first = await fetch_with_retry(url=url, headers={}, cacheable=True)
+        # dentro do TTL: servida do disco, sem requisição
+        second = await fetch_with_retry(url=url, headers={}, cacheable=True)
+        cache.ttl = 0
+        # vencida: revalidada com If-None-Match (304, sem corpo)
+        third = await fetch_with_retry(url=url, headers={}, cacheable=True)
+        # requisições não cacheáveis não passam pelo cache
+        await fetch_with_retry(url=url, headers={})
+    finally:
+        set_http_cache(None)
+        cache.close()
+        await server.close()
+
+    assert first == second == third == {"id": "GW1"}
+    assert requests == [None, '"v1"', None]
+    assert (cache.stats.misses, cache.stats.hits, cache.stats.revalidated) == (1, 1, 1)
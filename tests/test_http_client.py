@@ -0,0 +1,77 @@
+import asyncio
+import gc
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.utils.http_client import HttpClient, http_client
+from app.utils.http_utils import fetch_with_retry
+
+
+async def _start_server():
+    async def handler(request):
+        return web.json_response({"id": request.match_info["id"]})
+
+    app = web.Application()
+    app.router.add_get("/items/{id}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+# Teste do reaproveitamento de conexões do pool compartilhado
+@pytest.mark.asyncio
+async def test_fetch_with_retry_reuses_connections():
+    server = await _start_server()
+    http_client.reset_stats()
+    try:
+        for i in range(5):
+            data = await fetch_with_retry(
+                url=str(server.make_url(f"/items/{i}")), headers={}
+            )
+            assert data == {"id": str(i)}
+    finally:
+        await http_client.close()
+        await server.close()
+
+    assert http_client.stats.requests == 5
+    assert http_client.stats.connections_created == 1
+    assert http_client.stats.connections_reused == 4
+    assert http_client.stats.handshakes_saved == 4
+
+
+@pytest.mark.asyncio
+async def test_http_client_session_lifecycle():
+    client = HttpClient(limit=5, limit_per_host=2)
+    async with client:
+        session = await client.get_session()
+        assert session is await client.get_session()
+        assert session.connector.limit == 5
+        assert session.connector.limit_per_host == 2
+    assert session.closed
+
+
+def test_session_of_previous_loop_is_closed(recwarn):
+    client = HttpClient()
+
+    async def fetch():
+        server = await _start_server()
+        try:
+            session = await client.get_session()
+            async with session.get(server.make_url("/items/1")) as response:
+                assert await response.json() == {"id": "1"}
+        finally:
+            await server.close()
+        return session, session.connector
+
+    first = asyncio.run(fetch())
+    second = asyncio.run(fetch())
+    assert first[0].closed and first[0] is not second[0]
+    asyncio.run(client.close())
+    # só os objetos deste teste (outros testes podem deixar sessões abertas)
+    ours = [repr(obj) for obj in first + second]
+    del first, second
+    gc.collect()
+    warned = [str(w.message) for w in recwarn if w.category is ResourceWarning]
+    assert not [message for message in warned if any(o in message for o in ours)]
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from app.collector.crawler import CollectionResult
+from app.collector.sinks import JsonLinesSink, JsonSink
+from app.reconcile2.core.data_loader import JsonDataLoader
+from app.utils import json_codec
+from app.utils.json_codec import JsonCodec, create_codec
+
+RECORD = {
+    "id_gtw": "GW1",
+    "name_sub": "Taubaté",
+    "bit": 15,
+    "multiplier": 1.5,
+    "active": True,
+    "tags": [{"name": "fase", "value": None}],
+}
+
+BACKENDS = ["json", pytest.param("orjson", marks=pytest.mark.skipif(
+    json_codec.orjson is None, reason="orjson não instalado"
+))]
+
+
+@pytest.fixture(params=BACKENDS)
+def codec(request):
+    codec = create_codec(request.param)
+    json_codec.set_codec(codec)
+    yield codec
+    json_codec.set_codec(None)
+
+
+def test_roundtrip_matches_stdlib(codec):
+    encoded = codec.dumps(RECORD)
+    assert json.loads(encoded) == RECORD
+    assert codec.loads(json.dumps(RECORD)) == RECORD
+    assert codec.loads(json.dumps(RECORD).encode()) == RECORD
+    assert codec.loads(codec.dumps_bytes(RECORD)) == RECORD
+
+
+def test_unsupported_values_fall_back_to_stdlib(codec):
+    value = {"big": 2**70, 1: "chave numérica"}
+    assert json.loads(codec.dumps(value)) == json.loads(json.dumps(value))
+
+
+def test_auto_backend_and_unknown_backend():
+    expected = "orjson" if json_codec.orjson is not None else "json"
+    assert create_codec("auto").name == expected
+    assert isinstance(create_codec("json"), JsonCodec)
+    with pytest.raises(ValueError):
+        create_codec("simplejson")
+
+
+def test_writers_and_loader_share_codec(codec, tmp_path):
+    result = CollectionResult(gateways=[{"id": "GW1"}], flat_modbus=[RECORD, RECORD])
+    with JsonSink(str(tmp_path)) as sink:
+        sink.write(result)
+    with JsonLinesSink(str(tmp_path)) as sink:
+        sink.write(result)
+
+    # arquivos legíveis pela biblioteca padrão, com os mesmos valores
+    with open(tmp_path / "data.json", encoding="utf-8") as f:
+        assert json.load(f) == [RECORD, RECORD]
+    with open(tmp_path / "data.jsonl", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [RECORD, RECORD]
+
+    df = JsonDataLoader(str(tmp_path / "data.json")).load()
+    assert df["name_sub"].tolist() == ["Taubaté", "Taubaté"]
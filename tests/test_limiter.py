@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from aioresponses import aioresponses
+
+from app.collector.crawler import CmaWebCrawler
+from app.utils.fair_budget import FairBudget
+from app.utils.limiter import AdaptiveLimiter, current_limiter, percentile
+from tests.test_collector import FakeApi, FakeConfigs
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 95) == 95
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_limit_grows_while_latency_is_flat():
+    limiter = AdaptiveLimiter(4, max_limit=6, window=10)
+    for _ in range(50):
+        limiter.record(0.05)
+    assert limiter.limit == 6
+    assert limiter.stats.increases == 2
+    assert limiter.as_dict()["peak_limit"] == 6
+
+
+def test_limit_backs_off_once_per_round_on_failures():
+    limiter = AdaptiveLimiter(10, window=10)
+    for _ in range(5):
+        limiter.record(0, failure=True)
+    # uma rajada de falhas gera uma única redução multiplicativa
+    assert limiter.limit == 7
+    # nova redução só depois de uma rodada (o limite atual) de requisições
+    for _ in range(6):
+        limiter.record(0, failure=True)
+    assert limiter.limit == 4
+    assert limiter.stats.failures == 11
+
+
+def test_limit_backs_off_on_latency_increase():
+    limiter = AdaptiveLimiter(10, max_limit=10, window=10)
+    for _ in range(10):
+        limiter.record(0.05)
+    for _ in range(10):
+        limiter.record(0.5)
+    assert limiter.limit == 7
+    assert limiter.stats.decreases == 1
+
+
+def test_fixed_limit_when_not_adaptive():
+    limiter = AdaptiveLimiter(5, adaptive=False, window=10)
+    for _ in range(30):
+        limiter.record(0.01)
+    limiter.record(0, failure=True)
+    assert limiter.limit == 5
+
+
+@pytest.mark.asyncio
+async def test_budget_capacity_increase_wakes_waiters():
+    budget = FairBudget(1)
+    await budget.acquire()
+    waiters = [asyncio.create_task(budget.acquire()) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert budget.queue_depth == 2
+
+    budget.capacity = 3
+    await asyncio.wait_for(asyncio.gather(*waiters), timeout=1)
+    assert budget.in_use == 3
+
+
+@pytest.mark.asyncio
+async def test_slot_is_reentrant_within_a_task():
+    limiter = AdaptiveLimiter(1)
+    async with limiter.slot("gw"):
+        assert current_limiter() is limiter
+        # o getter chamado pelo crawler não reserva uma segunda vaga
+        async with asyncio.timeout(1):
+            async with limiter.slot():
+                assert limiter.in_flight == 1
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_is_released_during_backoff():
+    limiter = AdaptiveLimiter(1)
+    other = asyncio.Event()
+
+    async def waiting():
+        async with limiter.slot("gw2"):
+            other.set()
+
+    async with limiter.slot("gw"):
+        task = asyncio.create_task(waiting())
+        async with limiter.released():
+            assert limiter.in_flight == 0
+            # outra tarefa usa a vaga enquanto esta dorme
+            await asyncio.wait_for(other.wait(), timeout=1)
+        assert limiter.in_flight == 1 and current_limiter() is limiter
+        await task
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_reacquire_does_not_release_twice():
+    limiter = AdaptiveLimiter(1)
+    sleeping = asyncio.Event()
+
+    async def backoff():
+        async with limiter.slot():
+            async with limiter.released():
+                sleeping.set()
+                await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(backoff())
+    await asyncio.wait_for(sleeping.wait(), timeout=1)
+    async with limiter.slot():
+        await asyncio.sleep(0.05)  # a tarefa espera a vaga de volta
+        assert limiter.queue_depth == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert limiter.in_flight == 1
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_crawler_feeds_adaptive_limiter():
+    configs = FakeConfigs()
+    configs.ADAPTIVE_CONCURRENCY = True
+    api = FakeApi(latency=0.001)
+    crawler = CmaWebCrawler(configs)
+    with aioresponses() as m:
+        api.mock(m)
+        await crawler.crawl([{"id": "GW1", "name": "Gateway 01"}])
+
+    assert crawler.limiter.stats.requests == len(api.calls)
+    assert crawler.limiter.in_flight == 0
+    assert crawler.limiter.limit >= configs.MAX_PARALLEL_REQUESTS
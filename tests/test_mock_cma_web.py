@@ -0,0 +1,116 @@
+import aiohttp
+import pytest
+
+from app.collector.crawler import CmaWebCrawler
+from app.collector.field_requirements import has_paths
+from app.getters.gateway import fetch_all_gateways
+from benchmarks.fleet import FleetSpec, SyntheticFleet
+from benchmarks.mock_cma_web import MockCmaWeb
+from tests.test_collector import FakeConfigs
+
+SPEC = FleetSpec(gateways=2, hardwares=2, sensors_modbus=2, sensors_dnp=1, registers=12)
+
+
+def test_fleet_entities_are_generated_from_ids():
+    fleet = SyntheticFleet(SPEC)
+    assert SPEC.total_registers == 2 * 2 * 3 * 12
+    assert [gw["id"] for gw in fleet.gateways()] == ["GW-0", "GW-1"]
+    assert [hw["id"] for hw in fleet.hardwares("GW-1")] == ["HW-1-0", "HW-1-1"]
+    register = fleet.register_modbus("RMB-1-0-1-11")
+    assert register["sensorModbusId"] == "SMB-1-0-1"
+    assert fleet.register_modbus("RMB-1-0-1-11") == register
+    page = fleet.registers_modbus("SMB-1-0-1", 10, 20)
+    assert [r["id"] for r in page] == ["RMB-1-0-1-10", "RMB-1-0-1-11"]
+    assert fleet.register_modbus("RMB-1-0-1-12") is None
+    assert fleet.sensor_dnp("SMB-0-0-0") is None
+    assert fleet.hardwares("GW-x") is None
+
+
+def test_fleet_covers_every_parsed_field():
+    fleet = SyntheticFleet(SPEC)
+    entities = {
+        "gateway": fleet.gateway("GW-0"),
+        "hardware": fleet.hardware("HW-0-1"),
+        "sensor_modbus": fleet.sensor_modbus("SMB-0-1-1"),
+        "sensor_dnp3": fleet.sensor_dnp("SDN-0-1-0"),
+        "register_modbus": fleet.register_modbus("RMB-0-1-1-3"),
+        "register_dnp3": fleet.register_dnp("RDN-0-1-0-3"),
+    }
+    for kind, entity in entities.items():
+        assert has_paths(entity, CmaWebCrawler.REQUIRED_PATHS[kind]), kind
+
+
+@pytest.mark.asyncio
+async def test_server_auth_pagination_and_etag():
+    server = MockCmaWeb(SyntheticFleet(SPEC))
+    async with server, aiohttp.ClientSession() as session:
+        async with session.get(f"{server.url}/cma-gateways/all") as response:
+            assert response.status == 401
+        async with session.post(f"{server.url}/auth/token", json={}) as response:
+            assert response.status == 201
+            token = (await response.json())["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        params = {"sensorModbusId": "SMB-0-0-0", "page": 1, "size": 5}
+        url = f"{server.url}/registers-modbus"
+        async with session.get(url, params=params, headers=headers) as response:
+            page = await response.json()
+        assert [r["id"] for r in page["content"]][0] == "RMB-0-0-0-5"
+        assert (page["totalElements"], page["totalPages"], page["last"]) == (12, 3, False)
+
+        url = f"{server.url}/hardwares/HW-0-0"
+        async with session.get(url, headers=headers) as response:
+            etag = response.headers["ETag"]
+        conditional = {**headers, "If-None-Match": etag}
+        async with session.get(url, headers=conditional) as response:
+            assert response.status == 304
+        url = f"{server.url}/hardwares/HW-9-0"
+        async with session.get(url, headers=headers) as response:
+            assert response.status == 404
+    assert server.stats.not_modified == 1
+    assert server.stats.by_route["/registers-modbus"] == 1
+
+
+@pytest.mark.asyncio
+async def test_server_injects_errors_and_throttling():
+    fleet = SyntheticFleet(SPEC)
+    async with MockCmaWeb(fleet, throttle_rate=1.0, retry_after=2) as server:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{server.url}/cma-gateways/all") as response:
+                assert response.status == 429
+                assert response.headers["Retry-After"] == "2"
+    async with MockCmaWeb(fleet, error_rate=1.0, error_status=502) as server:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{server.url}/cma-gateways/all") as response:
+                assert response.status == 502
+            # o login não recebe falhas injetadas
+            async with session.post(f"{server.url}/auth/token", json={}) as response:
+                assert response.status == 201
+    assert server.stats.injected_errors == 1
+
+
+@pytest.mark.asyncio
+async def test_crawler_collects_synthetic_fleet():
+    async with MockCmaWeb(SyntheticFleet(SPEC)) as server:
+
+        class Configs(FakeConfigs):
+            host = server.url
+            MAX_PAGE_SIZE = 5
+
+            @property
+            async def auth_token(self):
+                return token
+
+        token = server.issue_token()
+        crawler = CmaWebCrawler(Configs())
+        gateways = await fetch_all_gateways(server.url, token)
+        result = await crawler.crawl(gateways)
+
+    assert len(result.flat_data) == SPEC.total_registers
+    assert len(result.flat_dnp3) == 2 * 2 * 1 * 12
+    row = result.flat_modbus[0]
+    assert row["id_gtw"] == "GW-0"
+    assert row["id_hdw"] == "HW-0-0"
+    assert row["id_sen"] == "SMB-0-0-0"
+    # 3 páginas de 5 por sensor
+    assert server.stats.by_route["/registers-modbus"] == 2 * 2 * 2 * 3
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.getters.pagination import is_last_page, iter_items, iter_pages
+
+
+def _fake_endpoint(total_items, size, calls, with_metadata=True):
+    items = list(range(total_items))
+
+    async def fetch_page(page):
+        calls.append(page)
+        await asyncio.sleep(0)
+        content = items[page * size : (page + 1) * size]
+        data = {"content": content}
+        if with_metadata:
+            total_pages = -(-total_items // size)
+            data.update({"totalPages": total_pages, "last": page + 1 >= total_pages})
+        return data
+
+    return fetch_page
+
+
+@pytest.mark.asyncio
+async def test_iter_items_reads_all_pages_in_order():
+    calls = []
+    items = [item async for item in iter_items(_fake_endpoint(25, 10, calls), prefetch=2)]
+    assert items == list(range(25))
+    assert calls == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_without_metadata_stops_on_short_page():
+    calls = []
+    pages = [
+        page
+        async for page in iter_pages(
+            _fake_endpoint(25, 10, calls, with_metadata=False), prefetch=1, size=10
+        )
+    ]
+    assert [len(page["content"]) for page in pages] == [10, 10, 5]
+    assert calls == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_bounds_prefetch():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fetch_page(page):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"content": [page], "totalPages": 20, "last": page == 19}
+
+    items = [item async for item in iter_items(fetch_page, prefetch=3)]
+    assert items == list(range(20))
+    assert max_in_flight == 3
+
+
+def test_is_last_page():
+    assert is_last_page({"last": True, "totalPages": 5}, 0)
+    assert is_last_page({"totalPages": 2}, 1)
+    assert not is_last_page({"totalPages": 2}, 0)
+    assert is_last_page({"content": []}, 3)
+    assert not is_last_page({"content": [1, 2]}, 0, size=2)
@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from app.collector.crawler import CollectionResult
+from app.collector.records import RecordBatch, RecordList
+
+COLUMNS = ("id", "name", "unit")
+ROWS = [("R1", "sensor", "kV"), ("R2", "sensor", "A")]
+PREFIX = {"name_gtw": "GW", "name": "prefixo", "id_hw": "HW"}
+
+
+def test_batch_records_put_prefix_first():
+    batch = RecordBatch(COLUMNS, ROWS).with_prefix(PREFIX)
+    expected = [{**PREFIX, **dict(zip(COLUMNS, row))} for row in ROWS]
+    assert list(batch) == expected
+    assert [list(record) for record in batch] == [list(record) for record in expected]
+    assert batch[-1] == expected[-1]
+    assert batch.keys() == ["name_gtw", "name", "id_hw", "id", "unit"]
+
+
+def test_compact_shares_repeated_strings():
+    rows = [("R1", "".join(["sen", "sor"])), ("R2", "".join(["sen", "sor"]))]
+    assert rows[0][1] is not rows[1][1]
+    batch = RecordBatch.compact(("id", "name"), rows)
+    assert batch.rows[0][1] is batch.rows[1][1]
+    assert list(batch) == [{"id": "R1", "name": "sensor"}, {"id": "R2", "name": "sensor"}]
+
+
+def test_record_list_concatenation_and_indexing():
+    modbus = RecordList([RecordBatch(COLUMNS, ROWS)])
+    dnp3 = RecordList.from_dicts([{"id": "D1"}])
+    combined = modbus + dnp3
+    assert len(combined) == 3
+    assert combined[2] == {"id": "D1"}
+    assert combined[-3]["id"] == "R1"
+    assert combined[1:] == [{"id": "R2", "name": "sensor", "unit": "A"}, {"id": "D1"}]
+    with pytest.raises(IndexError):
+        combined[3]
+    assert [{"id": "X"}] + dnp3 == [{"id": "X"}, {"id": "D1"}]
+    modbus += [{"id": "D2"}]
+    assert [record["id"] for record in modbus] == ["R1", "R2", "D2"]
+
+
+def test_from_dicts_groups_records_by_keys():
+    records = [{"a": 1, "b": 2}, {"a": 3, "b": 4}, {"a": 5}, {"b": 6, "a": 7}]
+    result = RecordList.from_dicts(records)
+    assert [batch.columns for batch in result.batches] == [("a", "b"), ("a",), ("b", "a")]
+    assert result == records
+
+
+def test_to_frame_matches_dataframe_of_dicts():
+    records = RecordList([RecordBatch(COLUMNS, ROWS).with_prefix(PREFIX)]) + [
+        {"id": "D1", "value": 1.5}
+    ]
+    expected = pd.DataFrame(list(records))
+    frame = records.to_frame()
+    # colunas ausentes: None no lugar de NaN, ambos gravados como NULL
+    pd.testing.assert_frame_equal(frame.fillna("-"), expected.fillna("-"))
+
+
+def test_collection_result_converts_record_fields():
+    result = CollectionResult(
+        flat_modbus=[{"id": "R1"}], registers_dnp3=RecordBatch(("id",), [("D1",)])
+    )
+    assert isinstance(result.flat_modbus, RecordList)
+    assert isinstance(result.registers_dnp3, RecordList)
+    assert result.to_dict()["flat_modbus"] == [{"id": "R1"}]
+    assert result.to_dict()["registers_dnp3"] == [{"id": "D1"}]
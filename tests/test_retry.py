@@ -0,0 +1,189 @@
+import asyncio
+import time
+from contextlib import nullcontext
+from email.utils import formatdate
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.utils import retry
+from app.utils.coalescing import RequestCoalescer
+from app.utils.http_utils import fetch_with_retry
+from app.utils.limiter import AdaptiveLimiter
+from app.utils.retry import (
+    HttpStatusError,
+    RetryBudget,
+    RetryPolicy,
+    parse_retry_after,
+    policy_for,
+    register_policy,
+)
+
+
+def test_backoff_is_exponential_with_full_jitter():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+    for attempt, ceiling in ((1, 1), (2, 2), (3, 4), (4, 5), (10, 5)):
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        # jitter: as esperas não são sincronizadas
+        assert len(set(delays)) > 1
+
+
+def test_retry_after_seconds_and_http_date():
+    assert parse_retry_after("7") == 7
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("amanhã") is None
+    in_ten_seconds = parse_retry_after(formatdate(time.time() + 10, usegmt=True))
+    assert 8 <= in_ten_seconds <= 10
+
+    policy = RetryPolicy(max_delay=30)
+    assert policy.delay(1, "3") == 3
+    assert policy.delay(1, "120") == 30
+
+
+def test_retry_budget_limits_retries():
+    policy = RetryPolicy(max_attempts=5, budget=RetryBudget(ratio=0.5, min_retries=1))
+    assert policy.can_retry(1)
+    assert not policy.can_retry(1)
+    policy.on_request()
+    policy.on_request()
+    assert policy.can_retry(1)
+    assert policy.budget.exhausted == 1
+    # nunca além de max_attempts
+    assert not RetryPolicy(max_attempts=3).can_retry(3)
+
+
+def test_policy_registry_matches_url(monkeypatch):
+    monkeypatch.setattr(retry, "_policies", [])
+    auth = RetryPolicy(max_attempts=1)
+    register_policy(r"/auth/", auth)
+    assert policy_for("http://cma/api/v1/auth/login") is auth
+
+
+@pytest_asyncio.fixture
+async def flaky_server():
+    state = {"calls": 0, "failures": 2, "status": 503, "headers": {}}
+
+    async def handler(request):
+        state["calls"] += 1
+        if state["calls"] <= state["failures"]:
+            return web.json_response(
+                {}, status=state["status"], headers=state["headers"]
+            )
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/items", handler)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, state
+    await server.close()
+
+
+FAST = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.05)
+
+
+@pytest.mark.asyncio
+async def test_transient_status_is_retried(flaky_server):
+    server, state = flaky_server
+    result = await fetch_with_retry(
+        url=str(server.make_url("/items")), headers={}, retry_policy=FAST
+    )
+    assert result == {"ok": True}
+    assert state["calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honored(flaky_server):
+    server, state = flaky_server
+    state.update(failures=1, status=429, headers={"Retry-After": "1"})
+    policy = RetryPolicy(max_attempts=2, base_delay=0, max_delay=0.2)
+
+    started = time.perf_counter()
+    await fetch_with_retry(
+        url=str(server.make_url("/items")), headers={}, retry_policy=policy
+    )
+    # espera o Retry-After, limitado a max_delay
+    assert 0.15 <= time.perf_counter() - started < 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("coalesced", [False, True])
+async def test_slot_is_free_while_waiting_retry_after(flaky_server, coalesced):
+    server, state = flaky_server
+    state.update(failures=1, status=429, headers={"Retry-After": "1"})
+    policy = RetryPolicy(max_attempts=2, base_delay=0, max_delay=0.2)
+    limiter = AdaptiveLimiter(1, adaptive=False)
+
+    async def throttled():
+        async with limiter.slot("gw"):
+            return await fetch_with_retry(
+                url=str(server.make_url("/items")), headers={}, retry_policy=policy
+            )
+
+    # na coleta o RequestCoalescer está sempre ativo: a requisição roda em outra
+    # tarefa, que herda a vaga do chamador
+    with RequestCoalescer().activate() if coalesced else nullcontext():
+        task = asyncio.create_task(throttled())
+    while state["calls"] == 0:
+        await asyncio.sleep(0.01)
+    # durante o Retry-After a única vaga fica livre para outra requisição
+    async with asyncio.timeout(0.1):
+        async with limiter.slot("gw2"):
+            pass
+    assert await task == {"ok": True}
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_coalesced_request_in_a_slot(flaky_server):
+    server, state = flaky_server
+    state.update(failures=1, status=429, headers={"Retry-After": "1"})
+    policy = RetryPolicy(max_attempts=2, base_delay=0, max_delay=0.1)
+    limiter = AdaptiveLimiter(1, adaptive=False)
+    coalescer = RequestCoalescer()
+    url = str(server.make_url("/items"))
+
+    async def caller():
+        async with limiter.slot("gw"):
+            return await fetch_with_retry(url=url, headers={}, retry_policy=policy)
+
+    with coalescer.activate():
+        task = asyncio.create_task(caller())
+    while state["calls"] == 0:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # a requisição compartilhada continua, mas só tenta de novo com uma vaga
+    in_flight = coalescer._in_flight[coalescer.key("GET", url)]
+    async with limiter.slot("gw2"):
+        await asyncio.sleep(0.3)  # além do backoff
+        assert state["calls"] == 1
+    assert await in_flight == {"ok": True}
+    assert state["calls"] == 2 and limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_status_fails_immediately(flaky_server):
+    server, state = flaky_server
+    state.update(status=404)
+    with pytest.raises(HttpStatusError) as error:
+        await fetch_with_retry(
+            url=str(server.make_url("/items")), headers={}, retry_policy=FAST
+        )
+    assert error.value.status == 404
+    assert state["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_raise_instead_of_returning_none(flaky_server):
+    server, state = flaky_server
+    state.update(failures=10)
+    with pytest.raises(HttpStatusError):
+        await fetch_with_retry(
+            url=str(server.make_url("/items")), headers={}, retry_policy=FAST
+        )
+    assert state["calls"] == 3
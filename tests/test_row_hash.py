@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.reconcile2.core.data_synchronizer import BaseDataSynchronizer
+from app.reconcile2.core.db_connection import DatabaseConnection
+from app.reconcile2.core.db_schema import GenericSchema
+from app.reconcile2.core.row_hash import (
+    NULL,
+    RowHashStore,
+    diff_hashes,
+    normalize_column,
+    row_hashes,
+)
+
+SCHEMA = GenericSchema(
+    table_name="DP",
+    fields={
+        "xid": "VARCHAR NOT NULL",
+        "nome": "VARCHAR",
+        "offset": "INTEGER",
+        "multiplier": "FLOAT",
+        "enabled": "BOOLEAN",
+    },
+    primary_key="xid",
+)
+
+ROWS = pd.DataFrame(
+    {
+        "xid": ["A", "B", "C"],
+        "nome": ["a", "b", None],
+        "offset": [1, None, 3],
+        "multiplier": [1.0, 0.5, 2],
+        "enabled": [True, False, True],
+    }
+)
+
+
+class Synchronizer(BaseDataSynchronizer):
+    def __init__(self):
+        super().__init__(table_name="DP", primary_key="xid")
+
+    def _apply_changes(self, changes, df, db):
+        super()._apply_changes(changes, df, db)
+
+
+@pytest.fixture
+def db(tmp_path):
+    with DatabaseConnection(str(tmp_path / "middleware.db")) as db:
+        SCHEMA.initialize(db)
+        yield db
+
+
+def test_normalize_column_matches_sqlite_types():
+    assert normalize_column(pd.Series([1.0, 2.5, np.nan])).tolist() == ["1", "2.5", NULL]
+    assert normalize_column(pd.Series([True, False])).tolist() == ["1", "0"]
+    assert normalize_column(pd.Series([3, 4])).tolist() == ["3", "4"]
+    mixed = pd.Series(["x", 1, 1.0, True, None], dtype=object)
+    assert normalize_column(mixed).tolist() == ["x", "1", "1", "1", NULL]
+    assert normalize_column(pd.Series(["a", None])).tolist() == ["a", NULL]
+
+
+def test_row_hashes_ignore_equivalent_representations(db):
+    ROWS.to_sql("DP", db.connection, if_exists="append", index=False)
+    stored = db.fetch_dataframe("SELECT * FROM DP")
+    assert stored["offset"].dtype == "float64"  # INTEGER com NULL volta como float
+
+    incoming = row_hashes(ROWS, "xid")
+    assert list(incoming.index) == ["A", "B", "C"]
+    assert incoming.equals(row_hashes(stored, "xid"))
+
+
+def test_diff_hashes_yields_key_sets():
+    before = row_hashes(ROWS, "xid")
+    after = ROWS.copy()
+    after.loc[1, "nome"] = "bb"
+    after = pd.concat([after.drop(index=0), pd.DataFrame([{"xid": "D"}])])
+    diff = diff_hashes(row_hashes(after, "xid"), before)
+    assert (diff.new, diff.changed, diff.removed) == ({"D"}, {"B"}, {"A"})
+
+
+def test_synchronizer_analyzes_by_hash(db):
+    sync = Synchronizer()
+    sync.synchronize(ROWS.copy(), db)
+    assert len(db.fetch_dataframe("SELECT * FROM DP")) == 3
+
+    incoming = ROWS.copy()
+    incoming.loc[2, "multiplier"] = 9.5
+    incoming = incoming[incoming["xid"] != "A"]
+    changes = sync._analyze_changes(incoming, db)
+    assert changes["new"].empty
+    assert changes["update"]["xid"].tolist() == ["C"]
+    assert list(changes["update"].columns) == list(SCHEMA.fields)
+    assert changes["remove"] == {"A"}
+    # coluna ausente criada com valores vazios difere do banco
+    assert sync._analyze_changes(ROWS.drop(columns=["enabled"]), db)["update"].shape[0] == 3
+
+
+def test_hash_store_avoids_full_reads(db):
+    sync = Synchronizer()
+    sync.hash_store = RowHashStore()
+    sync.synchronize(ROWS.copy(), db)
+    stored = sync.hash_store.load(db, "DP")
+    assert stored.sort_index().equals(row_hashes(ROWS, "xid").sort_index())
+
+    def full_read(db):
+        raise AssertionError("tabela lida por inteiro")
+
+    sync._get_existing_data = full_read
+    changes = sync._analyze_changes(ROWS.copy(), db)
+    assert changes["new"].empty and changes["update"].empty
+
+    # linha apagada por fora: contagem diverge e os hashes são recalculados
+    db.execute("DELETE FROM DP WHERE xid = 'B'")
+    assert sync.hash_store.load(db, "DP") is None
+    del sync._get_existing_data
+    changes = sync._analyze_changes(ROWS.copy(), db)
+    assert changes["new"]["xid"].tolist() == ["B"]
+    assert len(sync.hash_store.load(db, "DP")) == 2
@@ -0,0 +1,92 @@
+import json
+
+import pandas as pd
+
+from app.collector.field_requirements import required_paths
+from app.getters.gateway import parse_gateway_data
+from app.getters.register import REGISTER_MODBUS_FIELDS, parse_register_modbus_data
+from app.getters.schema import Field, compile_parser
+
+FIELDS = [
+    Field("id", "id"),
+    Field("name_sub", "substation.name"),
+    Field("type", "sensor.type"),
+    Field("bits", "bits.config", {}),
+    Field("tags", "tags", [], json.dumps),
+    Field("type", "sensor.other"),
+]
+
+parse = compile_parser(FIELDS, "parse_example", doc="Exemplo.")
+
+
+def test_compile_parser_extracts_nested_fields():
+    data = {
+        "id": "R1",
+        "substation": {"name": "Taubaté"},
+        "sensor": {"type": "x", "other": "y"},
+        "bits": {"config": {"bit": 3}},
+        "tags": ["a"],
+    }
+    assert parse(data) == {
+        "id": "R1",
+        "name_sub": "Taubaté",
+        "type": "y",
+        "bits": {"bit": 3},
+        "tags": '["a"]',
+    }
+
+
+def test_repeated_column_keeps_first_position_and_last_value():
+    assert list(parse({})) == ["id", "name_sub", "type", "bits", "tags"]
+    assert parse({"sensor": {"type": "x"}})["type"] is None
+
+
+def test_missing_or_null_levels_yield_defaults():
+    for data in ({}, {"substation": None, "bits": None}, {"substation": "?"}):
+        parsed = parse(data)
+        assert parsed["name_sub"] is None
+        assert parsed["bits"] == {}
+        assert parsed["tags"] == "[]"
+
+
+def test_mutable_defaults_are_fresh_per_record():
+    first, second = parse({}), parse({})
+    first["bits"]["bit"] = 1
+    assert second["bits"] == {}
+
+
+def test_batch_matches_per_record_parsing():
+    items = [
+        {"id": "R1", "sensor": {"other": "y"}},
+        {"id": "R2", "substation": {"name": "S"}},
+        {},
+    ]
+    expected = pd.DataFrame([parse(item) for item in items])
+    pd.testing.assert_frame_equal(pd.DataFrame(parse.batch(items)), expected)
+    assert parse.batch([]) == {column: [] for column in parse({})}
+
+
+def test_parser_metadata():
+    assert parse.__name__ == "parse_example"
+    assert parse.__doc__ == "Exemplo."
+    assert parse.paths == {
+        ("id",),
+        ("substation", "name"),
+        ("sensor", "type"),
+        ("sensor", "other"),
+        ("bits", "config"),
+        ("tags",),
+    }
+    assert parse_gateway_data.__module__ == "app.getters.gateway"
+
+
+def test_required_paths_include_overwritten_columns():
+    paths = required_paths(parse_register_modbus_data)
+    assert paths == {field.keys for field in REGISTER_MODBUS_FIELDS}
+    assert ("sensorModbus", "id") in paths
+
+
+def test_row_matches_record_values():
+    data = {"id": "R1", "sensor": {"type": "x", "other": "y"}, "tags": ["a"]}
+    assert parse.columns == ("id", "name_sub", "type", "bits", "tags")
+    assert parse.row(data) == tuple(parse(data).values())
@@ -0,0 +1,76 @@
+import json
+import sqlite3
+
+import pandas as pd
+import pytest
+from aioresponses import aioresponses
+
+from app.collector.crawler import CmaWebCrawler, CollectionResult
+from app.collector.sinks import JsonLinesSink, SQLiteSink, create_sink
+from tests.test_collector import FakeApi, FakeConfigs
+
+GATEWAYS = [{"id": "GW1", "name": "Gateway 01"}]
+
+
+def _sorted(records):
+    return sorted(records, key=lambda record: json.dumps(record, sort_keys=True))
+
+
+@pytest.mark.asyncio
+async def test_streamed_output_matches_batch_collection(tmp_path):
+    api = FakeApi()
+    with aioresponses() as m:
+        api.mock(m)
+        expected = await CmaWebCrawler(FakeConfigs()).crawl(GATEWAYS)
+
+    sink = create_sink(str(tmp_path), ["json", "jsonl", "sqlite"])
+    with aioresponses() as m:
+        api.mock(m)
+        result = await CmaWebCrawler(FakeConfigs(), sink=sink).crawl(GATEWAYS)
+    sink.close()
+
+    # nada acumulado em memória: tudo foi gravado no sink
+    assert result == CollectionResult()
+    assert sink.total_records == 8
+
+    with open(tmp_path / "data.json") as f:
+        assert _sorted(json.load(f)) == _sorted(expected.flat_data)
+    with open(tmp_path / "data.jsonl") as f:
+        assert _sorted(json.loads(line) for line in f) == _sorted(expected.flat_data)
+    with open(tmp_path / "cma_hardwares.json") as f:
+        assert sorted(hw["id"] for hw in json.load(f)) == ["HW1", "HW2"]
+    with open(tmp_path / "cma_gateways.json") as f:
+        assert [gw["id"] for gw in json.load(f)] == ["GW1"]
+
+    with sqlite3.connect(tmp_path / "dados.db") as conn:
+        df = pd.read_sql("SELECT * FROM dados", conn)
+    assert len(df) == 8
+    assert set(df.columns) == set(pd.DataFrame(expected.flat_data).columns)
+
+
+def test_sqlite_sink_adds_new_columns_and_replaces_table(tmp_path):
+    with SQLiteSink(str(tmp_path), batch_size=1) as sink:
+        sink.write(CollectionResult(flat_modbus=[{"a": 1, "b": "x"}]))
+        sink.write(CollectionResult(flat_dnp3=[{"a": 2, "c": [1, 2]}]))
+    with sqlite3.connect(tmp_path / "dados.db") as conn:
+        rows = conn.execute("SELECT a, b, c FROM dados ORDER BY a").fetchall()
+    assert [row[:2] for row in rows] == [(1, "x"), (2, None)]
+    assert rows[0][2] is None and json.loads(rows[1][2]) == [1, 2]
+
+    with SQLiteSink(str(tmp_path)) as sink:
+        sink.write(CollectionResult(flat_modbus=[{"a": 3}]))
+    with sqlite3.connect(tmp_path / "dados.db") as conn:
+        assert conn.execute("SELECT a FROM dados").fetchall() == [(3,)]
+
+
+def test_json_lines_sink_counts_records(tmp_path):
+    with JsonLinesSink(str(tmp_path)) as sink:
+        sink.write(CollectionResult(flat_modbus=[{"a": 1}], flat_dnp3=[{"a": 2}]))
+    assert sink.total_records == 2
+    lines = (tmp_path / "data.jsonl").read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [{"a": 1}, {"a": 2}]
+
+
+def test_create_sink_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        create_sink(str(tmp_path), ["csv"])
@@ -0,0 +1,123 @@
+import asyncio
+import base64
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.login import TokenManager, token_expiry
+from app.utils.http_utils import fetch_with_retry
+
+
+def make_jwt(exp: float, sub: str = "user") -> str:
+    def encode(data):
+        raw = base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+        return raw.rstrip("=")
+
+    return f"{encode({'alg': 'HS256'})}.{encode({'sub': sub, 'exp': exp})}.assinatura"
+
+
+class FakeLogin:
+    def __init__(self, lifetime=3600, delay=0.01):
+        self.lifetime = lifetime
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return make_jwt(time.time() + self.lifetime, sub=f"login-{self.calls}")
+
+
+def test_token_expiry():
+    assert token_expiry(make_jwt(1700000000)) == 1700000000
+    assert token_expiry("token-opaco") is None
+    assert token_expiry(None) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_login():
+    login = FakeLogin()
+    manager = TokenManager(login)
+
+    tokens = await asyncio.gather(*(manager.get_token() for _ in range(20)))
+
+    assert login.calls == 1
+    assert len(set(tokens)) == 1
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_refresh_with_stale_token_reuses_newer_token():
+    login = FakeLogin()
+    manager = TokenManager(login)
+    stale = await manager.get_token()
+
+    fresh = await asyncio.gather(*(manager.refresh(stale_token=stale) for _ in range(10)))
+    assert login.calls == 2
+    assert set(fresh) == {manager.token} and manager.token != stale
+
+    # 401 atrasado com o token antigo: não faz novo login
+    assert await manager.refresh(stale_token=stale) == manager.token
+    assert login.calls == 2
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_token_is_refreshed_before_expiry():
+    # validade de 0,2 s: renovação em segundo plano na metade da validade
+    login = FakeLogin(lifetime=0.2, delay=0)
+    manager = TokenManager(login, refresh_margin=60)
+    first = await manager.get_token()
+
+    await asyncio.sleep(0.3)
+
+    assert login.calls >= 2
+    assert manager.token != first
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_fetch_with_retry_replays_unauthorized_requests():
+    valid = {"token": None}
+
+    async def handler(request):
+        if request.headers.get("Authorization") != f"Bearer {valid['token']}":
+            return web.json_response({}, status=401)
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/items", handler)
+    server = TestServer(app)
+    await server.start_server()
+
+    login = FakeLogin()
+    manager = TokenManager(login)
+    expired = await manager.get_token()
+
+    async def rotate():
+        valid["token"] = await FakeLogin()()
+        return valid["token"]
+
+    manager._login = rotate
+    try:
+        with patch("app.settings.configs.token_manager", manager):
+            results = await asyncio.gather(
+                *(
+                    fetch_with_retry(
+                        url=str(server.make_url("/items")),
+                        headers={"Authorization": f"Bearer {expired}"},
+                    )
+                    for _ in range(5)
+                )
+            )
+    finally:
+        await manager.close()
+        await server.close()
+
+    assert results == [{"ok": True}] * 5
+    # um único login para as cinco requisições recusadas
+    assert manager.logins == 2